@@ -0,0 +1,145 @@
+"""
+Multi-day backfill for the data-collector.
+
+A backfill downloads one Swissdox dump per date window of the range (see
+get_news_data.fetch_swissdox_windows), splits the dumps by publication date and runs the clean and cluster stages of every day in a process pool. Each worker
+loads the spaCy model and opens the entity cache once, in its initializer, instead of
+once per day. Articles seen on earlier days are dropped in the parent in date order,
+so the fingerprint index sees the days in the same order as daily runs would.
+"""
+import atexit
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from checkpoints import save_dataframe
+from clean_data import READ_CHUNK_SIZE, deduplicate_articles, drop_seen_articles, iter_swissdox_dump
+from clustering import get_nlp, identify_and_save_daily_events_to_df
+from entity_cache import EntityCache
+
+# Worker processes for the clean and cluster stages; each holds its own spaCy model
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "2"))
+
+# Entity cache of the current worker process, opened by init_worker
+_entity_cache = None
+
+
+def split_dump_by_date(dump_path, output_dir, start_date, end_date, chunksize=READ_CHUNK_SIZE):
+    """
+    Stream a multi-day dump and write the articles of each day to their own Parquet files.
+
+    Every chunk of the dump adds one part file per date it contains, so the dump is never
+    held in memory as a whole.
+
+    Args:
+        dump_path (str): Path of the Swissdox .tsv.xz dump.
+        output_dir (str): Directory for the per-day files.
+        start_date (datetime.date): First day to keep.
+        end_date (datetime.date): Last day to keep (inclusive).
+        chunksize (int): Rows per chunk when streaming the dump.
+
+    Returns:
+        dict: Mapping of each date with articles to the list of its Parquet part files.
+    """
+    parts = {}
+    for chunk_number, chunk in enumerate(iter_swissdox_dump(dump_path, chunksize)):
+        for date, day in chunk.groupby(pd.to_datetime(chunk['pubtime']).dt.date, sort=True):
+            if not start_date <= date <= end_date:
+                continue
+            path = os.path.join(output_dir, f"{date}-{chunk_number:05d}.parquet")
+            day.reset_index(drop=True).to_parquet(path, index=False)
+            parts.setdefault(date, []).append(path)
+    return parts
+
+
+def read_day(part_paths):
+    """
+    Read the articles of one day from its memory-mapped Parquet part files.
+    """
+    frames = [pq.read_table(path, memory_map=True).to_pandas() for path in part_paths]
+    return pd.concat(frames, ignore_index=True)
+
+
+def init_worker():
+    """
+    Process pool initializer: load the spaCy model and open the entity cache once per worker.
+    """
+    global _entity_cache
+    get_nlp()
+    _entity_cache = EntityCache()
+    atexit.register(_entity_cache.close)
+
+
+def process_day(date, day_path, cluster_params):
+    """
+    Run the clean and cluster stages for one day in a worker and checkpoint their output.
+
+    Args:
+        date (datetime.date): The processed day.
+        day_path (str): Parquet file with the day's articles (already filtered by the fingerprint index).
+        cluster_params (dict): Keyword arguments for identify_and_save_daily_events_to_df.
+
+    Returns:
+        tuple: (date, DataFrame of the day's clustered articles)
+    """
+    cleaned_data = deduplicate_articles(read_day([day_path]))
+    save_dataframe(cleaned_data, "clean", date)
+
+    df_relevant_articles = identify_and_save_daily_events_to_df(
+        cleaned_data, entity_cache=_entity_cache, **cluster_params
+    )
+    save_dataframe(df_relevant_articles, "cluster", date)
+    return date, df_relevant_articles
+
+
+def cluster_days(dump_paths, start_date, end_date, work_dir, fingerprint_index, cluster_params, workers=BACKFILL_WORKERS):
+    """
+    Split multi-day dumps by date and run clean and cluster for every day in a process pool.
+
+    Days are submitted in date order as soon as their already-seen articles have been dropped,
+    so the workers start while the parent is still filtering later days.
+
+    Args:
+        dump_paths (list or str): Paths of the Swissdox .tsv.xz dumps covering the range.
+        start_date (datetime.date): First day of the range.
+        end_date (datetime.date): Last day of the range (inclusive).
+        work_dir (str): Directory for the per-day intermediate files.
+        fingerprint_index (FingerprintIndex): Index of articles processed on earlier days, or None.
+        cluster_params (dict): Keyword arguments for identify_and_save_daily_events_to_df.
+        workers (int): Number of worker processes. Defaults to BACKFILL_WORKERS.
+
+    Returns:
+        dict: Mapping of each date with articles to its DataFrame of clustered articles.
+    """
+    if isinstance(dump_paths, str):
+        dump_paths = [dump_paths]
+    parts = {}
+    for dump_number, dump_path in enumerate(dump_paths):
+        # Separate directories, as the part files of each dump are numbered from 0
+        dump_dir = os.path.join(work_dir, f"dump-{dump_number:03d}")
+        os.makedirs(dump_dir, exist_ok=True)
+        for date, part_paths in split_dump_by_date(dump_path, dump_dir, start_date, end_date).items():
+            parts.setdefault(date, []).extend(part_paths)
+    print(f"Backfill: {len(parts)} days with articles between {start_date} and {end_date}")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=init_worker) as executor:
+        futures = []
+        for date in sorted(parts):
+            day = read_day(parts[date])
+            if fingerprint_index is not None:
+                day = drop_seen_articles(day, fingerprint_index, date)
+            if day.empty:
+                print(f"Backfill: no new articles on {date}")
+                continue
+            day_path = os.path.join(work_dir, f"{date}-new.parquet")
+            day.to_parquet(day_path, index=False)
+            futures.append(executor.submit(process_day, date, day_path, cluster_params))
+
+        for future in as_completed(futures):
+            date, df_relevant_articles = future.result()
+            print(f"Backfill: clustered {len(df_relevant_articles)} articles on {date}")
+            results[date] = df_relevant_articles
+    return results
@@ -0,0 +1,614 @@
+"""
+Benchmarks for the data-collector pipeline stages.
+
+Each benchmark runs the current implementation of a stage side by side with its
+optimised counterpart on the same input and prints throughput numbers.
+
+Usage:
+    python benchmarks.py ner --articles 2000
+    python benchmarks.py ner --input raw_data/dump.tsv.xz --n-process 4
+    python benchmarks.py dedup --groups 20 --group-size 300
+    python benchmarks.py normalise --articles 20000
+    python benchmarks.py read --articles 50000 --chunk-size 10000
+    python benchmarks.py split --articles 5000 --chunk-size 20 --max-chunks 5
+    python benchmarks.py llm --clusters 6 --articles 10 --latency 0.2
+    python benchmarks.py wiki --clusters 40 --titles 5 --latency 0.1
+    python benchmarks.py load --days 30 --clusters 40 --articles 25
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+
+SYNTHETIC_PEOPLE = ["Karin Keller-Sutter", "Alain Berset", "Donald Trump", "Viola Amherd", "Ignazio Cassis"]
+SYNTHETIC_PLACES = ["Bern", "Zürich", "Genf", "Basel", "Washington", "Brüssel", "Lugano"]
+SYNTHETIC_ORGS = ["Bundesrat", "Nationalbank", "UBS", "Swissmedic", "SBB", "Europäische Union"]
+SYNTHETIC_TOPICS = ["Zölle", "Budget", "Neutralität", "Energiepreise", "Gesundheitskosten", "Bahnausbau"]
+
+
+def synthetic_articles(n_articles, seed=42):
+    """
+    Generate a reproducible DataFrame of German news-like articles.
+
+    Args:
+        n_articles (int): Number of articles to generate.
+        seed (int): Random seed. Defaults to 42.
+
+    Returns:
+        pd.DataFrame: Articles with the columns of a cleaned Swissdox dump.
+    """
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_articles):
+        person = rng.choice(SYNTHETIC_PEOPLE)
+        place = rng.choice(SYNTHETIC_PLACES)
+        org = rng.choice(SYNTHETIC_ORGS)
+        topic = rng.choice(SYNTHETIC_TOPICS)
+        sentences = [
+            f"{person} äusserte sich am Montag in {place} zum Thema {topic}.",
+            f"Der {org} will noch in dieser Woche über das weitere Vorgehen entscheiden.",
+            f"Kritiker in {rng.choice(SYNTHETIC_PLACES)} bezeichnen die Pläne als verfrüht.",
+            f"Laut {rng.choice(SYNTHETIC_PEOPLE)} sind die Folgen für die Schweiz noch unklar.",
+        ]
+        rows.append({
+            "id": i,
+            "pubtime": pd.Timestamp("2025-04-09") + pd.Timedelta(minutes=rng.randint(0, 1439)),
+            "medium_name": rng.choice(["NZZ", "Tages-Anzeiger", "Blick", "20 Minuten"]),
+            "head": f"{person}: {org} und {topic}",
+            "article_link": f"https://example.ch/{topic.lower()}/{i}",
+            "content_id": f"c{i}",
+            "content": " ".join(rng.sample(sentences, len(sentences)) * rng.randint(1, 4)),
+        })
+    return pd.DataFrame(rows)
+
+
+def synthetic_duplicate_articles(n_groups, group_size, seed=42):
+    """
+    Generate articles with many re-published versions of the same story.
+
+    Each group shares base link and headline, uses versioned URLs and contains a mix of
+    near-identical copies (a few words changed) and rewritten articles.
+
+    Args:
+        n_groups (int): Number of stories.
+        group_size (int): Number of versions per story.
+        seed (int): Random seed. Defaults to 42.
+
+    Returns:
+        pd.DataFrame: Articles with the columns of a Swissdox dump.
+    """
+    rng = random.Random(seed)
+    base = synthetic_articles(n_groups, seed=seed)
+    rows = []
+    for g, story in base.iterrows():
+        words = story["content"].split()
+        for version in range(group_size):
+            if version % 5 == 0:
+                # Rewritten article: shuffle the sentences of another story
+                content = synthetic_articles(1, seed=seed + g * group_size + version)["content"].iloc[0]
+            else:
+                content_words = list(words)
+                for _ in range(3):
+                    content_words[rng.randrange(len(content_words))] = rng.choice(SYNTHETIC_TOPICS)
+                content = " ".join(content_words)
+            rows.append({
+                "id": len(rows),
+                "pubtime": story["pubtime"] + pd.Timedelta(minutes=version),
+                "medium_name": story["medium_name"],
+                "head": story["head"],
+                "article_link": f"https://example.ch/news/story-{g}-{version}",
+                "content_id": f"g{g}v{version}",
+                "content": content,
+            })
+    return pd.DataFrame(rows)
+
+
+def load_articles(input_path=None, n_articles=2000):
+    """
+    Load benchmark input, either from a Swissdox .tsv.xz dump or synthetically.
+
+    Args:
+        input_path (str): Optional path to a Swissdox dump.
+        n_articles (int): Number of articles to use. Defaults to 2000.
+
+    Returns:
+        pd.DataFrame: The benchmark articles.
+    """
+    if input_path:
+        df = pd.read_csv(input_path, sep='\t', compression='xz', nrows=n_articles)
+        df.columns = df.columns.str.strip()
+        df["head"] = df["head"].fillna("").astype(str)
+        df["content"] = df["content"].fillna("").astype(str)
+        return df
+    return synthetic_articles(n_articles)
+
+
+def timed(function, *args, **kwargs):
+    """
+    Run a function once and measure its wall time.
+
+    Returns:
+        tuple: (result, seconds)
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_ner(df, batch_size, n_process):
+    """
+    Compare per-document NER against batched nlp.pipe NER in clustering.
+    """
+    import clustering
+
+    headlines = df["head"].tolist()
+    contents = df["content"].tolist()
+    n = len(df)
+
+    loop_result, loop_seconds = timed(clustering.extract_entities_sequential, headlines, contents)
+    pipe_result, pipe_seconds = timed(
+        clustering.extract_entities_batched, headlines, contents, batch_size=batch_size, n_process=n_process
+    )
+
+    print(f"Articles:              {n}")
+    print(f"Disabled components:   {clustering.get_ner_disabled_pipes(clustering.get_nlp())}")
+    print(f"Loop  (nlp per doc):   {n / loop_seconds:10.1f} articles/s ({loop_seconds:.2f}s)")
+    print(f"Pipe  (batch={batch_size}, n_process={n_process}): {n / pipe_seconds:10.1f} articles/s ({pipe_seconds:.2f}s)")
+    print(f"Speed-up:              {loop_seconds / pipe_seconds:10.2f}x")
+    print(f"Identical entities:    {loop_result == pipe_result}")
+
+
+def bench_dedup(df, threshold, jaccard_threshold):
+    """
+    Compare the TF-IDF and MinHash/LSH backends of url_deduplication.remove_similar_rows.
+    """
+    from url_deduplication import remove_similar_rows
+
+    n = len(df)
+    tfidf_result, tfidf_seconds = timed(remove_similar_rows, df, threshold, backend="tfidf")
+    minhash_result, minhash_seconds = timed(
+        remove_similar_rows, df, threshold, backend="minhash", jaccard_threshold=jaccard_threshold
+    )
+
+    print(f"Articles:              {n}")
+    print(f"TF-IDF  (cosine {threshold}):  {n / tfidf_seconds:10.1f} articles/s ({tfidf_seconds:.2f}s), kept {len(tfidf_result)}")
+    print(f"MinHash (Jaccard {jaccard_threshold}): {n / minhash_seconds:10.1f} articles/s ({minhash_seconds:.2f}s), kept {len(minhash_result)}")
+    print(f"Speed-up:              {tfidf_seconds / minhash_seconds:10.2f}x")
+    both = set(tfidf_result["id"]) & set(minhash_result["id"])
+    print(f"Articles kept by both: {len(both)}")
+
+
+def bench_normalise(df, duplicates, repeat):
+    """
+    Compare row-by-row preprocess_text with the vectorised preprocess_text_series, once on a
+    whole Series and once as remove_similar_rows uses them, on stories with a few versions each.
+    """
+    from url_deduplication import get_stop_words, preprocess_text, preprocess_text_series, remove_similar_rows
+
+    get_stop_words()  # load the stopword corpus outside the timed region
+    content = df["content"]
+    n = len(content) * repeat
+
+    per_row_seconds = 0.0
+    vectorised_seconds = 0.0
+    for _ in range(repeat):
+        per_row, seconds = timed(content.apply, preprocess_text)
+        per_row_seconds += seconds
+        vectorised, seconds = timed(preprocess_text_series, content)
+        vectorised_seconds += seconds
+
+    print(f"Texts:                 {n} ({len(get_stop_words())} stopwords)")
+    print(f"Per row (apply):       {n / per_row_seconds:10.1f} texts/s ({per_row_seconds:.2f}s)")
+    print(f"Vectorised (Arrow):   {n / vectorised_seconds:10.1f} texts/s ({vectorised_seconds:.2f}s)")
+    print(f"Speed-up:              {per_row_seconds / vectorised_seconds:10.2f}x")
+    print(f"Identical output:      {per_row.tolist() == vectorised.tolist()}")
+
+    n = len(duplicates) * repeat
+    per_row_seconds = 0.0
+    vectorised_seconds = 0.0
+    for _ in range(repeat):
+        per_row, seconds = timed(remove_similar_rows, duplicates, normaliser="per_row")
+        per_row_seconds += seconds
+        vectorised, seconds = timed(remove_similar_rows, duplicates, normaliser="vectorised")
+        vectorised_seconds += seconds
+
+    print(f"Articles (dedup):      {n} ({duplicates['head'].nunique()} stories)")
+    print(f"Per row (dedup):       {n / per_row_seconds:10.1f} articles/s ({per_row_seconds:.2f}s)")
+    print(f"Vectorised (dedup):    {n / vectorised_seconds:10.1f} articles/s ({vectorised_seconds:.2f}s)")
+    print(f"Speed-up:              {per_row_seconds / vectorised_seconds:10.2f}x")
+    print(f"Identical output:      {sorted(per_row['id']) == sorted(vectorised['id'])}")
+
+
+def split_text_per_sentence(text, max_length, tokenize):
+    """
+    The former split_text_sentencewise: tokenize with the given function, then split every
+    sentence again to count its words.
+    """
+    chunks, current_chunk, current_length = [], [], 0
+    for sentence in tokenize(text):
+        sentence_length = len(sentence.split())
+        if current_length + sentence_length > max_length:
+            if current_chunk:
+                chunks.append(' '.join(current_chunk))
+            current_chunk = [sentence]
+            current_length = sentence_length
+        else:
+            current_chunk.append(sentence)
+            current_length += sentence_length
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+    return chunks
+
+
+def bench_split(df, chunk_size, max_chunks, repeat):
+    """
+    Compare per-text nltk.sent_tokenize followed by truncation to max_chunks (the former
+    process_cluster_texts) with split_each_text_sentencewise on the cached German tokenizer.
+    """
+    import nltk
+    from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+    import content_to_relevant_titles as titles
+
+    try:
+        nltk.data.find("tokenizers/punkt_tab/german")
+        tokenize = nltk.sent_tokenize
+    except LookupError:
+        print("Punkt models not installed, both paths use an untrained Punkt tokenizer")
+        titles._SENTENCE_TOKENIZER = PunktSentenceTokenizer()
+        tokenize = titles._SENTENCE_TOKENIZER.tokenize
+    titles.get_sentence_tokenizer()  # load the model outside the timed region
+
+    texts = df["content"].tolist()
+    n = len(texts) * repeat
+
+    per_text_seconds = 0.0
+    lazy_seconds = 0.0
+    for _ in range(repeat):
+        per_text, seconds = timed(
+            lambda: [chunk for text in texts for chunk in split_text_per_sentence(text, chunk_size, tokenize)[:max_chunks]]
+        )
+        per_text_seconds += seconds
+        lazy, seconds = timed(titles.split_each_text_sentencewise, texts, chunk_size, max_chunks)
+        lazy_seconds += seconds
+
+    print(f"Texts:                 {n} ({len(lazy)} chunks of at most {chunk_size} words)")
+    print(f"Per text:              {n / per_text_seconds:10.1f} texts/s ({per_text_seconds:.2f}s)")
+    print(f"Cached, lazy:          {n / lazy_seconds:10.1f} texts/s ({lazy_seconds:.2f}s)")
+    print(f"Speed-up:              {per_text_seconds / lazy_seconds:10.2f}x")
+    print(f"Identical output:      {per_text == lazy}")
+
+
+def write_synthetic_dump(path, n_articles):
+    """
+    Write synthetic articles with HTML markup, links and entities as a Swissdox .tsv.xz dump.
+    """
+    df = synthetic_articles(n_articles)
+    df["content"] = "<p>" + df["content"] + " Mehr unter https://example.ch/dossier &amp; www.example.ch</p>"
+    df.to_csv(path, sep='\t', index=False, compression='xz')
+
+
+def read_dump_per_row(input_path):
+    """
+    Original reader: parse the whole dump, then clean the content row by row.
+    """
+    from clean_data import clean_text
+
+    df = pd.read_csv(input_path, sep='\t', compression='xz')
+    df.columns = df.columns.str.strip()
+    df["content"] = df["content"].apply(clean_text)
+    return df
+
+
+def read_dump_worker(input_path, chunksize, per_row=False):
+    """
+    Read and clean a dump in a fresh process and report its peak resident memory.
+
+    Returns:
+        tuple: (rows, seconds, peak RSS before reading in MiB, peak RSS after reading in MiB)
+    """
+    from clean_data import read_swissdox_dump
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if per_row:
+        df, seconds = timed(read_dump_per_row, input_path)
+    else:
+        df, seconds = timed(read_swissdox_dump, input_path, chunksize)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return len(df), seconds, rss_before, rss_after
+
+
+def bench_read(input_path, n_articles, chunksize):
+    """
+    Compare the original per-row reader, reading a dump at once with vectorised cleaning
+    (chunksize=None) and the streaming chunked reader of clean_data.
+
+    Each mode runs in its own process, as the peak RSS (ru_maxrss) of a process never decreases.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if not input_path:
+            input_path = os.path.join(tmp_dir, "synthetic.tsv.xz")
+            write_synthetic_dump(input_path, n_articles)
+        print(f"Input:                 {input_path} ({os.path.getsize(input_path) / 1024 ** 2:.1f} MiB compressed)")
+
+        modes = [
+            ("Whole file, per row", None, True),
+            ("Whole file, .str", None, False),
+            (f"Chunked ({chunksize}), .str", chunksize, False),
+        ]
+        for label, mode_chunksize, per_row in modes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                rows, seconds, rss_before, rss_after = executor.submit(
+                    read_dump_worker, input_path, mode_chunksize, per_row
+                ).result()
+            print(f"{label.ljust(26)} {rows / seconds:10.1f} rows/s ({seconds:.2f}s), "
+                  f"peak RSS {rss_after:.0f} MiB (+{rss_after - rss_before:.0f} MiB for {rows} rows)")
+
+
+def bench_llm(n_clusters, articles_per_cluster, latency, concurrency_per_key, n_keys, rpm_limit, tpm_limit, batching=True):
+    """
+    Compare the sequential per-cluster LLM pipeline with the asyncio pipeline against a local
+    fake Groq server (tests/fake_llm.py) that answers every request after a fixed latency.
+
+    Both pipelines share the given per-key rate limits; each starts with full buckets.
+    """
+    import nltk
+    from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+    import content_to_relevant_titles as titles
+    from rate_limiter import KeyRateLimiter
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests"))
+    from fake_llm import FakeLLM
+
+    server = FakeLLM().start()
+    server.latency = latency
+    titles.GROQ_BASE_URL = server.base_url
+    titles.TOR_ENABLED = False
+    titles.API_KEYS = [f"benchmark-key-{i}" for i in range(n_keys)]
+    titles.LLM_CONCURRENCY_PER_KEY = concurrency_per_key
+    titles.LLM_BATCHING = batching
+    titles.LLM_CACHE_ENABLED = False
+    try:
+        nltk.data.find("tokenizers/punkt_tab/german")
+    except LookupError:
+        # The benchmark measures the scheduling of the LLM calls, not sentence splitting
+        print("German Punkt model not installed, using an untrained Punkt tokenizer")
+        titles._SENTENCE_TOKENIZER = PunktSentenceTokenizer()
+
+    df = synthetic_articles(n_clusters * articles_per_cluster)
+    df['cluster_id'] = [i // articles_per_cluster for i in range(len(df))]
+    df['combined_text'] = df['head'] + ". " + df['content']
+    print(f"{n_clusters} clusters of {articles_per_cluster} articles, {latency:.2f}s latency per call, "
+          f"{n_keys} keys with {concurrency_per_key} concurrent calls each, batching {'on' if batching else 'off'}")
+
+    try:
+        for pipeline in ["sequential", "async"]:
+            titles.RATE_LIMITER = KeyRateLimiter(n_keys, rpm_limit, tpm_limit)
+            requests_before = len(server.requests)
+            server.max_in_flight = 0
+            _, seconds = timed(titles.collect_wikipedia_candidates_per_cluster, df, pipeline=pipeline)
+            print(f"{pipeline.ljust(12)} {seconds:8.2f}s for {len(server.requests) - requests_before} LLM calls "
+                  f"(at most {server.max_in_flight} in flight)")
+    finally:
+        titles.close_groq_clients()
+        server.stop()
+
+
+def bench_wiki(n_clusters, titles_per_cluster, latency, concurrency):
+    """
+    Compare title validation with one request at a time against concurrent requests, using a
+    local fake MediaWiki API (tests/fake_mediawiki.py) that answers after a fixed latency.
+    A quarter of the titles are missing and need a search.
+    """
+    import get_wiki_article
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests"))
+    from fake_mediawiki import FakeMediaWiki
+
+    server = FakeMediaWiki().start()
+    server.latency = latency
+    get_wiki_article.WIKIPEDIA_API_URL = server.api_url
+
+    cluster_topics = {}
+    for cluster in range(n_clusters):
+        titles = [f"Thema {cluster}-{i}" for i in range(titles_per_cluster)]
+        cluster_topics[cluster] = titles
+        for i, title in enumerate(titles):
+            if i % 4 == 3:
+                server.search_results[title] = [f"{title} (Artikel)"]
+                server.articles.add(f"{title} (Artikel)")
+            else:
+                server.articles.add(title)
+    print(f"{n_clusters} clusters of {titles_per_cluster} titles, {latency:.2f}s latency per request")
+
+    try:
+        expected = None
+        for label, max_requests in [("One at a time", 1), (f"Concurrent ({concurrency})", concurrency)]:
+            get_wiki_article.MAX_CONCURRENT_REQUESTS = max_requests
+            requests_before = len(server.requests)
+            results, seconds = timed(get_wiki_article.validate_wikipedia_titles, cluster_topics)
+            results = {cluster: sorted(titles) for cluster, titles in results.items()}
+            expected = expected or results
+            print(f"{label.ljust(18)} {seconds:8.2f}s for {len(server.requests) - requests_before} requests "
+                  f"(at most {server.max_in_flight} in flight), identical output: {results == expected}")
+            server.max_in_flight = 0
+    finally:
+        server.stop()
+
+
+def synthetic_records(n_days, clusters_per_day, articles_per_cluster, start_date="2025-04-01"):
+    """
+    Generate one record set per day in the layout of run_json, as loaded by load_db.
+    """
+    rng = random.Random(42)
+    first_day = pd.Timestamp(start_date)
+    datasets = []
+    for day in range(n_days):
+        date = first_day + pd.Timedelta(days=day)
+        clusters, artikel = [], []
+        for cluster in range(clusters_per_day):
+            cluster_id = f"{date:%Y%m%d}-{cluster:04d}"
+            clusters.append({
+                "cluster_id": cluster_id,
+                "wikipedia_article_names": rng.sample(SYNTHETIC_PEOPLE + SYNTHETIC_ORGS, 3),
+                "date": f"{date:%Y-%m-%d}",
+                "summary_text": f"{rng.choice(SYNTHETIC_ORGS)} berät in {rng.choice(SYNTHETIC_PLACES)} über {rng.choice(SYNTHETIC_TOPICS)}.",
+            })
+            for article in range(articles_per_cluster):
+                artikel.append({
+                    "article_id": f"{cluster_id}-{article:03d}",
+                    "cluster_id": cluster_id,
+                    "pubtime": f"{date + pd.Timedelta(minutes=rng.randrange(24 * 60)):%Y-%m-%dT%H:%M:%S}",
+                    "medium_name": rng.choice(["NZZ", "Tages-Anzeiger", "Blick", "20 Minuten", "SRF"]),
+                    "head": f"{rng.choice(SYNTHETIC_TOPICS)}: {rng.choice(SYNTHETIC_PEOPLE)} in {rng.choice(SYNTHETIC_PLACES)}",
+                    "article_link": f"https://example.ch/{cluster_id}/{article}",
+                })
+        datasets.append({"cluster": clusters, "artikel": artikel})
+    return datasets
+
+
+def bench_load(n_days, clusters_per_day, articles_per_cluster):
+    """
+    Compare the row-by-row database load with the COPY bulk load of a backfill.
+
+    Needs a PostgreSQL server (DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT). Both
+    methods load into empty tables of a scratch schema that is dropped afterwards.
+    """
+    import contextlib
+    import io
+
+    import psycopg2
+    from load_db import create_schema, load_data_batch
+
+    db_params = {
+        "dbname": os.getenv("DB_NAME", "your_database"),
+        "user": os.getenv("DB_USER", "your_username"),
+        "password": os.getenv("DB_PASSWORD", "your_password"),
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": os.getenv("DB_PORT", "5432"),
+    }
+    schema = f"load_benchmark_{os.getpid()}"
+    bench_params = {**db_params, "options": f"-c search_path={schema}"}
+    datasets = synthetic_records(n_days, clusters_per_day, articles_per_cluster)
+    n_articles = sum(len(data["artikel"]) for data in datasets)
+    print(f"{n_days} days of {clusters_per_day} clusters with {articles_per_cluster} articles "
+          f"({n_articles} articles)")
+
+    conn = psycopg2.connect(**db_params)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA {schema}")
+        with contextlib.redirect_stdout(io.StringIO()):
+            create_schema(bench_params)
+
+        counts = None
+        for method in ["rows", "copy"]:
+            with conn.cursor() as cur:
+                cur.execute(f"TRUNCATE {schema}.Artikel, {schema}.Cluster")
+            # Silence the per-record output of the row-by-row path
+            with contextlib.redirect_stdout(io.StringIO()):
+                committed, seconds = timed(load_data_batch, datasets, bench_params, method)
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT (SELECT count(*) FROM {schema}.Cluster), (SELECT count(*) FROM {schema}.Artikel)")
+                loaded = cur.fetchone()
+            counts = counts or loaded
+            print(f"{method.ljust(6)} {seconds:8.2f}s ({n_articles / seconds:,.0f} articles/s), "
+                  f"committed: {committed}, same rows: {loaded == counts}")
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark data-collector pipeline stages.')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    ner_parser = subparsers.add_parser('ner', help='Per-document NER loop vs. batched nlp.pipe')
+    ner_parser.add_argument('--input', type=str, default=None, help='Swissdox .tsv.xz dump (synthetic articles if omitted)')
+    ner_parser.add_argument('--articles', type=int, default=2000, help='Number of articles to process')
+    ner_parser.add_argument('--batch-size', type=int, default=256, help='Batch size for nlp.pipe')
+    ner_parser.add_argument('--n-process', type=int, default=1, help='Number of processes for nlp.pipe')
+
+    dedup_parser = subparsers.add_parser('dedup', help='TF-IDF vs. MinHash/LSH content deduplication')
+    dedup_parser.add_argument('--input', type=str, default=None, help='Swissdox .tsv.xz dump (synthetic duplicates if omitted)')
+    dedup_parser.add_argument('--articles', type=int, default=50000, help='Number of articles to read from --input')
+    dedup_parser.add_argument('--groups', type=int, default=20, help='Number of synthetic stories')
+    dedup_parser.add_argument('--group-size', type=int, default=300, help='Versions per synthetic story')
+    dedup_parser.add_argument('--threshold', type=float, default=0.98, help='Cosine threshold of the TF-IDF backend')
+    dedup_parser.add_argument('--jaccard-threshold', type=float, default=0.8, help='Jaccard threshold of the MinHash backend')
+
+    normalise_parser = subparsers.add_parser('normalise', help='Row-by-row vs. vectorised text normalisation')
+    normalise_parser.add_argument('--input', type=str, default=None, help='Swissdox .tsv.xz dump (synthetic articles if omitted)')
+    normalise_parser.add_argument('--articles', type=int, default=20000, help='Number of articles to normalise')
+    normalise_parser.add_argument('--groups', type=int, default=600, help='Number of synthetic stories for the dedup timing')
+    normalise_parser.add_argument('--group-size', type=int, default=5, help='Versions per synthetic story for the dedup timing')
+    normalise_parser.add_argument('--repeat', type=int, default=3, help='Number of timed repetitions')
+
+    read_parser = subparsers.add_parser('read', help='Whole-file vs. chunked reading and cleaning of a .tsv.xz dump')
+    read_parser.add_argument('--input', type=str, default=None, help='Swissdox .tsv.xz dump (synthetic dump if omitted)')
+    read_parser.add_argument('--articles', type=int, default=50000, help='Number of synthetic articles')
+    read_parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per chunk')
+
+    split_parser = subparsers.add_parser('split', help='Per-text vs. lazy sentence-wise chunking')
+    split_parser.add_argument('--input', type=str, default=None, help='Swissdox .tsv.xz dump (synthetic articles if omitted)')
+    split_parser.add_argument('--articles', type=int, default=5000, help='Number of articles to split')
+    split_parser.add_argument('--chunk-size', type=int, default=100, help='Maximum words per chunk')
+    split_parser.add_argument('--max-chunks', type=int, default=5, help='Chunks kept per article')
+    split_parser.add_argument('--repeat', type=int, default=3, help='Number of timed repetitions')
+
+    llm_parser = subparsers.add_parser('llm', help='Sequential vs. asyncio LLM fan-out against a local fake Groq server')
+    llm_parser.add_argument('--clusters', type=int, default=6, help='Number of clusters')
+    llm_parser.add_argument('--articles', type=int, default=10, help='Articles per cluster')
+    llm_parser.add_argument('--latency', type=float, default=0.2, help='Seconds the fake server takes per call')
+    llm_parser.add_argument('--concurrency-per-key', type=int, default=4, help='Concurrent calls per API key')
+    llm_parser.add_argument('--keys', type=int, default=2, help='Number of API keys')
+    llm_parser.add_argument('--rpm', type=int, default=1000, help='Requests per minute and key')
+    llm_parser.add_argument('--tpm', type=int, default=1000000, help='Tokens per minute and key')
+    llm_parser.add_argument('--no-batching', action='store_true', help='Send every chunk in its own request')
+
+    wiki_parser = subparsers.add_parser('wiki', help='Sequential vs. concurrent Wikipedia title validation against a local fake MediaWiki API')
+    wiki_parser.add_argument('--clusters', type=int, default=40, help='Number of clusters')
+    wiki_parser.add_argument('--titles', type=int, default=5, help='Title candidates per cluster')
+    wiki_parser.add_argument('--latency', type=float, default=0.1, help='Seconds the fake server takes per request')
+    wiki_parser.add_argument('--concurrency', type=int, default=4, help='Requests in flight')
+
+    load_parser = subparsers.add_parser('load', help='Row-by-row inserts vs. COPY bulk load into PostgreSQL (needs DB_* settings)')
+    load_parser.add_argument('--days', type=int, default=30, help='Number of days to load')
+    load_parser.add_argument('--clusters', type=int, default=40, help='Clusters per day')
+    load_parser.add_argument('--articles', type=int, default=25, help='Articles per cluster')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'ner':
+        bench_ner(load_articles(args.input, args.articles), args.batch_size, args.n_process)
+    elif args.benchmark == 'dedup':
+        if args.input:
+            articles = load_articles(args.input, args.articles)
+        else:
+            articles = synthetic_duplicate_articles(args.groups, args.group_size)
+        bench_dedup(articles, args.threshold, args.jaccard_threshold)
+    elif args.benchmark == 'normalise':
+        bench_normalise(load_articles(args.input, args.articles),
+                        synthetic_duplicate_articles(args.groups, args.group_size), args.repeat)
+    elif args.benchmark == 'read':
+        bench_read(args.input, args.articles, args.chunk_size)
+    elif args.benchmark == 'split':
+        bench_split(load_articles(args.input, args.articles), args.chunk_size, args.max_chunks, args.repeat)
+    elif args.benchmark == 'wiki':
+        bench_wiki(args.clusters, args.titles, args.latency, args.concurrency)
+    elif args.benchmark == 'llm':
+        bench_llm(args.clusters, args.articles, args.latency, args.concurrency_per_key, args.keys,
+                  args.rpm, args.tpm, not args.no_batching)
+    elif args.benchmark == 'load':
+        bench_load(args.days, args.clusters, args.articles)
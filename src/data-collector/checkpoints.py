@@ -0,0 +1,239 @@
+"""
+Per-date checkpoints between the stages of run.py.
+
+Every stage writes its output as a typed Parquet file under CHECKPOINT_DIR/<date>/, so a
+failed run can continue with --resume-from <stage>: the output of the previous stage is
+read back memory-mapped instead of being recomputed. The fetch stage keeps the raw
+Swissdox .tsv.xz dump as its artifact. Date directories that were not written to for
+CHECKPOINT_RETENTION_DAYS are deleted by prune_checkpoints.
+"""
+import datetime
+import os
+import shutil
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from entity_cache import CACHE_DIR
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(CACHE_DIR, "checkpoints"))
+# Checkpoints not written to for this many days are pruned after a successful load
+CHECKPOINT_RETENTION_DAYS = int(os.getenv("CHECKPOINT_RETENTION_DAYS", "14"))
+
+# Pipeline stages of run.py, in order
+STAGES = ["fetch", "clean", "cluster", "titles", "validate", "json", "load"]
+
+CLUSTER_TITLES_SCHEMA = pa.schema([
+    ("cluster_id", pa.int64()),
+    ("titles", pa.list_(pa.string())),
+    ("summary", pa.string()),
+])
+
+LOAD_SCHEMA = pa.schema([
+    ("clusters", pa.int64()),
+    ("articles", pa.int64()),
+    ("loaded_at", pa.timestamp("s")),
+])
+
+
+def checkpoint_path(stage, date, extension=".parquet", checkpoint_dir=None):
+    """
+    Path of the checkpoint of a stage for a date.
+
+    Args:
+        stage (str): One of STAGES, optionally with a suffix (e.g. "json-cluster").
+        date (datetime.date or str): The processed day.
+        extension (str): File extension. Defaults to ".parquet".
+        checkpoint_dir (str): Base directory. Defaults to CHECKPOINT_DIR.
+
+    Returns:
+        str: The path; its directory is created if necessary.
+    """
+    directory = os.path.join(checkpoint_dir or CHECKPOINT_DIR, str(date))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{stage}{extension}")
+
+
+def previous_stage(stage):
+    """
+    Return the stage whose checkpoint a run resuming from the given stage starts with.
+
+    Args:
+        stage (str): One of STAGES.
+
+    Returns:
+        str: The preceding stage, or None for the first stage.
+    """
+    position = STAGES.index(stage)
+    return STAGES[position - 1] if position > 0 else None
+
+
+def _write_table(table, path):
+    """
+    Write a table atomically, so an interrupted write never leaves a broken checkpoint.
+    """
+    temporary_path = f"{path}.tmp"
+    pq.write_table(table, temporary_path)
+    os.replace(temporary_path, path)
+
+
+def _read_table(path):
+    """
+    Read a checkpoint memory-mapped.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No checkpoint found at {path}, run the previous stage first.")
+    return pq.read_table(path, memory_map=True)
+
+
+def save_dump(file_path, date, checkpoint_dir=None):
+    """
+    Move a downloaded Swissdox dump into the checkpoint directory of its date.
+
+    Args:
+        file_path (str): Path of the downloaded .tsv.xz file.
+        date (datetime.date or str): The processed day.
+        checkpoint_dir (str): Base directory. Defaults to CHECKPOINT_DIR.
+
+    Returns:
+        str: The new path of the dump.
+    """
+    path = checkpoint_path("fetch", date, ".tsv.xz", checkpoint_dir)
+    shutil.move(file_path, path)
+    return path
+
+
+def load_dump(date, checkpoint_dir=None):
+    """
+    Return the path of the Swissdox dump checkpointed for a date.
+    """
+    path = checkpoint_path("fetch", date, ".tsv.xz", checkpoint_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No checkpoint found at {path}, run the previous stage first.")
+    return path
+
+
+def save_dataframe(df, stage, date, checkpoint_dir=None):
+    """
+    Save a DataFrame stage output (clean, cluster) as Parquet.
+    """
+    _write_table(pa.Table.from_pandas(df, preserve_index=False), checkpoint_path(stage, date, checkpoint_dir=checkpoint_dir))
+
+
+def load_dataframe(stage, date, checkpoint_dir=None):
+    """
+    Load a DataFrame stage output (clean, cluster) from its memory-mapped Parquet checkpoint.
+    """
+    return _read_table(checkpoint_path(stage, date, checkpoint_dir=checkpoint_dir)).to_pandas()
+
+
+def save_cluster_titles(stage, date, cluster_titles, cluster_summaries=None, checkpoint_dir=None):
+    """
+    Save Wikipedia titles (and optionally summaries) per cluster (titles, validate).
+
+    Args:
+        stage (str): The stage name.
+        date (datetime.date or str): The processed day.
+        cluster_titles (dict): Mapping of cluster IDs to lists of titles.
+        cluster_summaries (dict): Optional mapping of cluster IDs to summary texts.
+        checkpoint_dir (str): Base directory. Defaults to CHECKPOINT_DIR.
+    """
+    cluster_summaries = cluster_summaries or {}
+    cluster_ids = sorted(set(cluster_titles) | set(cluster_summaries))
+    table = pa.Table.from_pydict({
+        "cluster_id": [int(cluster_id) for cluster_id in cluster_ids],
+        "titles": [cluster_titles.get(cluster_id) for cluster_id in cluster_ids],
+        "summary": [cluster_summaries.get(cluster_id) for cluster_id in cluster_ids],
+    }, schema=CLUSTER_TITLES_SCHEMA)
+    _write_table(table, checkpoint_path(stage, date, checkpoint_dir=checkpoint_dir))
+
+
+def load_cluster_titles(stage, date, checkpoint_dir=None):
+    """
+    Load titles and summaries per cluster saved by save_cluster_titles.
+
+    Returns:
+        tuple: (cluster_titles, cluster_summaries); clusters without titles or summary are left out.
+    """
+    cluster_titles, cluster_summaries = {}, {}
+    for row in _read_table(checkpoint_path(stage, date, checkpoint_dir=checkpoint_dir)).to_pylist():
+        if row["titles"] is not None:
+            cluster_titles[row["cluster_id"]] = row["titles"]
+        if row["summary"] is not None:
+            cluster_summaries[row["cluster_id"]] = row["summary"]
+    return cluster_titles, cluster_summaries
+
+
+def save_records(stage, date, data, checkpoint_dir=None):
+    """
+    Save the cluster and article records (json) as one Parquet file per record type.
+
+    Args:
+        stage (str): The stage name.
+        date (datetime.date or str): The processed day.
+        data (dict): Mapping of record type ("artikel", "cluster") to lists of record dicts.
+        checkpoint_dir (str): Base directory. Defaults to CHECKPOINT_DIR.
+    """
+    for record_type, records in data.items():
+        _write_table(pa.Table.from_pylist(records), checkpoint_path(f"{stage}-{record_type}", date, checkpoint_dir=checkpoint_dir))
+
+
+def load_records(stage, date, record_types=("artikel", "cluster"), checkpoint_dir=None):
+    """
+    Load the records saved by save_records.
+
+    Returns:
+        dict: Mapping of record type to lists of record dicts.
+    """
+    return {
+        record_type: _read_table(checkpoint_path(f"{stage}-{record_type}", date, checkpoint_dir=checkpoint_dir)).to_pylist()
+        for record_type in record_types
+    }
+
+
+def save_load_summary(date, clusters, articles, checkpoint_dir=None):
+    """
+    Record that the data of a date was loaded into the database.
+    """
+    table = pa.Table.from_pydict({
+        "clusters": [clusters],
+        "articles": [articles],
+        "loaded_at": [datetime.datetime.now().replace(microsecond=0)],
+    }, schema=LOAD_SCHEMA)
+    _write_table(table, checkpoint_path("load", date, checkpoint_dir=checkpoint_dir))
+
+
+def prune_checkpoints(retention_days=None, checkpoint_dir=None, now=None):
+    """
+    Delete the checkpoint directories (dump and stage outputs) not written to within the retention period.
+
+    The age counts from the last write rather than from the processed date, so the
+    checkpoints of a backfill of old dates stay available for --resume-from.
+
+    Args:
+        retention_days (float): Days a directory is kept. Defaults to CHECKPOINT_RETENTION_DAYS.
+        checkpoint_dir (str): Base directory. Defaults to CHECKPOINT_DIR.
+        now (float): Current time as a Unix timestamp, replaceable in tests.
+
+    Returns:
+        list: Names of the deleted directories.
+    """
+    base_dir = checkpoint_dir or CHECKPOINT_DIR
+    if not os.path.isdir(base_dir):
+        return []
+    retention_days = CHECKPOINT_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = (time.time() if now is None else now) - retention_days * 86400
+
+    deleted = []
+    for name in sorted(os.listdir(base_dir)):
+        directory = os.path.join(base_dir, name)
+        if not os.path.isdir(directory):
+            continue
+        last_write = max(
+            [os.path.getmtime(directory)] + [entry.stat().st_mtime for entry in os.scandir(directory)]
+        )
+        if last_write < cutoff:
+            shutil.rmtree(directory)
+            deleted.append(name)
+    return deleted
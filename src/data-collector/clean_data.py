@@ -4,6 +4,10 @@ import re
 from url_deduplication import remove_similar_rows as rsr
 
 
+# Rows per chunk when streaming a dump; bounds the working set of decompression and parsing
+READ_CHUNK_SIZE = int(os.getenv("READ_CHUNK_SIZE", "10000"))
+
+
 # Function to clean text (remove HTML tags, URLs, and unnecessary spaces)
 def clean_text(text):
     """
@@ -24,40 +28,142 @@ def clean_text(text):
     return text
 
 
-def clean_and_process_data(folder='raw_data', similarity_threshold=0.98):
+def clean_text_series(texts):
+    """
+    Vectorised clean_text for a whole Series of texts.
+
+    Args:
+        texts (pd.Series): The texts to clean
+
+    Returns:
+        pd.Series: The cleaned texts, '' for missing values
+    """
+    texts = texts.fillna('').astype(str)
+    texts = texts.str.replace(r'<[^>]+>', ' ', regex=True)  # Remove HTML tags
+    texts = texts.str.replace(r'https?://\S+|www\.\S+', ' ', regex=True)  # Remove URLs
+    texts = texts.str.replace(r'&[a-zA-Z0-9#]+;', ' ', regex=True)  # Remove HTML entities
+    return texts.str.replace(r'\s+', ' ', regex=True).str.strip()  # Reduce multiple spaces
+
+
+def iter_swissdox_dump(file_path, chunksize=READ_CHUNK_SIZE):
+    """
+    Reads a Swissdox .tsv.xz dump chunk by chunk and cleans the "content" column of each chunk.
+
+    Memory stays bounded by chunksize only if the caller does not keep the chunks, as
+    backfill.split_dump_by_date does by writing them out per day.
+
+    Args:
+        file_path (str): Path to the .tsv.xz file.
+        chunksize (int): Rows per chunk, or None to read the whole file as one chunk.
+
+    Yields:
+        pd.DataFrame: Chunks with stripped column names and cleaned content.
+    """
+    if chunksize is None:
+        chunks = [pd.read_csv(file_path, sep='\t', compression='xz')]
+    else:
+        chunks = pd.read_csv(file_path, sep='\t', compression='xz', chunksize=chunksize)
+
+    for chunk in chunks:
+        # Clean column names (remove extra spaces)
+        chunk.columns = chunk.columns.str.strip()
+        chunk["content"] = clean_text_series(chunk["content"])
+        yield chunk
+
+
+def read_swissdox_dump(file_path, chunksize=READ_CHUNK_SIZE):
+    """
+    Reads a Swissdox .tsv.xz dump and cleans its "content" column.
+
+    With a chunksize the file is decompressed, parsed and cleaned chunk by chunk, which is
+    faster than a whole-file read. The cleaned chunks are concatenated, so the returned
+    DataFrame still holds the whole dump: deduplication compares articles across chunks.
+
+    Args:
+        file_path (str): Path to the .tsv.xz file.
+        chunksize (int): Rows per chunk, or None to read the whole file at once.
+
+    Returns:
+        pd.DataFrame: The dump with stripped column names and cleaned content.
+    """
+    return pd.concat(iter_swissdox_dump(file_path, chunksize), ignore_index=True)
+
+
+def clean_and_process_data(folder='raw_data', similarity_threshold=0.98, dedup_backend='tfidf',
+                           fingerprint_index=None, date=None, chunksize=READ_CHUNK_SIZE, file_path=None):
     """
-    Loads a .tsv.xz file from the given folder, cleans the content, removes similar articles,
-    and saves the result as a Parquet file.
+    Loads a .tsv.xz file from the given folder, cleans the content and removes similar articles.
+    run.py saves the result as the Parquet checkpoint of the clean stage.
 
     Args:
         folder (str): Path to the folder containing the .tsv.xz file.
         similarity_threshold (float): Threshold for removing similar articles (between 0 and 1).
+        dedup_backend (str): Content deduplication engine, "tfidf" or "minhash".
+        fingerprint_index (FingerprintIndex): Optional index of articles processed on earlier days.
+            Articles found in it are dropped and the remaining ones are recorded for later days.
+        date (datetime.date): The processed day. Defaults to the earliest publication date in the file.
+        chunksize (int): Rows per chunk when streaming the file, or None to read it at once.
+        file_path (str): Path of the .tsv.xz file to read instead of searching the folder.
 
     Returns:
         pd.DataFrame: The cleaned and processed DataFrame.
     """
-    # List files in the folder and filter for .tsv.xz files
-    files = [f for f in os.listdir(folder) if f.endswith('.tsv.xz')]
-    if not files:
-        raise FileNotFoundError(f"No .tsv.xz files found in the folder {folder}.")
+    if file_path is None:
+        # List files in the folder and filter for .tsv.xz files
+        files = [f for f in os.listdir(folder) if f.endswith('.tsv.xz')]
+        if not files:
+            raise FileNotFoundError(f"No .tsv.xz files found in the folder {folder}.")
+
+        # Get the path of the first found file
+        file_path = os.path.join(folder, files[0])
 
-    # Get the path of the first found file
-    file_path = os.path.join(folder, files[0])
+    # Read the CSV file and clean the "content" column
+    df = read_swissdox_dump(file_path, chunksize)
 
-    # Read the CSV file
-    df = pd.read_csv(file_path, sep='\t', compression='xz')
+    # Drop articles already processed on earlier days and remember today's
+    if fingerprint_index is not None:
+        df = drop_seen_articles(df, fingerprint_index, date)
 
-    # Clean column names (remove extra spaces)
-    df.columns = df.columns.str.strip()
+    return deduplicate_articles(df, similarity_threshold, dedup_backend)
 
-    # Clean the "content" column
-    df["content"] = df["content"].apply(clean_text)
 
+def drop_seen_articles(df, fingerprint_index, date=None):
+    """
+    Removes articles already processed on earlier days and records the remaining ones in the index.
+
+    Args:
+        df (pd.DataFrame): Articles of one day.
+        fingerprint_index (FingerprintIndex): Index of articles processed on earlier days.
+        date (datetime.date): The processed day. Defaults to the earliest publication date in df.
+
+    Returns:
+        pd.DataFrame: The articles not seen before.
+    """
+    if df.empty:
+        return df
+    if date is None:
+        date = pd.to_datetime(df['pubtime']).min().date()
+    df = df[~fingerprint_index.find_seen(df, date)].reset_index(drop=True)
+    fingerprint_index.add(df, date)
+    return df
+
+
+def deduplicate_articles(df, similarity_threshold=0.98, dedup_backend='tfidf'):
+    """
+    Removes similar articles from cleaned articles and parses their publication time.
+
+    Args:
+        df (pd.DataFrame): Articles with cleaned content.
+        similarity_threshold (float): Threshold for removing similar articles (between 0 and 1).
+        dedup_backend (str): Content deduplication engine, "tfidf" or "minhash".
+
+    Returns:
+        pd.DataFrame: The deduplicated articles.
+    """
     # Remove similar or nearly identical articles
-    df = rsr(df, similarity_threshold)
+    df = rsr(df, similarity_threshold, backend=dedup_backend)
 
     # Convert 'pubtime' to a datetime format
     df['pubtime'] = pd.to_datetime(df['pubtime'])
 
-
     return df
@@ -1,5 +1,7 @@
+import datetime
 import json
 import hashlib
+import os
 
 
 def generate_cluster_id(cluster_number: str, date: str) -> str:
@@ -16,50 +18,106 @@ def generate_cluster_id(cluster_number: str, date: str) -> str:
     return hashlib.sha256(raw_id.encode()).hexdigest()
 
 
-def generate_cluster_json(filtered_df, cluster_topics, cluster_summaries) -> str:
+def _column_values(df, column, default=None):
     """
-    Transforms the filtered DataFrame into a structured JSON format for clustering data.
+    Returns a column as a list with missing values as None, or the default for every row if the column is absent.
+    """
+    if column not in df:
+        return [default] * len(df)
+    values = df[column].astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def generate_cluster_records(filtered_df, cluster_topics, cluster_summaries) -> dict:
+    """
+    Transforms the filtered DataFrame into the cluster and article records loaded into the database.
+
+    The records keep their Python types (datetime.date, datetime.datetime and lists of titles),
+    so they can be loaded or checkpointed directly without a JSON round trip.
 
     :param filtered_df: A DataFrame containing cluster data with article information
     :param cluster_topics: A dictionary mapping cluster IDs to lists of relevant Wikipedia article names
     :param cluster_summaries: A dictionary mapping cluster IDs to summary texts
+    :return: A dictionary with the "artikel" and "cluster" record lists, ordered by cluster
+    """
+    df = filtered_df.sort_values("cluster_id", kind="stable")
+    publication_date = filtered_df["pubtime"].iloc[0].date()
+
+    cluster_records = []
+    hashed_cluster_ids = {}
+    for cluster_id in df["cluster_id"].unique():
+        hashed_cluster_id = generate_cluster_id(str(cluster_id), publication_date.strftime('%Y-%m-%d'))
+        hashed_cluster_ids[cluster_id] = hashed_cluster_id
+        cluster_records.append({
+            "cluster_id": hashed_cluster_id,
+            "wikipedia_article_names": cluster_topics.get(cluster_id, []),
+            "date": publication_date,
+            "summary_text": cluster_summaries.get(cluster_id, None)  # Get summary for this cluster
+        })
+
+    # Timestamps are stored without time zone and to the second
+    pubtimes = df["pubtime"]
+    if pubtimes.dt.tz is not None:
+        pubtimes = pubtimes.dt.tz_localize(None)
+    columns = {
+        "article_id": df["id"].astype(str).tolist(),
+        "cluster_id": df["cluster_id"].map(hashed_cluster_ids).tolist(),
+        "pubtime": list(pubtimes.dt.floor("s").dt.to_pydatetime()),
+        "medium_name": _column_values(df, "medium_name"),
+        "head": _column_values(df, "head"),
+        "article_link": _column_values(df, "article_link", ""),
+        "content": _column_values(df, "content", ""),
+    }
+    artikel_records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    return {
+        "artikel": artikel_records,
+        "cluster": cluster_records
+    }
+
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%dT%H:%M:%S')
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def records_to_json(records) -> str:
+    """
+    Serialises cluster and article records to the JSON format read by load_db.parse_json_input.
+
+    :param records: A dictionary with the "artikel" and "cluster" record lists
     :return: A JSON-formatted string representing the cluster data
     """
-    cluster_data = {}
-    artikel_data = []
-    publication_date = filtered_df["pubtime"].iloc[0].strftime('%Y-%m-%d')
+    return json.dumps(records, indent=4, ensure_ascii=False, default=_json_default)
 
 
+def write_cluster_json(records, path):
+    """
+    Writes cluster and article records to a JSON file, e.g. as an artifact of a run.
 
-    for cluster_id in sorted(filtered_df["cluster_id"].unique()):
-        hashed_cluster_id = generate_cluster_id(str(cluster_id), str(publication_date))
-        cluster_entries = filtered_df[filtered_df['cluster_id'] == cluster_id]
-        wikipedia_article_names = cluster_topics.get(cluster_id, [])
-        summary_text = cluster_summaries.get(cluster_id, None)  # Get summary for this cluster
+    :param records: A dictionary with the "artikel" and "cluster" record lists
+    :param path: Path of the JSON file; missing directories are created
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(records_to_json(records))
 
-        cluster_data[hashed_cluster_id] = {
-            "cluster_id": hashed_cluster_id,
-            "wikipedia_article_names": wikipedia_article_names,
-            "date": publication_date,
-            "summary_text": summary_text
-        }
-
-        for _, row in cluster_entries.iterrows():
-            artikel_data.append({
-                "article_id": str(row["id"]),
-                "cluster_id": hashed_cluster_id,
-                "pubtime": row["pubtime"].strftime('%Y-%m-%dT%H:%M:%S'),
-                "medium_name": row["medium_name"],
-                "head": row["head"],
-                "article_link": row.get("article_link", ""),
-                "content": row.get("content", "")
-            })
-
-    json_data = {
-        "artikel": artikel_data,
-        "cluster": list(cluster_data.values())
-    }
-    return json.dumps(json_data, indent=4, ensure_ascii=False)
+
+def generate_cluster_json(filtered_df, cluster_topics, cluster_summaries) -> str:
+    """
+    Transforms the filtered DataFrame into a structured JSON format for clustering data.
+
+    :param filtered_df: A DataFrame containing cluster data with article information
+    :param cluster_topics: A dictionary mapping cluster IDs to lists of relevant Wikipedia article names
+    :param cluster_summaries: A dictionary mapping cluster IDs to summary texts
+    :return: A JSON-formatted string representing the cluster data
+    """
+    return records_to_json(generate_cluster_records(filtered_df, cluster_topics, cluster_summaries))
 
 
 if __name__ == "__main__":
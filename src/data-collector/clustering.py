@@ -1,98 +1,324 @@
+import os
+import numpy as np
 import pandas as pd
-import spacy
 import sys
 import subprocess
 from collections import Counter
+from functools import partial
+from entity_cache import article_cache_key, get_model_version
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
-def setup_spacy_model(model_name="de_core_news_md"):
+# spaCy model name or path of a baked pipeline directory (see bake_spacy_model)
+SPACY_MODEL = os.getenv("SPACY_MODEL", "de_core_news_md")
+# Disable to fail fast instead of running "spacy download" when the model is missing
+SPACY_ALLOW_DOWNLOAD = os.getenv("SPACY_ALLOW_DOWNLOAD", "true").lower() == "true"
+
+# Batch settings for entity extraction with nlp.pipe
+NER_BATCH_SIZE = 256
+NER_N_PROCESS = 1
+
+# Number of TF-IDF rows compared per block when building the sparse similarity graph
+SIMILARITY_BLOCK_SIZE = 256
+
+# Loaded on first use by get_nlp()
+_nlp = None
+
+
+def setup_spacy_model(model_name=SPACY_MODEL, allow_download=SPACY_ALLOW_DOWNLOAD):
     """
     Load a spaCy language model, downloading it if not already available.
 
     Args:
-        model_name (str): Name of the spaCy model to load. Defaults to "de_core_news_md".
+        model_name (str): Name or path of the spaCy model to load. Defaults to SPACY_MODEL.
+        allow_download (bool): Whether a missing model may be installed with "spacy download".
+                               Defaults to SPACY_ALLOW_DOWNLOAD.
 
     Returns:
         spacy.language.Language: The loaded spaCy language model.
+
+    Raises:
+        OSError: If the model is missing and downloading is not allowed.
     """
+    import spacy
+
     try:
         nlp = spacy.load(model_name)
     except OSError:
+        if not allow_download:
+            raise
         subprocess.check_call([sys.executable, "-m", "spacy", "download", model_name])
         nlp = spacy.load(model_name)
     return nlp
 
-nlp = setup_spacy_model("de_core_news_md")
-german_stop_words = list(nlp.Defaults.stop_words)
 
-def identify_and_save_daily_events_to_df(
-    df, max_events=7, similarity_threshold=0.35, min_entity_importance=3, min_articles=2
-):
+def get_nlp():
     """
-    Identifies daily events from a dataframe of news articles by clustering similar articles
-    and extracting important entities.
+    Return the shared spaCy pipeline, loading it on first use.
+
+    Returns:
+        spacy.language.Language: The loaded spaCy language model.
+    """
+    global _nlp
+    if _nlp is None:
+        _nlp = setup_spacy_model()
+    return _nlp
+
+
+def get_german_stop_words():
+    """
+    Return spaCy's German stop words without loading a trained pipeline.
+
+    Returns:
+        list: German stop words for the TF-IDF vectorizer.
+    """
+    from spacy.lang.de.stop_words import STOP_WORDS
+    return list(STOP_WORDS)
+
+
+def bake_spacy_model(output_dir, model_name=SPACY_MODEL):
+    """
+    Save a copy of the model that only contains the components needed for NER.
+
+    Used at image build time; point SPACY_MODEL at output_dir to load the smaller pipeline.
 
     Args:
-        df (pd.DataFrame): Dataframe containing news articles with 'head', 'content', 'id',
-                          'pubtime', 'medium_name', and optionally 'article_link' columns.
-        max_events (int): Maximum number of events/clusters to identify. Defaults to 7.
-        similarity_threshold (float): Minimum cosine similarity for articles to be considered
-                                     in the same cluster. Defaults to 0.35.
-        min_entity_importance (int): Minimum importance score for entities to consider a
-                                    cluster valid. Defaults to 3.
-        min_articles (int): Minimum number of articles required to form a valid cluster.
-                          Defaults to 2.
+        output_dir (str): Directory to write the pipeline to.
+        model_name (str): Name or path of the spaCy model to bake. Defaults to SPACY_MODEL.
+    """
+    nlp_model = setup_spacy_model(model_name)
+    for name in get_ner_disabled_pipes(nlp_model):
+        nlp_model.remove_pipe(name)
+    nlp_model.to_disk(output_dir)
+    print(f"Baked spaCy pipeline {nlp_model.pipe_names} to {output_dir}")
+
+
+def get_ner_disabled_pipes(nlp_model):
+    """
+    Determine which pipeline components can be disabled for named-entity recognition.
+
+    Components are kept if they assign doc.ents (e.g. "ner" or an entity ruler) or if an
+    entity component listens to them (e.g. a shared tok2vec layer).
+
+    Args:
+        nlp_model (spacy.language.Language): The loaded spaCy pipeline.
 
     Returns:
-        pd.DataFrame: A dataframe with articles grouped by clusters, containing columns:
-                     'id', 'cluster_id', 'pubtime', 'medium_name', 'article_link',
-                     'head', 'content', and 'combined_text'.
+        list: Names of the components that are not needed to produce doc.ents.
+    """
+    entity_pipes = {
+        name for name in nlp_model.pipe_names
+        if "doc.ents" in nlp_model.get_pipe_meta(name).assigns
+    }
+    required = set(entity_pipes)
+    for name, component in nlp_model.pipeline:
+        if entity_pipes & set(getattr(component, "listening_components", [])):
+            required.add(name)
+    return [name for name in nlp_model.pipe_names if name not in required]
+
+
+def count_entities(headline_entities, content_entities):
+    """
+    Weight the entities of an article: headline mentions count 3, content mentions count 1.
+
+    Args:
+        headline_entities (iterable): Entity texts found in the headline.
+        content_entities (iterable): Entity texts found in the content.
+
+    Returns:
+        dict: Mapping of entity text to its weighted count.
+    """
+    entities = {}
+    for text in headline_entities:
+        if len(text) > 2:
+            entities[text] = entities.get(text, 0) + 3
+    for text in content_entities:
+        if len(text) > 2:
+            entities[text] = entities.get(text, 0) + 1
+    return entities
+
+
+def extract_entities_sequential(headlines, contents):
     """
-    article_entities = []
-    headline_texts = []
-    content_texts = []
+    Extract weighted entities by running the full spaCy pipeline on one document at a time.
+
+    Args:
+        headlines (list): Article headlines.
+        contents (list): Article contents, aligned with headlines.
 
-    for _, row in df.iterrows():
-        headline = row['head']
-        content_brief = row['content']
-        headline_texts.append(headline)
-        content_texts.append(content_brief)
-        entities = {}
+    Returns:
+        list: One entity count dict per article (see count_entities).
+    """
+    nlp = get_nlp()
+    entity_counts = []
+    for headline, content_brief in zip(headlines, contents):
         headline_doc = nlp(headline)
-        for ent in headline_doc.ents:
-            if len(ent.text) > 2:
-                entities[ent.text] = entities.get(ent.text, 0) + 3
         content_doc = nlp(content_brief)
-        for ent in content_doc.ents:
-            if len(ent.text) > 2:
-                entities[ent.text] = entities.get(ent.text, 0) + 1
-        article_entities.append({
-            'headline': headline,
-            'content': content_brief,
-            'entities': entities
-        })
+        entity_counts.append(count_entities(
+            [ent.text for ent in headline_doc.ents],
+            [ent.text for ent in content_doc.ents]
+        ))
+    return entity_counts
+
+
+def extract_entities_batched(headlines, contents, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    """
+    Extract weighted entities with nlp.pipe, running only the components NER depends on.
+
+    Produces the same result as extract_entities_sequential, but streams the texts through
+    spaCy in batches and optionally across several worker processes.
+
+    Args:
+        headlines (list): Article headlines.
+        contents (list): Article contents, aligned with headlines.
+        batch_size (int): Number of texts per spaCy batch. Defaults to NER_BATCH_SIZE.
+        n_process (int): Number of worker processes used by nlp.pipe. Defaults to NER_N_PROCESS.
+
+    Returns:
+        list: One entity count dict per article (see count_entities).
+    """
+    nlp = get_nlp()
+    disabled = get_ner_disabled_pipes(nlp)
+
+    def entity_texts(texts):
+        docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disabled)
+        return [[ent.text for ent in doc.ents] for doc in docs]
+
+    headline_entities = entity_texts(headlines)
+    content_entities = entity_texts(contents)
+    return [count_entities(h, c) for h, c in zip(headline_entities, content_entities)]
 
-    combined_texts = [f"{h} {c}" for h, c in zip(headline_texts, content_texts)]
-    vectorizer = TfidfVectorizer(max_features=5000, stop_words=german_stop_words)
-    tfidf_matrix = vectorizer.fit_transform(combined_texts)
-    similarity_matrix = cosine_similarity(tfidf_matrix)
 
+def extract_entities(headlines, contents, ner_mode="pipe", batch_size=NER_BATCH_SIZE,
+                     n_process=NER_N_PROCESS, entity_cache=None):
+    """
+    Extract weighted entities for all articles, consulting the entity cache if one is given.
+
+    Only articles whose headline and content have not been seen with the current model are
+    sent through spaCy; identical articles within the batch are processed once.
+
+    Args:
+        headlines (list): Article headlines.
+        contents (list): Article contents, aligned with headlines.
+        ner_mode (str): "pipe" for extract_entities_batched, "loop" for extract_entities_sequential.
+        batch_size (int): Batch size for nlp.pipe in "pipe" mode.
+        n_process (int): Number of processes for nlp.pipe in "pipe" mode.
+        entity_cache (EntityCache): Optional on-disk cache of previously extracted entities.
+
+    Returns:
+        list: One entity count dict per article (see count_entities).
+    """
+    if ner_mode == "pipe":
+        extractor = partial(extract_entities_batched, batch_size=batch_size, n_process=n_process)
+    elif ner_mode == "loop":
+        extractor = extract_entities_sequential
+    else:
+        raise ValueError(f"Unknown ner_mode '{ner_mode}'. Use 'pipe' or 'loop'.")
+
+    if entity_cache is None:
+        return extractor(headlines, contents)
+
+    model_version = get_model_version(get_nlp())
+    keys = [article_cache_key(h, c, model_version) for h, c in zip(headlines, contents)]
+    cached = entity_cache.get_many(keys)
+
+    missing = {}
+    for i, key in enumerate(keys):
+        if key not in cached and key not in missing:
+            missing[key] = i
+    if missing:
+        positions = list(missing.values())
+        extracted = extractor([headlines[i] for i in positions], [contents[i] for i in positions])
+        new_entries = dict(zip(missing.keys(), extracted))
+        entity_cache.put_many(new_entries)
+        cached.update(new_entries)
+
+    print(f"Entity cache: {len(keys) - len(missing)} of {len(keys)} articles served from cache")
+    return [cached[key] for key in keys]
+
+
+def build_similarity_graph(tfidf_matrix, similarity_threshold, block_size=SIMILARITY_BLOCK_SIZE):
+    """
+    Build a sparse graph of all article pairs whose cosine similarity exceeds the threshold.
+
+    The similarities are computed for block_size rows at a time and thresholded immediately,
+    so memory grows with the number of edges instead of with N x N.
+
+    Args:
+        tfidf_matrix (scipy.sparse.csr_matrix): TF-IDF vectors, one row per article.
+        similarity_threshold (float): Only pairs with a similarity above this value are kept.
+        block_size (int): Number of rows compared per block. Defaults to SIMILARITY_BLOCK_SIZE.
+
+    Returns:
+        scipy.sparse.csr_matrix: N x N matrix holding the similarities above the threshold,
+                                 with sorted column indices in every row.
+    """
+    blocks = []
+    for start in range(0, tfidf_matrix.shape[0], block_size):
+        block = cosine_similarity(tfidf_matrix[start:start + block_size], tfidf_matrix, dense_output=False).tocsr()
+        block.data[block.data <= similarity_threshold] = 0
+        block.eliminate_zeros()
+        blocks.append(block)
+    if not blocks:
+        return sparse.csr_matrix((0, 0))
+    graph = sparse.vstack(blocks, format="csr")
+    graph.sort_indices()
+    return graph
+
+
+def get_similar_candidates(similarity_matrix, idx, similarity_threshold):
+    """
+    Return the indices of all articles more similar to article idx than the threshold.
+
+    Args:
+        similarity_matrix (np.ndarray or scipy.sparse.csr_matrix): Dense similarity matrix or
+                                                                 sparse graph from build_similarity_graph.
+        idx (int): Row of the article to look up.
+        similarity_threshold (float): Minimum cosine similarity (exclusive).
+
+    Returns:
+        np.ndarray: Column indices in ascending order (may include idx itself).
+    """
+    if sparse.issparse(similarity_matrix):
+        row = slice(similarity_matrix.indptr[idx], similarity_matrix.indptr[idx + 1])
+        return similarity_matrix.indices[row][similarity_matrix.data[row] > similarity_threshold]
+    return np.flatnonzero(similarity_matrix[idx] > similarity_threshold)
+
+
+def group_similar_articles(article_entities, similarity_matrix, similarity_threshold, min_entity_importance, min_articles):
+    """
+    Greedily group similar articles into events, starting with the most entity-rich articles.
+
+    Articles already assigned to a group are tracked in a boolean mask, so each step only
+    filters the candidate row of the similarity matrix instead of scanning all articles.
+    Members of a group rejected for lack of entities are released again; the seed article
+    stays used.
+
+    Args:
+        article_entities (list): One dict per article with 'headline', 'content' and 'entities'.
+        similarity_matrix (np.ndarray or scipy.sparse.csr_matrix): Pairwise article similarities.
+        similarity_threshold (float): Minimum cosine similarity for articles to be grouped.
+        min_entity_importance (int): Minimum count of the most important entity in a group.
+        min_articles (int): Minimum number of articles in a group.
+
+    Returns:
+        list: Event group dicts with 'main_entities', 'articles', 'article_indices',
+              'article_count', 'entity_counts' and 'importance_score'.
+    """
     event_groups = []
-    used_indices = set()
-    article_importance = [(i, len(article['entities'])) for i, article in enumerate(article_entities)]
-    article_importance.sort(key=lambda x: x[1], reverse=True)
+    used = np.zeros(len(article_entities), dtype=bool)
+    entity_counts = np.array([len(article['entities']) for article in article_entities])
+    article_order = np.argsort(-entity_counts, kind='stable')
 
-    for idx, _ in article_importance:
-        if idx in used_indices:
+    for idx in article_order.tolist():
+        if used[idx]:
             continue
-        similar_indices = [idx]
-        used_indices.add(idx)
-        for other_idx in range(len(article_entities)):
-            if other_idx != idx and other_idx not in used_indices:
-                if similarity_matrix[idx, other_idx] > similarity_threshold:
-                    similar_indices.append(other_idx)
-                    used_indices.add(other_idx)
+        candidates = get_similar_candidates(similarity_matrix, idx, similarity_threshold)
+        candidates = candidates[~used[candidates] & (candidates != idx)]
+        used[idx] = True
+        used[candidates] = True
+        similar_indices = [idx] + candidates.tolist()
         if len(similar_indices) >= min_articles:
             group_entities = Counter()
             group_articles = []
@@ -102,13 +328,11 @@ def identify_and_save_daily_events_to_df(
                 for entity, count in article['entities'].items():
                     group_entities[entity] += count
             if not group_entities:
-                for idx in similar_indices[1:]:
-                    used_indices.remove(idx)
+                used[candidates] = False
                 continue
             most_important_entity_count = group_entities.most_common(1)[0][1] if group_entities else 0
             if most_important_entity_count < min_entity_importance:
-                for idx in similar_indices[1:]:
-                    used_indices.remove(idx)
+                used[candidates] = False
                 continue
             main_entities = [entity for entity, _ in group_entities.most_common(5)]
             event_groups.append({
@@ -120,6 +344,72 @@ def identify_and_save_daily_events_to_df(
                 'importance_score': most_important_entity_count * len(similar_indices)
             })
 
+    return event_groups
+
+
+def identify_and_save_daily_events_to_df(
+    df, max_events=7, similarity_threshold=0.35, min_entity_importance=3, min_articles=2,
+    ner_mode="pipe", batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS, similarity_backend="sparse",
+    entity_cache=None
+):
+    """
+    Identifies daily events from a dataframe of news articles by clustering similar articles
+    and extracting important entities.
+
+    Args:
+        df (pd.DataFrame): Dataframe containing news articles with 'head', 'content', 'id',
+                          'pubtime', 'medium_name', and optionally 'article_link' columns.
+        max_events (int): Maximum number of events/clusters to identify. Defaults to 7.
+        similarity_threshold (float): Minimum cosine similarity for articles to be considered
+                                     in the same cluster. Defaults to 0.35.
+        min_entity_importance (int): Minimum importance score for entities to consider a
+                                    cluster valid. Defaults to 3.
+        min_articles (int): Minimum number of articles required to form a valid cluster.
+                          Defaults to 2.
+        ner_mode (str): "pipe" extracts entities in batches with nlp.pipe and only the NER
+                        components enabled, "loop" runs the full pipeline per document.
+                        Both produce the same entities. Defaults to "pipe".
+        batch_size (int): Batch size for nlp.pipe in "pipe" mode. Defaults to NER_BATCH_SIZE.
+        n_process (int): Number of processes for nlp.pipe in "pipe" mode. Defaults to NER_N_PROCESS.
+        similarity_backend (str): "sparse" builds a thresholded neighbour graph blockwise
+                                  (memory grows with the number of similar pairs), "dense"
+                                  computes the full N x N cosine matrix. Both yield the same
+                                  clusters. Defaults to "sparse".
+        entity_cache (EntityCache): Optional on-disk entity cache; articles already in the
+                                    cache for the current model skip NER. Defaults to None.
+
+    Returns:
+        pd.DataFrame: A dataframe with articles grouped by clusters, containing columns:
+                     'id', 'cluster_id', 'pubtime', 'medium_name', 'article_link',
+                     'head', 'content', and 'combined_text'.
+    """
+    headline_texts = df['head'].tolist()
+    content_texts = df['content'].tolist()
+
+    entity_counts = extract_entities(
+        headline_texts, content_texts, ner_mode=ner_mode, batch_size=batch_size,
+        n_process=n_process, entity_cache=entity_cache
+    )
+
+    article_entities = [
+        {'headline': headline, 'content': content_brief, 'entities': entities}
+        for headline, content_brief, entities in zip(headline_texts, content_texts, entity_counts)
+    ]
+
+    combined_texts = [f"{h} {c}" for h, c in zip(headline_texts, content_texts)]
+    vectorizer = TfidfVectorizer(max_features=5000, stop_words=get_german_stop_words())
+    tfidf_matrix = vectorizer.fit_transform(combined_texts)
+    if similarity_backend == "sparse":
+        similarity_matrix = build_similarity_graph(tfidf_matrix, similarity_threshold)
+    elif similarity_backend == "dense":
+        similarity_matrix = cosine_similarity(tfidf_matrix)
+    else:
+        raise ValueError(f"Unknown similarity_backend '{similarity_backend}'. Use 'sparse' or 'dense'.")
+
+    event_groups = group_similar_articles(
+        article_entities, similarity_matrix, similarity_threshold, min_entity_importance, min_articles
+    )
+
     event_groups.sort(key=lambda x: x['importance_score'], reverse=True)
 
     # Build outputs: one row per article, including 'id' and 'combined_text'
@@ -140,3 +430,14 @@ def identify_and_save_daily_events_to_df(
 
     cluster_df = pd.DataFrame(cluster_rows)
     return cluster_df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='spaCy model utilities for the clustering stage.')
+    parser.add_argument('--bake-model', type=str, required=True, help='Directory to save the NER-only pipeline to')
+    parser.add_argument('--model', type=str, default=SPACY_MODEL, help='spaCy model to bake')
+    args = parser.parse_args()
+
+    bake_spacy_model(args.bake_model, args.model)
@@ -1,18 +1,20 @@
+import asyncio
+import atexit
 import concurrent.futures
+import functools
 import json
 import os
 import random
 import re
+import threading
 import groq
+import httpx
 import nltk
 from dotenv import load_dotenv
 import logging
 
-# --- NEW: Tor/proxy imports ---
-import requests
-import socks
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from llm_cache import LLMCache, llm_cache_key
+from rate_limiter import KeyRateLimiter, estimate_tokens
 
 # Constants
 MAX_WORKERS = 3
@@ -25,6 +27,29 @@ RETRY_TEXT_LENGTH = 1500
 # --- NEW: Tor SOCKS proxy base port ---
 TOR_BASE_PORT = 9050  # First Tor instance on 9050, next on 9052, etc.
 TOR_PORT_STEP = 2     # Each Tor instance uses a separate port (9050, 9052, 9054, ...)
+# Off by default: the containers run no Tor instances, so Groq is called directly
+TOR_ENABLED = os.getenv("TOR_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# German Punkt tokenizer, see get_sentence_tokenizer
+_SENTENCE_TOKENIZER = None
+
+# Concurrent LLM calls per usable API key in the asyncio pipeline
+LLM_CONCURRENCY_PER_KEY = int(os.getenv("LLM_CONCURRENCY_PER_KEY", "4"))
+# "async" (all clusters at once) or "sequential" (one cluster after another)
+LLM_PIPELINE = os.getenv("LLM_PIPELINE", "async")
+
+# Pack several chunks into one summary request, up to this many estimated prompt tokens
+LLM_BATCHING = os.getenv("LLM_BATCHING", "true").lower() in ("1", "true", "yes")
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "2000"))
+LLM_BATCH_MAX_CHUNKS = int(os.getenv("LLM_BATCH_MAX_CHUNKS", "6"))
+BATCH_TOKENS_PER_CHUNK = 150  # Completion budget per chunk of a batched request
+
+# Groq HTTP client settings; one long-lived client and connection pool per API key
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL") or None  # None uses the SDK default
+GROQ_TIMEOUT = 60
+GROQ_MAX_CONNECTIONS = 10
+# Base pause in seconds of a key after a timeout, connection or server error, doubled per repeat
+TRANSIENT_ERROR_BACKOFF = 1.0
 
 # Setup logging
 logging.basicConfig(level=logging.INFO,
@@ -40,7 +65,21 @@ API_KEYS = [key.strip() for key in raw_api_keys.split(",") if key.strip()]
 
 # Track permanently failed keys
 BLACKLISTED_KEYS = set()
-CURRENT_KEY_INDEX = 0
+_KEYS_LOCK = threading.Lock()
+
+# Requests- and tokens-per-minute budget of every key, see get_rate_limiter
+RATE_LIMITER = None
+
+# Persistent cache of chunk and cluster summaries, see get_llm_cache
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE = None
+_LLM_CACHE_LOCK = threading.Lock()
+
+# Pooled Groq clients and their connection statistics by key index
+GROQ_CLIENTS = {}
+CONNECTION_STATS = {}
+_CLIENTS_LOCK = threading.Lock()
+_STATS_LOCK = threading.Lock()
 
 def show_api_keys():
     """
@@ -52,122 +91,221 @@ def show_api_keys():
 
 os.environ["TOKENIZERS_PARALLELISM"] = "true"
 
-def get_next_valid_key_index():
+def get_rate_limiter():
     """
-    Get the next valid API key index, skipping any blacklisted keys.
+    Return the rate limiter of the API keys, creating it on first use.
 
     Returns:
-        int or None: The index of the next valid API key, or None if no valid keys are available.
+        KeyRateLimiter: Requests- and tokens-per-minute buckets for every key in API_KEYS.
     """
-    global CURRENT_KEY_INDEX
+    global RATE_LIMITER
+    with _KEYS_LOCK:
+        if RATE_LIMITER is None or RATE_LIMITER.num_keys != len(API_KEYS):
+            RATE_LIMITER = KeyRateLimiter(len(API_KEYS))
+        return RATE_LIMITER
 
-    if len(BLACKLISTED_KEYS) >= len(API_KEYS):
-        logger.error("All API keys are blacklisted! Unable to proceed.")
-        return None
 
-    # Start from the next key after the current one
-    start_index = CURRENT_KEY_INDEX
-    while True:
-        # Move to next key
-        CURRENT_KEY_INDEX = (CURRENT_KEY_INDEX + 1) % len(API_KEYS)
+def blacklist_key(key_index):
+    """
+    Permanently stop using an API key.
+
+    Args:
+        key_index (int): Index of the key in API_KEYS.
+    """
+    with _KEYS_LOCK:
+        BLACKLISTED_KEYS.add(key_index)
+    logger.warning(f"API key {key_index + 1} has been permanently blacklisted due to organization restriction")
 
-        # If we've cycled through all keys and back to where we started, no valid keys
-        if CURRENT_KEY_INDEX == start_index and CURRENT_KEY_INDEX in BLACKLISTED_KEYS:
-            return None
 
-        # If key is not blacklisted, use it
-        if CURRENT_KEY_INDEX not in BLACKLISTED_KEYS:
-            return CURRENT_KEY_INDEX
+def get_sentence_tokenizer():
+    """
+    Return the German Punkt sentence tokenizer, loaded once per process.
+
+    Uses the punkt_tab model (NLTK >= 3.8.2) and falls back to the pickled punkt model of older versions.
+
+    Returns:
+        nltk.tokenize.punkt.PunktSentenceTokenizer: The tokenizer.
+    """
+    global _SENTENCE_TOKENIZER
+    if _SENTENCE_TOKENIZER is None:
+        try:
+            from nltk.tokenize.punkt import PunktTokenizer
+            _SENTENCE_TOKENIZER = PunktTokenizer("german")
+        except ImportError:
+            _SENTENCE_TOKENIZER = nltk.data.load("tokenizers/punkt/german.pickle")
+    return _SENTENCE_TOKENIZER
+
 
-def split_text_sentencewise(text, max_length=CHUNK_SIZE):
+def split_text_sentencewise(text, max_length=CHUNK_SIZE, max_chunks=None):
     """
     Split text into sentence-wise chunks within word count limit.
 
+    Sentences are sliced from the spans of a single pass of the cached German tokenizer, which
+    runs lazily: once max_chunks chunks are complete, the rest of the text is not tokenized.
+    Words are counted by splitting each sentence on whitespace.
+
     Args:
         text (str): The text to split into chunks.
         max_length (int): Maximum number of words per chunk. Defaults to CHUNK_SIZE.
+        max_chunks (int): Return at most this many chunks. Defaults to None (all chunks).
 
     Returns:
         list: A list of text chunks, each containing complete sentences and not exceeding max_length.
     """
-    sentences = nltk.sent_tokenize(text)
     chunks, current_chunk, current_length = [], [], 0
 
-    for sentence in sentences:
+    for start, end in get_sentence_tokenizer().span_tokenize(text):
+        sentence = text[start:end]
         sentence_length = len(sentence.split())
         if current_length + sentence_length > max_length:
             if current_chunk:
                 chunks.append(' '.join(current_chunk))
+                if max_chunks is not None and len(chunks) >= max_chunks:
+                    return chunks
             current_chunk = [sentence]
             current_length = sentence_length
         else:
             current_chunk.append(sentence)
             current_length += sentence_length
 
-    if current_chunk:
+    if current_chunk and (max_chunks is None or len(chunks) < max_chunks):
         chunks.append(' '.join(current_chunk))
     return chunks
 
 
-def get_tor_session_for_key_index(key_index):
+def split_each_text_sentencewise(texts, max_length=CHUNK_SIZE, max_chunks=None):
+    """
+    Split each sampled text of a cluster with split_text_sentencewise, one text after the other.
+
+    A plain loop over the texts, not a batched tokenizer pass; the gain over the former code comes
+    from the cached tokenizer and from not tokenizing past max_chunks.
+
+    Args:
+        texts (list): The texts to split.
+        max_length (int): Maximum number of words per chunk. Defaults to CHUNK_SIZE.
+        max_chunks (int): Chunks to keep per text. Defaults to None (all chunks).
+
+    Returns:
+        list: All chunks, text by text in the order of the texts.
+    """
+    return [chunk for text in texts for chunk in split_text_sentencewise(text, max_length, max_chunks)]
+
+
+def get_tor_proxy_url(key_index):
     """
-    Create a requests Session that routes through a Tor SOCKS proxy for the given key index.
+    Return the URL of the Tor SOCKS proxy used for the given key index.
 
     Args:
         key_index (int): Index of the API key, used to determine which Tor port to use.
 
     Returns:
-        requests.Session: A configured Session object that routes through the appropriate Tor proxy.
+        str or None: The proxy URL, or None if TOR_ENABLED is off.
     """
-    session = requests.Session()
+    if not TOR_ENABLED:
+        return None
     tor_port = TOR_BASE_PORT + key_index * TOR_PORT_STEP
-    session.proxies = {
-        'http': f'socks5h://127.0.0.1:{tor_port}',
-        'https': f'socks5h://127.0.0.1:{tor_port}',
-    }
-    # Optional: Add retries for robustness
-    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
-    session.mount('http://', HTTPAdapter(max_retries=retries))
-    return session
-
-class PatchedGroqClient(groq.Groq):
-    """
-    A patched version of the Groq client that uses a custom session for HTTP requests.
-
-    This allows routing requests through Tor or other proxies.
-    """
-    def __init__(self, api_key, session):
-        """
-        Initialize the patched Groq client.
-
-        Args:
-            api_key (str): The Groq API key.
-            session (requests.Session): The session to use for HTTP requests.
-        """
-        super().__init__(api_key=api_key)
-        self._session = session
-
-    def _request(self, method, url, **kwargs):
-        """
-        Override the _request method to use our custom session.
-
-        Args:
-            method (str): HTTP method.
-            url (str): URL to request.
-            **kwargs: Additional keyword arguments for the request.
-
-        Returns:
-            Response: The HTTP response.
-        """
-        # Use our session for all HTTP requests
-        kwargs.setdefault('timeout', 60)
-        return self._session.request(method, url, **kwargs)
+    return f'socks5h://127.0.0.1:{tor_port}'
+
+
+def _count_connections(stats):
+    """
+    Build an httpx request hook that counts requests and the new connections they open.
+
+    Args:
+        stats (dict): Counters of one key, updated in place.
+
+    Returns:
+        callable: The request event hook.
+    """
+    def on_request(request):
+        with _STATS_LOCK:
+            stats["requests"] += 1
+
+        # httpcore reports connect_tcp for direct and SOCKS connections alike
+        def trace(event_name, info):
+            if event_name.endswith("connect_tcp.complete"):
+                with _STATS_LOCK:
+                    stats["new_connections"] += 1
+
+        request.extensions["trace"] = trace
+    return on_request
+
+
+def get_groq_client(key_index):
+    """
+    Return the long-lived Groq client of an API key, creating it on first use.
+
+    Every key gets its own httpx connection pool (routed through its own Tor instance if
+    TOR_ENABLED), so TLS and SOCKS handshakes are paid once per connection instead of once per call.
+
+    Args:
+        key_index (int): Index of the API key.
+
+    Returns:
+        groq.Groq: The client for this key.
+    """
+    with _CLIENTS_LOCK:
+        client = GROQ_CLIENTS.get(key_index)
+        if client is None:
+            stats = CONNECTION_STATS.setdefault(key_index, {"requests": 0, "new_connections": 0})
+            http_client = httpx.Client(
+                proxy=get_tor_proxy_url(key_index),
+                timeout=GROQ_TIMEOUT,
+                limits=httpx.Limits(max_connections=GROQ_MAX_CONNECTIONS, max_keepalive_connections=GROQ_MAX_CONNECTIONS),
+                event_hooks={"request": [_count_connections(stats)]},
+            )
+            # Retries are left to call_groq_api, which knows the rate limits of all keys
+            client = groq.Groq(
+                api_key=API_KEYS[key_index], base_url=GROQ_BASE_URL, http_client=http_client, max_retries=0
+            )
+            GROQ_CLIENTS[key_index] = client
+        return client
+
+
+def get_connection_stats():
+    """
+    Return connection-reuse statistics of the pooled Groq clients.
+
+    Returns:
+        dict: Per key index, the number of requests, newly opened connections and reused connections.
+    """
+    with _STATS_LOCK:
+        return {
+            key_index: {**stats, "reused_connections": stats["requests"] - stats["new_connections"]}
+            for key_index, stats in CONNECTION_STATS.items()
+        }
+
+
+def log_connection_stats():
+    """
+    Log how many Groq requests per key reused an open connection.
+    """
+    for key_index, stats in sorted(get_connection_stats().items()):
+        logger.info(
+            f"API key {key_index + 1}: {stats['requests']} requests, {stats['new_connections']} new connections, "
+            f"{stats['reused_connections']} reused"
+        )
+
+
+def close_groq_clients():
+    """
+    Close all pooled Groq clients and their connections.
+    """
+    with _CLIENTS_LOCK:
+        for client in GROQ_CLIENTS.values():
+            client.close()
+        GROQ_CLIENTS.clear()
+
+
+atexit.register(close_groq_clients)
 
 
 def call_groq_api(prompt, system_content, temperature=0.4, max_tokens=300, json_format=True):
     """
-    Call the Groq API with automatic key rotation and error handling.
+    Call the Groq API on the key with the most remaining rate-limit budget, with error handling.
+
+    The request's tokens are reserved on the rate limiter before it is sent, so keys are not
+    sent requests they would be throttled for; the call waits if all keys are at their limit.
 
     Args:
         prompt (str): The user prompt to send to the API.
@@ -179,30 +317,31 @@ def call_groq_api(prompt, system_content, temperature=0.4, max_tokens=300, json_
     Returns:
         str: The generated content from the API, or an empty string if all attempts fail.
     """
-    global CURRENT_KEY_INDEX
-
     if len(API_KEYS) == 0:
         logger.error("No API keys available. Check your GROQ_API_KEY environment variable.")
         return ""
 
+    limiter = get_rate_limiter()
+    estimated_tokens = estimate_tokens(prompt, system_content, max_tokens=max_tokens)
+
     # Track error counts for temporary rate-limiting
     rate_limit_errors = {}
-    max_errors_per_key = 3
+    transient_errors = {}
     max_total_attempts = 30  # Avoid infinite loops
     attempts = 0
 
     while attempts < max_total_attempts:
+        with _KEYS_LOCK:
+            blacklisted = set(BLACKLISTED_KEYS)
+        key_index, reserved_tokens = limiter.acquire(estimated_tokens, excluded=blacklisted)
         # If all keys are blacklisted, return empty result
-        if len(BLACKLISTED_KEYS) >= len(API_KEYS):
+        if key_index is None:
             logger.error("All API keys are blacklisted! Unable to proceed.")
             return ""
 
-        current_key = API_KEYS[CURRENT_KEY_INDEX]
-
         try:
-            # --- Use a Tor session per API key ---
-            session = get_tor_session_for_key_index(CURRENT_KEY_INDEX)
-            client = PatchedGroqClient(api_key=current_key, session=session)
+            # --- Use the pooled client (and Tor instance) of this API key ---
+            client = get_groq_client(key_index)
 
             # request completion
             completion = client.chat.completions.create(
@@ -216,57 +355,34 @@ def call_groq_api(prompt, system_content, temperature=0.4, max_tokens=300, json_
                 response_format={"type": "json_object"} if json_format else None
             )
 
-            # Reset rate limit error count on success
-            if CURRENT_KEY_INDEX in rate_limit_errors:
-                rate_limit_errors[CURRENT_KEY_INDEX] = 0
-
+            usage = getattr(completion, "usage", None)
+            limiter.settle(key_index, reserved_tokens, getattr(usage, "total_tokens", None))
             return completion.choices[0].message.content
 
         except Exception as e:
             error_msg = str(e)
-            logger.error(f"Error with API key {CURRENT_KEY_INDEX + 1} of {len(API_KEYS)}: {error_msg}")
+            logger.error(f"Error with API key {key_index + 1} of {len(API_KEYS)}: {error_msg}")
+            # The failed request used none of its tokens
+            limiter.refund(key_index, reserved_tokens)
 
             # Permanently blacklist keys with organization_restricted errors
             if "organization_restricted" in error_msg.lower() or "organization has been restricted" in error_msg.lower():
-                logger.warning(f"API key {CURRENT_KEY_INDEX + 1} has been permanently blacklisted due to organization restriction")
-                BLACKLISTED_KEYS.add(CURRENT_KEY_INDEX)
-                next_key = get_next_valid_key_index()
-                if next_key is None:
-                    break
-                logger.info(f"Switching from API key {CURRENT_KEY_INDEX + 1} to key {next_key + 1} (of {len(API_KEYS)} available keys)")
-                CURRENT_KEY_INDEX = next_key
-                continue
-
+                blacklist_key(key_index)
             # Handle rate limiting
-            if "rate limit" in error_msg.lower() or "429" in error_msg:
-                # Initialize error count for this key if not present
-                if CURRENT_KEY_INDEX not in rate_limit_errors:
-                    rate_limit_errors[CURRENT_KEY_INDEX] = 0
-
-                # Increment error count
-                rate_limit_errors[CURRENT_KEY_INDEX] = rate_limit_errors.get(CURRENT_KEY_INDEX, 0) + 1
-                logger.warning(f"Rate-limit error: API key {CURRENT_KEY_INDEX + 1} - Error count = {rate_limit_errors[CURRENT_KEY_INDEX]} (will switch after {max_errors_per_key} errors)")
-
-                # Switch key if too many rate-limit errors
-                if rate_limit_errors[CURRENT_KEY_INDEX] >= max_errors_per_key:
-                    next_key = get_next_valid_key_index()
-                    if next_key is None:
-                        break
-                    logger.info(f"Switching from API key {CURRENT_KEY_INDEX + 1} to key {next_key + 1} (of {len(API_KEYS)} available keys)")
-                    CURRENT_KEY_INDEX = next_key
-                else:
-                    # Exponential backoff for rate limits
-                    backoff = 3 * (2 ** rate_limit_errors[CURRENT_KEY_INDEX])
-                    logger.info(f"Waiting {backoff} seconds before retrying with same key...")
-                    import time
-                    time.sleep(backoff)
-            else:
-                # For other errors, try a different key
-                next_key = get_next_valid_key_index()
-                if next_key is None:
-                    break
-                logger.info(f"Switching from API key {CURRENT_KEY_INDEX + 1} to key {next_key + 1} (of {len(API_KEYS)} available keys)")
-                CURRENT_KEY_INDEX = next_key
+            elif "rate limit" in error_msg.lower() or "429" in error_msg:
+                # The limits of this key are lower than configured (or shared); rest the key
+                # with exponential backoff while the other keys take over
+                rate_limit_errors[key_index] = rate_limit_errors.get(key_index, 0) + 1
+                backoff = 3 * (2 ** rate_limit_errors[key_index])
+                logger.warning(f"Rate-limit error: API key {key_index + 1} - Error count = {rate_limit_errors[key_index]}, pausing the key for {backoff} seconds")
+                limiter.penalize(key_index, backoff)
+            # Rest the key on timeouts, connection and server errors, with jitter so that
+            # the calls of all threads do not return to it at the same moment
+            elif isinstance(e, (groq.APIConnectionError, groq.InternalServerError)):
+                transient_errors[key_index] = transient_errors.get(key_index, 0) + 1
+                backoff = TRANSIENT_ERROR_BACKOFF * (2 ** (transient_errors[key_index] - 1)) * random.uniform(0.5, 1.5)
+                logger.warning(f"Transient error: API key {key_index + 1} - Error count = {transient_errors[key_index]}, pausing the key for {backoff:.1f} seconds")
+                limiter.penalize(key_index, backoff)
 
         attempts += 1
 
@@ -274,6 +390,56 @@ def call_groq_api(prompt, system_content, temperature=0.4, max_tokens=300, json_
     return ""
 
 
+def get_llm_cache():
+    """
+    Return the LLM response cache, opening it on first use.
+
+    Returns:
+        LLMCache or None: The cache, or None if LLM_CACHE_ENABLED is off.
+    """
+    global LLM_CACHE
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _LLM_CACHE_LOCK:
+        if LLM_CACHE is None:
+            LLM_CACHE = LLMCache()
+            atexit.register(LLM_CACHE.close)
+        return LLM_CACHE
+
+
+def log_llm_cache_stats():
+    """
+    Log the hit ratio of the LLM response cache in this run.
+    """
+    cache = get_llm_cache()
+    if cache is not None:
+        cache.log_stats()
+
+
+def call_groq_api_cached(prompt, system_content, temperature=0.4, max_tokens=300, json_format=True):
+    """
+    Call the Groq API unless the same request has been answered before.
+
+    Takes the same arguments as call_groq_api. Only non-empty responses are cached.
+
+    Returns:
+        str: The cached or generated content, or an empty string if all attempts fail.
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return call_groq_api(prompt, system_content, temperature, max_tokens, json_format)
+
+    key = llm_cache_key(
+        MODEL_NAME, system_content, prompt, temperature=temperature, max_tokens=max_tokens, json_format=json_format
+    )
+    response = cache.get(key)
+    if response is None:
+        response = call_groq_api(prompt, system_content, temperature, max_tokens, json_format)
+        if response:
+            cache.put(key, response)
+    return response
+
+
 def parse_json_response(response):
     """
     Extract JSON data from API response string.
@@ -336,12 +502,126 @@ def process_text_chunk(chunk, title_focus=False):
     system_content = "Du bist ein präziser Analyst, der Texte zusammenfasst und relevante Wikipedia-Artikel findet."
     prompt = create_prompt(chunk, title_focus)
 
-    response = call_groq_api(prompt, system_content)
+    response = call_groq_api_cached(prompt, system_content)
     result = parse_json_response(response)
 
     return ("", result.get('titles', [])) if title_focus else (result.get('summary', ''), result.get('titles', []))
 
 
+def pack_chunks(chunks, token_budget=LLM_BATCH_TOKEN_BUDGET, max_chunks=LLM_BATCH_MAX_CHUNKS):
+    """
+    Group consecutive chunks into batches for process_text_chunk_group.
+
+    Args:
+        chunks (list): Text chunks.
+        token_budget (int): Maximum estimated tokens of the chunks of a batch. A chunk larger
+                            than the budget forms a batch of its own.
+        max_chunks (int): Maximum number of chunks per batch.
+
+    Returns:
+        list: Lists of chunks, in the original order.
+    """
+    batches, current, current_tokens = [], [], 0
+    for chunk in chunks:
+        tokens = estimate_tokens(chunk)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_chunks):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def create_batch_prompt(chunks):
+    """
+    Create a prompt that summarises several numbered chunks in one request.
+
+    Args:
+        chunks (list): Text chunks to analyze.
+
+    Returns:
+        str: The prompt to send to the language model.
+    """
+    numbered_chunks = "\n\n".join(f"[{number}] {chunk}" for number, chunk in enumerate(chunks, 1))
+    return (
+        "Führe für jeden der folgenden nummerierten Textabschnitte zwei Aufgaben durch:\n\n"
+        "1. Erstelle eine prägnante Zusammenfassung der Hauptpunkte in 1-2 Sätzen.\n"
+        "2. Identifiziere 2-3 relevante Wikipedia-Artikeltitel, die genau zu diesem Abschnitt passen.\n\n"
+        "Formatiere deine Antwort als JSON mit genau einem Eintrag pro Abschnitt: "
+        "{'results': [{'id': 1, 'summary': 'Deine Zusammenfassung hier', 'titles': ['Titel1', 'Titel2']}]}\n\n"
+        f"{numbered_chunks}"
+    )
+
+
+def parse_batch_response(response):
+    """
+    Extract the per-chunk results of a batched request.
+
+    Args:
+        response (str): The API response string.
+
+    Returns:
+        dict: Mapping of chunk numbers (starting at 1) to (summary, titles) for every
+              well-formed entry with a summary.
+    """
+    results = parse_json_response(response).get('results')
+    parsed = {}
+    if not isinstance(results, list):
+        return parsed
+    for entry in results:
+        if not isinstance(entry, dict):
+            continue
+        summary, titles = entry.get('summary'), entry.get('titles', [])
+        try:
+            number = int(entry.get('id'))
+        except (TypeError, ValueError):
+            continue
+        if isinstance(summary, str) and summary and isinstance(titles, list):
+            parsed[number] = (summary, [title for title in titles if isinstance(title, str)])
+    return parsed
+
+
+def process_text_chunk_group(chunks, title_focus=False):
+    """
+    Summarise a group of chunks from group_chunks with a single request.
+
+    Chunks whose result is missing or malformed in the response are processed again with
+    one request each.
+
+    Args:
+        chunks (list): Text chunks to analyze.
+        title_focus (bool): If True, focus only on extracting titles (single chunks only). Defaults to False.
+
+    Returns:
+        list: (summary, titles) per chunk, in the order of the chunks.
+    """
+    if len(chunks) == 1:
+        return [process_text_chunk(chunks[0], title_focus)]
+
+    system_content = "Du bist ein präziser Analyst, der Texte zusammenfasst und relevante Wikipedia-Artikel findet."
+    response = call_groq_api_cached(
+        create_batch_prompt(chunks), system_content, max_tokens=BATCH_TOKENS_PER_CHUNK * len(chunks)
+    )
+    parsed = parse_batch_response(response)
+
+    missing = [number for number in range(1, len(chunks) + 1) if number not in parsed]
+    if missing:
+        logger.warning(f"Batched request returned no result for {len(missing)} of {len(chunks)} chunks, retrying them one by one")
+    return [parsed.get(number) or process_text_chunk(chunk) for number, chunk in enumerate(chunks, 1)]
+
+
+def group_chunks(chunks, title_focus=False):
+    """
+    Split chunks into the groups sent per request: batches if LLM_BATCHING is on, else single chunks.
+    Title-only requests are never batched.
+    """
+    if LLM_BATCHING and not title_focus:
+        return pack_chunks(chunks)
+    return [[chunk] for chunk in chunks]
+
+
 def process_text_chunks_batch(chunks, max_workers=MAX_WORKERS, title_focus=False):
     """
     Process multiple text chunks in parallel.
@@ -357,15 +637,18 @@ def process_text_chunks_batch(chunks, max_workers=MAX_WORKERS, title_focus=False
     summaries, titles = [], []
 
     with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_chunk = {executor.submit(process_text_chunk, chunk, title_focus): chunk for chunk in chunks}
+        future_to_group = {
+            executor.submit(process_text_chunk_group, group, title_focus): group
+            for group in group_chunks(chunks, title_focus)
+        }
 
-        for future in concurrent.futures.as_completed(future_to_chunk):
+        for future in concurrent.futures.as_completed(future_to_group):
             try:
-                summary, chunk_titles = future.result()
-                if summary:
-                    summaries.append(summary)
-                if chunk_titles:
-                    titles.extend(chunk_titles)
+                for summary, chunk_titles in future.result():
+                    if summary:
+                        summaries.append(summary)
+                    if chunk_titles:
+                        titles.extend(chunk_titles)
             except Exception as e:
                 print(f"Fehler bei der Verarbeitung eines Chunks: {e}")
 
@@ -431,7 +714,8 @@ def generate_final_summary(summaries):
     if not summaries:
         return "Keine Zusammenfassung verfügbar."
 
-    selected_summaries = random.sample(summaries, min(80, len(summaries)))
+    # Sorted, so that the same summaries give the same prompt and hit the LLM cache
+    selected_summaries = sorted(random.sample(summaries, min(80, len(summaries))))
     combined_input = "\n".join(selected_summaries)
 
     system_content = "Du bist ein erfahrener Analyst, der aus mehreren kurzen Abschnitten ein stimmiges Gesamtbild erstellt."
@@ -444,11 +728,32 @@ def generate_final_summary(summaries):
         f"{combined_input}"
     )
 
-    response = call_groq_api(prompt, system_content, temperature=0.3, json_format=False)
+    response = call_groq_api_cached(prompt, system_content, temperature=0.3, json_format=False)
     return response.strip()
 
 
 
+def create_summary_titles_prompt(final_summary):
+    """
+    Create the prompt that extracts Wikipedia titles from a cluster summary.
+
+    Args:
+        final_summary (str): The cluster summary.
+
+    Returns:
+        tuple: (prompt, system_content)
+    """
+    system_content = "Du bist ein präziser Analyst, der aus einer Zusammenfassung relevante Wikipedia-Artikel findet."
+    prompt = (
+        "Analysiere diese Zusammenfassung und finde exakt passende Wikipedia-Artikeltitel.\n\n"
+        "Wichtig: Die Titel MÜSSEN existierenden Wikipedia-Artikeln entsprechen. "
+        "Verwende nur Eigennamen, Konzepte oder Ereignisse, die mit hoher Wahrscheinlichkeit als Wikipedia-Artikel existieren.\n\n"
+        "Formatiere deine Antwort als JSON: {'titles': ['Titel1', 'Titel2', 'Titel3', 'Titel4', 'Titel5']}\n\n"
+        f"{final_summary}"
+    )
+    return prompt, system_content
+
+
 def process_cluster_texts(texts, chunk_size=CHUNK_SIZE, max_texts=MAX_TEXTS_PER_CLUSTER):
     """
     First generate a summary, then use it to extract Wikipedia titles.
@@ -464,24 +769,14 @@ def process_cluster_texts(texts, chunk_size=CHUNK_SIZE, max_texts=MAX_TEXTS_PER_
     """
     sampled_texts = random.sample(texts, min(len(texts), max_texts))
 
-    # Use only the first 7 chunks per article
-    all_chunks = []
-    for text in sampled_texts:
-        chunks = split_text_sentencewise(text, max_length=chunk_size)
-        all_chunks.extend(chunks[:5])
+    # Use only the first 5 chunks per article
+    all_chunks = split_each_text_sentencewise(sampled_texts, max_length=chunk_size, max_chunks=5)
 
     chunk_summaries, _ = process_text_chunks_batch(all_chunks)
     final_summary = generate_final_summary(chunk_summaries)
 
     # Use only the summary to extract Wikipedia titles
-    system_content = "Du bist ein präziser Analyst, der aus einer Zusammenfassung relevante Wikipedia-Artikel findet."
-    prompt = (
-        "Analysiere diese Zusammenfassung und finde exakt passende Wikipedia-Artikeltitel.\n\n"
-        "Wichtig: Die Titel MÜSSEN existierenden Wikipedia-Artikeln entsprechen. "
-        "Verwende nur Eigennamen, Konzepte oder Ereignisse, die mit hoher Wahrscheinlichkeit als Wikipedia-Artikel existieren.\n\n"
-        "Formatiere deine Antwort als JSON: {'titles': ['Titel1', 'Titel2', 'Titel3', 'Titel4', 'Titel5']}\n\n"
-        f"{final_summary}"
-    )
+    prompt, system_content = create_summary_titles_prompt(final_summary)
     response = call_groq_api(prompt, system_content)
     result = parse_json_response(response)
     wiki_titles = result.get('titles', [])
@@ -494,19 +789,29 @@ def process_cluster_texts(texts, chunk_size=CHUNK_SIZE, max_texts=MAX_TEXTS_PER_
 
     return final_summary, wiki_titles
 
-def collect_wikipedia_candidates_per_cluster(filtered_df):
+def collect_wikipedia_candidates_per_cluster(filtered_df, pipeline=None):
     """
     Process all clusters to extract Wikipedia titles and summaries using summary-based approach.
 
     Args:
         filtered_df (pd.DataFrame): DataFrame containing cluster data with a 'cluster_id'
                                    column and 'combined_text' column.
+        pipeline (str): "async" schedules the LLM calls of all clusters together (see
+                        collect_wikipedia_candidates_async); "sequential" processes one
+                        cluster after another with a thread pool per cluster.
+                        Defaults to LLM_PIPELINE.
 
     Returns:
         tuple: (cluster_candidates, cluster_summaries) where cluster_candidates is a dict
                mapping cluster IDs to lists of Wikipedia titles, and cluster_summaries
                is a dict mapping cluster IDs to summary texts.
     """
+    pipeline = pipeline or LLM_PIPELINE
+    if pipeline == "async":
+        return asyncio.run(collect_wikipedia_candidates_async(filtered_df))
+    if pipeline != "sequential":
+        raise ValueError(f"Unknown pipeline '{pipeline}'. Use 'async' or 'sequential'.")
+
     cluster_candidates, cluster_summaries = {}, {}
 
     for cluster_id in sorted(filtered_df["cluster_id"].unique()):
@@ -536,6 +841,131 @@ def collect_wikipedia_candidates_per_cluster(filtered_df):
     return cluster_candidates, cluster_summaries
 
 
+def get_llm_concurrency():
+    """
+    Return the number of concurrent LLM calls: LLM_CONCURRENCY_PER_KEY for every usable API key.
+
+    Returns:
+        int: The concurrency limit (at least 1).
+    """
+    with _KEYS_LOCK:
+        usable_keys = len(API_KEYS) - len(BLACKLISTED_KEYS)
+    return max(1, LLM_CONCURRENCY_PER_KEY * usable_keys)
+
+
+async def run_llm_call(semaphore, function, *args, **kwargs):
+    """
+    Run a blocking LLM helper (e.g. process_text_chunk) in the event loop's thread pool,
+    bounded by the semaphore.
+
+    Args:
+        semaphore (asyncio.Semaphore): Limits the number of calls in flight.
+        function (callable): The blocking function.
+        *args, **kwargs: Arguments for the function.
+
+    Returns:
+        The function's return value.
+    """
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
+
+
+async def extract_titles_async(semaphore, texts):
+    """
+    Async version of retry_title_extraction (one attempt with shortened texts).
+    """
+    chunks = [text[:min(len(text), RETRY_TEXT_LENGTH)] for text in texts]
+    results = await asyncio.gather(*(run_llm_call(semaphore, process_text_chunk, chunk, True) for chunk in chunks))
+    return [title for _, chunk_titles in results for title in chunk_titles]
+
+
+async def process_cluster_texts_async(semaphore, texts, chunk_size=CHUNK_SIZE, max_texts=MAX_TEXTS_PER_CLUSTER):
+    """
+    Async version of process_cluster_texts.
+
+    The chunk calls of the cluster are scheduled at once; the final summary call starts as
+    soon as this cluster's chunk summaries are in, independently of other clusters.
+
+    Args:
+        semaphore (asyncio.Semaphore): Limits the number of LLM calls in flight across clusters.
+        texts (list): List of article texts to process.
+        chunk_size (int): Maximum size of each text chunk. Defaults to CHUNK_SIZE.
+        max_texts (int): Maximum number of texts to process. Defaults to MAX_TEXTS_PER_CLUSTER.
+
+    Returns:
+        tuple: (final_summary, wiki_titles)
+    """
+    sampled_texts = random.sample(texts, min(len(texts), max_texts))
+
+    # Use only the first 5 chunks per article
+    all_chunks = split_each_text_sentencewise(sampled_texts, max_length=chunk_size, max_chunks=5)
+
+    results = await asyncio.gather(
+        *(run_llm_call(semaphore, process_text_chunk_group, group) for group in group_chunks(all_chunks))
+    )
+    chunk_summaries = [summary for group in results for summary, _ in group if summary]
+    final_summary = await run_llm_call(semaphore, generate_final_summary, chunk_summaries)
+
+    # Use only the summary to extract Wikipedia titles
+    prompt, system_content = create_summary_titles_prompt(final_summary)
+    response = await run_llm_call(semaphore, call_groq_api, prompt, system_content)
+    wiki_titles = parse_json_response(response).get('titles', [])
+
+    # If not enough titles, fallback to retry
+    if not wiki_titles:
+        print("Zu wenige Wikipedia-Titel gefunden, starte letzten Versuch...")
+        wiki_titles.extend(await extract_titles_async(semaphore, [final_summary]))
+
+    return final_summary, wiki_titles
+
+
+async def collect_wikipedia_candidates_async(filtered_df):
+    """
+    Asyncio version of collect_wikipedia_candidates_per_cluster.
+
+    All clusters are processed concurrently; their LLM calls share one semaphore of
+    get_llm_concurrency() slots and a thread pool of the same size.
+
+    Args:
+        filtered_df (pd.DataFrame): DataFrame with 'cluster_id' and 'combined_text' columns.
+
+    Returns:
+        tuple: (cluster_candidates, cluster_summaries), as collect_wikipedia_candidates_per_cluster.
+    """
+    concurrency = get_llm_concurrency()
+    semaphore = asyncio.Semaphore(concurrency)
+    asyncio.get_running_loop().set_default_executor(concurrent.futures.ThreadPoolExecutor(max_workers=concurrency))
+
+    async def process_cluster(cluster_id):
+        cluster_texts = filtered_df.loc[filtered_df["cluster_id"] == cluster_id, "combined_text"].tolist()
+        final_summary, wiki_titles = await process_cluster_texts_async(semaphore, cluster_texts)
+
+        common_titles = deduplicate_titles(wiki_titles)
+        if not common_titles:
+            print(f"Cluster {cluster_id}: Keine Wikipedia-Titel nach Filterung gefunden, letzter Versuch...")
+            common_titles = (await extract_titles_async(semaphore, [final_summary]))[:5]
+        return cluster_id, len(cluster_texts), final_summary, common_titles
+
+    cluster_ids = sorted(filtered_df["cluster_id"].unique())
+    results = await asyncio.gather(*(process_cluster(cluster_id) for cluster_id in cluster_ids))
+
+    cluster_candidates, cluster_summaries = {}, {}
+    for cluster_id, size, final_summary, common_titles in results:
+        print(f"\nCluster {cluster_id} (Size: {size})")
+        print("\nCluster Summary:")
+        print(final_summary)
+        cluster_summaries[cluster_id] = final_summary
+
+        if common_titles:
+            cluster_candidates[cluster_id] = common_titles
+            print(f"\nSuggested Wikipedia titles: {common_titles}")
+        else:
+            print("\nKeine Wikipedia-Titel für diesen Cluster gefunden.")
+
+    return cluster_candidates, cluster_summaries
+
+
 
 def filter_wikipedia_articles_with_groq(summary_dict, wiki_articles_dict):
     """
@@ -0,0 +1,120 @@
+"""
+SQLite-based cache of named entities per article.
+
+Entries are keyed by a hash of the spaCy model version, the headline and the content, so
+reruns of a date and syndicated articles seen by several collector runs skip NER.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Directory for the collector's on-disk caches (mounted as a volume in production)
+CACHE_DIR = os.getenv("CACHE_DIR", "./cache")
+ENTITY_CACHE_PATH = os.getenv("ENTITY_CACHE_PATH", os.path.join(CACHE_DIR, "entity_cache.sqlite"))
+
+# SQLite limits the number of bound parameters per statement
+SQLITE_BATCH_SIZE = 500
+
+
+def get_model_version(nlp_model):
+    """
+    Build a version string for a spaCy pipeline, e.g. "de_core_news_md-3.7.0".
+
+    Args:
+        nlp_model (spacy.language.Language): The loaded spaCy pipeline.
+
+    Returns:
+        str: Language, name and version of the pipeline.
+    """
+    meta = nlp_model.meta
+    return f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}"
+
+
+def article_cache_key(headline, content, model_version):
+    """
+    Hash an article's headline and content together with the model version.
+
+    Args:
+        headline (str): The article headline.
+        content (str): The article content.
+        model_version (str): Version string from get_model_version.
+
+    Returns:
+        str: Hex SHA256 digest identifying the article for this model.
+    """
+    raw_key = "\x1f".join([model_version, str(headline), str(content)])
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+class EntityCache:
+    """
+    Persistent mapping of article cache keys to weighted entity counts.
+    """
+
+    def __init__(self, path=ENTITY_CACHE_PATH):
+        """
+        Open (and create if necessary) the cache database.
+
+        Args:
+            path (str): Path of the SQLite file. Defaults to ENTITY_CACHE_PATH.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entities (key TEXT PRIMARY KEY, entities TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, keys):
+        """
+        Look up several articles at once.
+
+        Args:
+            keys (list): Article cache keys.
+
+        Returns:
+            dict: Mapping of the keys found in the cache to their entity count dicts.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(unique_keys), SQLITE_BATCH_SIZE):
+            batch = unique_keys[start:start + SQLITE_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, entities FROM entities WHERE key IN ({placeholders})", batch
+            )
+            for key, entities in rows:
+                found[key] = json.loads(entities)
+        return found
+
+    def put_many(self, entries):
+        """
+        Store entity counts for several articles.
+
+        Args:
+            entries (dict): Mapping of article cache keys to entity count dicts.
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO entities (key, entities) VALUES (?, ?)",
+            [(key, json.dumps(entities, ensure_ascii=False)) for key, entities in entries.items()]
+        )
+        self.conn.commit()
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
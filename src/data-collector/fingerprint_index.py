@@ -0,0 +1,255 @@
+"""
+SQLite-based index of fingerprints of articles processed on previous days.
+
+For every processed article the index stores its Swissdox content_id, the canonical
+version key of its URL and its MinHash signature (with the LSH band hashes used to find
+near-duplicate candidates). clean_and_process_data consults it to drop wire reposts and
+re-published versions of articles that were already clustered on an earlier day,
+without reloading those days.
+"""
+import datetime
+import hashlib
+import logging
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from entity_cache import CACHE_DIR, SQLITE_BATCH_SIZE
+from url_deduplication import (
+    MINHASH_NUM_PERM,
+    MINHASH_THRESHOLD,
+    get_minhash_permutations,
+    lsh_band_params,
+    minhash_signature,
+    preprocess_text_series,
+    process_url,
+    version_key,
+)
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_INDEX_PATH = os.getenv("FINGERPRINT_INDEX_PATH", os.path.join(CACHE_DIR, "fingerprint_index.sqlite"))
+
+# Fingerprints older than this many days (relative to the processed date) are pruned
+FINGERPRINT_RETENTION_DAYS = int(os.getenv("FINGERPRINT_RETENTION_DAYS", "30"))
+
+
+def url_canonical_key(url):
+    """
+    Canonical key of an article URL, equal for all versions of the same article.
+
+    Args:
+        url (str): The article link.
+
+    Returns:
+        str: The URL's version key as a string, or None for empty URLs.
+    """
+    key = version_key(process_url(url))
+    if key is None:
+        return None
+    prefix, last_segment = key
+    return "/".join(prefix + (last_segment,))
+
+
+def band_hashes(signature, bands, rows):
+    """
+    Hash each LSH band of a MinHash signature to a signed 64-bit integer.
+
+    Args:
+        signature (np.ndarray): MinHash signature (uint32).
+        bands (int): Number of bands.
+        rows (int): Signature rows per band.
+
+    Returns:
+        list: One integer per band, usable as an SQLite INTEGER.
+    """
+    hashes = []
+    for band in range(bands):
+        digest = hashlib.blake2b(
+            band.to_bytes(2, "little") + signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8
+        ).digest()
+        hashes.append(int.from_bytes(digest, "little", signed=True))
+    return hashes
+
+
+class FingerprintIndex:
+    """
+    Persistent index of content_ids, URL keys and MinHash signatures per processed date.
+    """
+
+    def __init__(self, path=FINGERPRINT_INDEX_PATH, threshold=MINHASH_THRESHOLD, num_perm=MINHASH_NUM_PERM):
+        """
+        Open (and create if necessary) the index database.
+
+        Args:
+            path (str): Path of the SQLite file. Defaults to FINGERPRINT_INDEX_PATH.
+            threshold (float): Estimated Jaccard similarity above which an article counts as
+                already seen. Defaults to MINHASH_THRESHOLD.
+            num_perm (int): Number of MinHash permutations. Defaults to MINHASH_NUM_PERM.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.permutations = get_minhash_permutations(num_perm)
+        self.bands, self.rows = lsh_band_params(threshold, num_perm)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                date TEXT NOT NULL,
+                content_id TEXT,
+                url_key TEXT,
+                signature BLOB
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                band_hash INTEGER NOT NULL,
+                article_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS articles_content_id ON articles (content_id);
+            CREATE INDEX IF NOT EXISTS articles_url_key ON articles (url_key);
+            CREATE INDEX IF NOT EXISTS articles_date ON articles (date);
+            CREATE INDEX IF NOT EXISTS bands_band_hash ON bands (band_hash);
+            """
+        )
+        self.conn.commit()
+
+    def fingerprints(self, df):
+        """
+        Compute content_ids, URL keys and MinHash signatures of a DataFrame of articles.
+
+        Args:
+            df (pd.DataFrame): Articles with 'content' and optionally 'content_id' and 'article_link'.
+
+        Returns:
+            tuple: (content_ids, url_keys, signatures) as lists aligned with df; entries are None if unavailable.
+        """
+        n = len(df)
+        if 'content_id' in df.columns:
+            content_ids = [None if pd.isna(value) else str(value) for value in df['content_id']]
+        else:
+            content_ids = [None] * n
+        if 'article_link' in df.columns:
+            url_keys = [url_canonical_key(url) for url in df['article_link']]
+        else:
+            url_keys = [None] * n
+        preprocessed_content = preprocess_text_series(df['content']) if n else []
+        signatures = [minhash_signature(text, self.permutations) for text in preprocessed_content]
+        return content_ids, url_keys, signatures
+
+    def _select_in(self, query, values, date):
+        """
+        Run a query with an "IN (...)" placeholder over values in batches, restricted to earlier dates.
+        """
+        unique_values = list(dict.fromkeys(value for value in values if value is not None))
+        for start in range(0, len(unique_values), SQLITE_BATCH_SIZE):
+            batch = unique_values[start:start + SQLITE_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            yield from self.conn.execute(query.format(placeholders=placeholders), batch + [date])
+
+    def find_seen(self, df, date):
+        """
+        Mark articles that were already processed on a day before the given date.
+
+        An article is seen if its content_id or its URL canonical key is in the index, or if a
+        stored signature shares an LSH band with it and reaches the similarity threshold.
+
+        Args:
+            df (pd.DataFrame): Articles of the day being processed.
+            date (datetime.date): The day being processed; entries of this and later days are ignored,
+                so a day can be reprocessed.
+
+        Returns:
+            pd.Series: Boolean mask aligned with df, True for already processed articles.
+        """
+        date = str(date)
+        content_ids, url_keys, signatures = self.fingerprints(df)
+
+        seen_content_ids = {row[0] for row in self._select_in(
+            "SELECT content_id FROM articles WHERE content_id IN ({placeholders}) AND date < ?", content_ids, date
+        )}
+        seen_url_keys = {row[0] for row in self._select_in(
+            "SELECT url_key FROM articles WHERE url_key IN ({placeholders}) AND date < ?", url_keys, date
+        )}
+
+        article_bands = [
+            band_hashes(signature, self.bands, self.rows) if signature is not None else []
+            for signature in signatures
+        ]
+        candidates = {}
+        for band_hash, signature in self._select_in(
+            "SELECT bands.band_hash, articles.signature FROM bands JOIN articles ON articles.id = bands.article_id "
+            "WHERE bands.band_hash IN ({placeholders}) AND articles.date < ?",
+            [band_hash for hashes in article_bands for band_hash in hashes], date
+        ):
+            candidates.setdefault(band_hash, []).append(np.frombuffer(signature, dtype=np.uint32))
+
+        seen = []
+        for content_id, url_key, signature, hashes in zip(content_ids, url_keys, signatures, article_bands):
+            if content_id in seen_content_ids or url_key in seen_url_keys:
+                seen.append(True)
+                continue
+            seen.append(any(
+                np.mean(signature == candidate) >= self.threshold
+                for band_hash in hashes
+                for candidate in candidates.get(band_hash, [])
+            ))
+
+        mask = pd.Series(seen, index=df.index, dtype=bool)
+        logger.info(f"Fingerprint index: {int(mask.sum())} of {len(df)} articles were processed on earlier days")
+        return mask
+
+    def add(self, df, date):
+        """
+        Record the fingerprints of processed articles and prune entries beyond the retention period.
+
+        Existing entries of the same date are replaced, so reprocessing a day does not grow the index.
+
+        Args:
+            df (pd.DataFrame): The processed articles.
+            date (datetime.date): The day the articles belong to.
+        """
+        content_ids, url_keys, signatures = self.fingerprints(df)
+        date = str(date)
+        self._delete_where("date = ?", [date])
+
+        for content_id, url_key, signature in zip(content_ids, url_keys, signatures):
+            cursor = self.conn.execute(
+                "INSERT INTO articles (date, content_id, url_key, signature) VALUES (?, ?, ?, ?)",
+                (date, content_id, url_key, signature.tobytes() if signature is not None else None)
+            )
+            if signature is not None:
+                self.conn.executemany(
+                    "INSERT INTO bands (band_hash, article_id) VALUES (?, ?)",
+                    [(band_hash, cursor.lastrowid) for band_hash in band_hashes(signature, self.bands, self.rows)]
+                )
+
+        cutoff = datetime.date.fromisoformat(date) - datetime.timedelta(days=FINGERPRINT_RETENTION_DAYS)
+        self._delete_where("date < ?", [cutoff.isoformat()])
+        self.conn.commit()
+
+    def _delete_where(self, condition, parameters):
+        """
+        Delete articles matching the condition together with their band hashes.
+        """
+        self.conn.execute(
+            f"DELETE FROM bands WHERE article_id IN (SELECT id FROM articles WHERE {condition})", parameters
+        )
+        self.conn.execute(f"DELETE FROM articles WHERE {condition}", parameters)
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
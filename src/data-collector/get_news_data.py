@@ -1,9 +1,11 @@
+import datetime
 import os
 import random
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 # https://liri.linguistik.uzh.ch/wiki/langtech/swissdox/api
 # https://swissdox.linguistik.uzh.ch/queries
@@ -13,10 +15,30 @@ load_dotenv(dotenv_path='../../WAVE/.env')
 
 # Constants
 SAVE_FOLDER = './raw_data'
-API_BASE_URL = "https://swissdox.linguistik.uzh.ch/api"
+API_BASE_URL = os.getenv("SWISSDOX_API_URL", "https://swissdox.linguistik.uzh.ch/api")
 API_URL_QUERY = f"{API_BASE_URL}/query"
 API_URL_STATUS = f"{API_BASE_URL}/status"
 
+# Maximum number of articles per query (per day of the queried range for backfills)
+MAX_RESULTS = 50000
+
+# Status polling: exponential backoff with jitter between POLL_INITIAL_DELAY and POLL_MAX_DELAY seconds
+POLL_INITIAL_DELAY = 2
+POLL_MAX_DELAY = 60
+POLL_BACKOFF_FACTOR = 2
+POLL_TIMEOUT = 6 * 60 * 60       # Give up on a query after this many seconds
+
+# Number of date-window queries submitted and polled at the same time
+MAX_CONCURRENT_QUERIES = int(os.getenv("SWISSDOX_MAX_CONCURRENT_QUERIES", "4"))
+# Days per query when a backfill range is split into date windows
+DAYS_PER_QUERY = int(os.getenv("SWISSDOX_DAYS_PER_QUERY", "7"))
+
+# Streaming download settings
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024   # Bytes written per chunk; bounds memory use during the download
+DOWNLOAD_MAX_RETRIES = 5            # Resume attempts after a broken connection
+DOWNLOAD_RETRY_DELAY = 2            # Seconds to wait before resuming
+DOWNLOAD_TIMEOUT = 60               # Seconds without data before the connection counts as broken
+
 # API headers with authentication
 HEADERS = {
     "X-API-Key": os.getenv("SWISSDOX_KEY"),
@@ -36,13 +58,14 @@ USED_SOURCES = [
 
 
 
-def build_query_yaml(start_date: str, end_date: str) -> str:
+def build_query_yaml(start_date: str, end_date: str, max_results: int = MAX_RESULTS) -> str:
     """
     Builds the YAML query string to send to the Swissdox API.
 
     Args:
         start_date (str): The start date for article retrieval in YYYY-MM-DD format
         end_date (str): The end date for article retrieval in YYYY-MM-DD format
+        max_results (int): Maximum number of articles in the result
 
     Returns:
         str: A YAML-formatted query string ready for API submission
@@ -57,7 +80,7 @@ query:
     - de
 result:
   format: TSV
-  maxResults: 50000
+  maxResults: {max_results}
   columns:
     - id
     - pubtime
@@ -72,51 +95,142 @@ version: 1.2
 """
 
 
-def fetch_swissdox_data(start_date: str, end_date: str) -> Optional[str]:
+def fetch_swissdox_data(start_date: str, end_date: str, max_results: int = MAX_RESULTS) -> Optional[str]:
     """
     Sends a query to the Swissdox API and initiates the download process if successful.
 
     Args:
         start_date (str): The start date for article retrieval in YYYY-MM-DD format
         end_date (str): The end date for article retrieval in YYYY-MM-DD format
+        max_results (int): Maximum number of articles in the result
 
     Returns:
         Optional[str]: Path to the downloaded file if successful, None if failed
     """
-    query_yaml = build_query_yaml(start_date, end_date)
+    query_yaml = build_query_yaml(start_date, end_date, max_results)
     query_name = f"LastWeekNews_{int(time.time())}_{random.randint(1000, 9999)}"
 
     response = requests.post(API_URL_QUERY, headers=HEADERS, data={
         "query": query_yaml,
         "name": query_name,
         "comment": "All news articles from the specified time period"
-    })
+    }, timeout=DOWNLOAD_TIMEOUT)
 
     if response.status_code != 200:
         print(f"Error sending query: {response.status_code}")
         return None
 
-    query_id = response.json().get("queryId")
+    try:
+        query_id = response.json().get("queryId")
+    except ValueError:
+        print("Error sending query: response is not valid JSON")
+        return None
     print(f"Query sent successfully. Query ID: {query_id}")
 
     return download_news_data(query_id)
 
 
+def split_date_range(start_date: datetime.date, end_date: datetime.date, days_per_query: int) -> List[Tuple[str, str]]:
+    """
+    Splits a date range into consecutive windows of at most days_per_query days.
+
+    Args:
+        start_date (datetime.date): First day of the range
+        end_date (datetime.date): Last day of the range (inclusive)
+        days_per_query (int): Maximum number of days per window
+
+    Returns:
+        List[Tuple[str, str]]: (start, end) pairs in YYYY-MM-DD format
+    """
+    windows = []
+    window_start = start_date
+    while window_start <= end_date:
+        window_end = min(window_start + datetime.timedelta(days=days_per_query - 1), end_date)
+        windows.append((window_start.isoformat(), window_end.isoformat()))
+        window_start = window_end + datetime.timedelta(days=1)
+    return windows
+
+
+def window_days(start_date: str, end_date: str) -> int:
+    """
+    Returns the number of days of a (start, end) window in YYYY-MM-DD format, both inclusive.
+    """
+    return (datetime.date.fromisoformat(end_date) - datetime.date.fromisoformat(start_date)).days + 1
+
+
+def fetch_swissdox_windows(windows: List[Tuple[str, str]], max_workers: int = MAX_CONCURRENT_QUERIES,
+                           max_results_per_day: int = MAX_RESULTS) -> Dict[Tuple[str, str], Optional[str]]:
+    """
+    Submits one query per date window and polls them concurrently.
+
+    Each window runs fetch_swissdox_data in its own thread, so every download starts as
+    soon as its own query is finished, independently of the other queries. A window that
+    fails with any exception is reported and recorded as None; the other windows are kept.
+
+    Args:
+        windows (List[Tuple[str, str]]): (start, end) date pairs in YYYY-MM-DD format
+        max_workers (int): Maximum number of queries in flight at the same time
+        max_results_per_day (int): Maximum number of articles per day of a window
+
+    Returns:
+        Dict[Tuple[str, str], Optional[str]]: Path of the downloaded file per window, None if it failed
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as executor:
+        futures = {
+            window: executor.submit(fetch_swissdox_data, *window, max_results=max_results_per_day * window_days(*window))
+            for window in windows
+        }
+
+    results = {}
+    for window, future in futures.items():
+        try:
+            results[window] = future.result()
+        except Exception as e:
+            print(f"Query for {window[0]} to {window[1]} failed: {e}")
+            results[window] = None
+    return results
+
+
+def next_poll_delay(delay: float) -> float:
+    """
+    Returns the next polling interval: the previous one multiplied by POLL_BACKOFF_FACTOR,
+    capped at POLL_MAX_DELAY.
+
+    Args:
+        delay (float): The previous interval in seconds
+
+    Returns:
+        float: The next interval in seconds
+    """
+    return min(delay * POLL_BACKOFF_FACTOR, POLL_MAX_DELAY)
+
+
 def download_news_data(query_id: int) -> Optional[str]:
     """
     Polls the API until the query is finished and downloads the result file.
 
+    The polling interval starts at POLL_INITIAL_DELAY seconds and grows exponentially up to
+    POLL_MAX_DELAY; each wait is jittered so concurrent queries do not poll in lockstep.
+
     Args:
         query_id (int): The ID of the query to monitor and download
 
     Returns:
         Optional[str]: Path to the downloaded file if successful, None if failed
     """
-    while True:
-        response = requests.get(f"{API_URL_STATUS}/{query_id}", headers=HEADERS)
-        status_data = response.json()[0]
+    delay = POLL_INITIAL_DELAY
+    deadline = time.monotonic() + POLL_TIMEOUT
 
-        if status_data.get('status') == 'finished':
+    while True:
+        try:
+            response = requests.get(f"{API_URL_STATUS}/{query_id}", headers=HEADERS, timeout=DOWNLOAD_TIMEOUT)
+            status_data = response.json()[0]
+        except (requests.exceptions.RequestException, ValueError, IndexError, KeyError) as e:
+            print(f"Query {query_id}: status request failed ({e}), retrying...")
+            status_data = {}
+
+        status = status_data.get('status')
+        if status == 'finished':
             download_url = status_data.get('downloadUrl')
             if not download_url:
                 print("No download URL found.")
@@ -125,14 +239,27 @@ def download_news_data(query_id: int) -> Optional[str]:
             print(f"Download URL received: {download_url}")
             return save_downloaded_file(download_url)
 
-        print("Query still processing...")
-        time.sleep(5)
+        if status in ('failed', 'error'):
+            print(f"Query {query_id} failed: {status_data}")
+            return None
+
+        if time.monotonic() + delay > deadline:
+            print(f"Query {query_id} not finished after {POLL_TIMEOUT} seconds, giving up.")
+            return None
+
+        print(f"Query {query_id} still processing, next check in about {delay:.0f}s...")
+        time.sleep(random.uniform(delay / 2, delay))
+        delay = next_poll_delay(delay)
 
 
 def save_downloaded_file(download_url: str) -> Optional[str]:
     """
     Downloads the file from the given URL and saves it locally.
 
+    The response is streamed to a ".part" file in chunks of DOWNLOAD_CHUNK_SIZE bytes. After a
+    broken connection the download resumes with an HTTP Range request, and the file is only
+    renamed to its final name once its size matches the size announced by the server.
+
     Args:
         download_url (str): URL to download the file from
 
@@ -140,19 +267,78 @@ def save_downloaded_file(download_url: str) -> Optional[str]:
         Optional[str]: Path to the saved file if successful, None if failed
     """
     filename = os.path.basename(download_url)
-    response = requests.get(download_url, headers=HEADERS)
-
-    if response.status_code != 200:
-        print(f"Error downloading file: {response.status_code}")
-        print(response.text)
-        return None
-
     os.makedirs(SAVE_FOLDER, exist_ok=True)
     file_path = os.path.join(SAVE_FOLDER, filename)
+    part_path = f"{file_path}.part"
+    expected_size = None
+
+    for attempt in range(DOWNLOAD_MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(DOWNLOAD_RETRY_DELAY)
+
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if expected_size is not None and offset == expected_size:
+            break
+
+        headers = dict(HEADERS)
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+
+        try:
+            with requests.get(download_url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                if response.status_code == 206:
+                    # Content-Range: bytes <start>-<end>/<total>
+                    content_range = response.headers.get("Content-Range", "")
+                    range_start = content_range.split(" ")[-1].split("-")[0]
+                    if range_start != str(offset):
+                        print(f"Unexpected Content-Range '{content_range}', restarting the download.")
+                        os.remove(part_path)
+                        continue
+                    total = content_range.rsplit("/", 1)[-1]
+                    expected_size = int(total) if total.isdigit() else None
+                    mode = "ab"
+                elif response.status_code == 200:
+                    # Full response (first request, or the server ignored the Range header)
+                    content_length = response.headers.get("Content-Length")
+                    encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+                    expected_size = int(content_length) if content_length and not encoded else None
+                    offset = 0
+                    mode = "wb"
+                elif response.status_code == 416 and offset:
+                    # Range not satisfiable: the partial file does not belong to this download
+                    print("Partial download does not match the file on the server, restarting the download.")
+                    os.remove(part_path)
+                    continue
+                else:
+                    print(f"Error downloading file: {response.status_code}")
+                    print(response.text)
+                    return None
+
+                with open(part_path, mode) as file:
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        file.write(chunk)
+        except requests.exceptions.RequestException as e:
+            print(f"Download interrupted after {os.path.getsize(part_path) if os.path.exists(part_path) else 0} bytes: {e}")
+            continue
+
+        size = os.path.getsize(part_path)
+        if expected_size is None or size == expected_size:
+            break
+        if size > expected_size:
+            print(f"Downloaded {size} bytes but expected {expected_size}, restarting the download.")
+            os.remove(part_path)
+            continue
+        print(f"Download incomplete ({size} of {expected_size} bytes), resuming...")
+    else:
+        print(f"Error downloading file: giving up after {DOWNLOAD_MAX_RETRIES} retries.")
+        return None
 
-    with open(file_path, "wb") as file:
-        file.write(response.content)
+    size = os.path.getsize(part_path)
+    if expected_size is not None and size != expected_size:
+        print(f"Error downloading file: expected {expected_size} bytes, got {size}.")
+        return None
 
+    os.replace(part_path, file_path)
     print(f"File saved successfully: {file_path}")
-    print("File size: %.2f KB" % (len(response.content) / 1024))
+    print("File size: %.2f KB" % (size / 1024))
     return file_path
@@ -1,6 +1,257 @@
+import asyncio
+import logging
+import os
+import httpx
 import wikipedia
 from pprint import pprint
 
+from title_cache import get_title_cache
+
+logger = logging.getLogger(__name__)
+
+# MediaWiki Action API of a Wikipedia language edition ({language} is filled in)
+WIKIPEDIA_API_URL = os.getenv("WIKIPEDIA_API_URL", "https://{language}.wikipedia.org/w/api.php")
+MAX_TITLES_PER_QUERY = 50  # Limit of the titles parameter for regular API users
+MAX_SEARCH_RESULTS = 10
+# Requests in flight at the same time, over one pool of reused connections
+MAX_CONCURRENT_REQUESTS = int(os.getenv("WIKIPEDIA_MAX_CONCURRENT_REQUESTS", "4"))
+REQUEST_TIMEOUT = 30
+USER_AGENT = "WAVE data-collector (https://github.com/BDP25/WAVE)"
+
+
+def create_client() -> httpx.AsyncClient:
+    """
+    Creates the HTTP client for the MediaWiki API, with a connection pool sized to
+    MAX_CONCURRENT_REQUESTS.
+    """
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=MAX_CONCURRENT_REQUESTS, max_keepalive_connections=MAX_CONCURRENT_REQUESTS),
+    )
+
+
+async def api_query(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, params: dict, language: str = 'de') -> dict:
+    """
+    Sends one action=query request to the MediaWiki API.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client from create_client
+        semaphore (asyncio.Semaphore): Bounds the requests in flight
+        params (dict): Query parameters besides action, format and formatversion
+        language (str): Wikipedia language edition to use (default: 'de' for German)
+
+    Returns:
+        dict: The "query" part of the API response
+    """
+    async with semaphore:
+        response = await client.get(
+            WIKIPEDIA_API_URL.format(language=language),
+            params={"action": "query", "format": "json", "formatversion": 2, **params},
+        )
+    response.raise_for_status()
+    return response.json().get("query", {})
+
+
+async def query_titles(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, titles: list, language: str = 'de') -> dict:
+    """
+    Looks up to MAX_TITLES_PER_QUERY titles with one MediaWiki API request.
+
+    Redirects are followed and the disambiguation page property is requested, the page
+    content is not downloaded.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client from create_client
+        semaphore (asyncio.Semaphore): Bounds the requests in flight
+        titles (list): Titles to look up (must not contain '|')
+        language (str): Wikipedia language edition to use (default: 'de' for German)
+
+    Returns:
+        dict: The "query" part of the API response
+    """
+    params = {"redirects": 1, "prop": "pageprops", "ppprop": "disambiguation", "titles": "|".join(titles)}
+    return await api_query(client, semaphore, params, language)
+
+
+async def search_titles(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, term: str, language: str = 'de') -> list:
+    """
+    Returns the titles of the MediaWiki full-text search results for a term, like wikipedia.search.
+    """
+    params = {"list": "search", "srsearch": term, "srlimit": MAX_SEARCH_RESULTS, "srprop": ""}
+    query = await api_query(client, semaphore, params, language)
+    return [result["title"] for result in query.get("search", [])]
+
+
+def resolve_query_result(titles: list, query: dict) -> tuple:
+    """
+    Maps the requested titles to article titles using a query_titles response.
+
+    Args:
+        titles (list): The titles sent with the request
+        query (dict): The "query" part of the API response
+
+    Returns:
+        tuple: (resolved, disambiguations) where resolved maps titles to the title of their
+               article (after normalisation and redirects) and disambiguations is the set of
+               titles that lead to a disambiguation page. Missing titles are in neither.
+    """
+    normalized = {entry["from"]: entry["to"] for entry in query.get("normalized", [])}
+    redirects = {entry["from"]: entry["to"] for entry in query.get("redirects", [])}
+    pages = {page["title"]: page for page in query.get("pages", [])}
+
+    resolved, disambiguations = {}, set()
+    for title in titles:
+        target = normalized.get(title, title)
+        seen = set()
+        while target in redirects and target not in seen:
+            seen.add(target)
+            target = redirects[target]
+
+        page = pages.get(target)
+        if page is None or page.get("missing") or page.get("invalid"):
+            continue
+        if "disambiguation" in page.get("pageprops", {}):
+            disambiguations.add(title)
+        else:
+            resolved[title] = page["title"]
+    return resolved, disambiguations
+
+
+async def query_titles_in_batches(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, titles: list,
+                                  language: str = 'de') -> tuple:
+    """
+    Resolves titles with concurrent query_titles requests of MAX_TITLES_PER_QUERY titles each.
+
+    Args:
+        client (httpx.AsyncClient): HTTP client from create_client
+        semaphore (asyncio.Semaphore): Bounds the requests in flight
+        titles (list): Unique titles to look up
+        language (str): Wikipedia language edition to use (default: 'de' for German)
+
+    Returns:
+        tuple: (resolved, disambiguations, failed, page_ids) as resolve_query_result, plus the
+               list of titles that could not be looked up (they contain '|' or their request
+               failed) and the page IDs of all articles in the responses by title
+    """
+    # '|' separates the titles of a request, such titles are looked up one by one
+    failed = [title for title in titles if "|" in title]
+    batchable = [title for title in titles if "|" not in title]
+    batches = [batchable[start:start + MAX_TITLES_PER_QUERY] for start in range(0, len(batchable), MAX_TITLES_PER_QUERY)]
+
+    queries = await asyncio.gather(
+        *(query_titles(client, semaphore, batch, language) for batch in batches), return_exceptions=True
+    )
+
+    resolved, disambiguations, page_ids = {}, set(), {}
+    for batch, query in zip(batches, queries):
+        if isinstance(query, Exception):
+            logger.warning(f"Wikipedia title query failed for {len(batch)} titles: {query}")
+            failed.extend(batch)
+            continue
+        batch_resolved, batch_disambiguations = resolve_query_result(batch, query)
+        resolved.update(batch_resolved)
+        disambiguations.update(batch_disambiguations)
+        page_ids.update({page["title"]: page["pageid"] for page in query.get("pages", []) if "pageid" in page})
+    return resolved, disambiguations, failed, page_ids
+
+
+async def lookup_one_by_one(semaphore: asyncio.Semaphore, term: str):
+    """
+    Resolves a term with get_wikipedia_article in a worker thread.
+
+    Returns:
+        str or None: The article title, or None if none was found
+    """
+    async with semaphore:
+        article = await asyncio.to_thread(get_wikipedia_article, term)
+    return article.title if article else None
+
+
+async def resolve_titles_async(terms: list, language: str = 'de', client: httpx.AsyncClient = None) -> dict:
+    """
+    Finds the Wikipedia article of many terms with batched, concurrent API requests.
+
+    Terms found in the shared title cache need no request. The others are first looked up as
+    titles in batches. Terms that lead to a disambiguation page or whose lookup failed are
+    handled by get_wikipedia_article. For missing terms, the search suggestions are looked up
+    in batches as well, and the first suggestion that is an article is used. At most
+    MAX_CONCURRENT_REQUESTS requests are in flight at a time. The results and the page IDs
+    of the articles seen are written back to the cache.
+
+    Args:
+        terms (list): Search terms or potential Wikipedia article titles
+        language (str): Wikipedia language edition to use (default: 'de' for German)
+        client (httpx.AsyncClient): HTTP client, a new one from create_client if None
+
+    Returns:
+        dict: Mapping of each term to the title of its article, or None if none was found
+    """
+    if client is None:
+        async with create_client() as client:
+            return await resolve_titles_async(terms, language, client)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    terms = list(dict.fromkeys(term for term in terms if isinstance(term, str) and term.strip()))
+
+    title_cache = get_title_cache()
+    cached = title_cache.get_titles(terms, language)
+    all_terms, terms = terms, [term for term in terms if term not in cached]
+
+    resolved, disambiguations, failed, page_ids = await query_titles_in_batches(client, semaphore, terms, language)
+    missing = [term for term in terms if term not in resolved and term not in disambiguations and term not in failed]
+
+    async def search(term):
+        try:
+            return await search_titles(client, semaphore, term, language)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Wikipedia search failed for '{term}': {e}")
+            return None
+
+    # Only the missing terms need a search
+    suggestions = dict(zip(missing, await asyncio.gather(*(search(term) for term in missing))))
+    all_suggestions = list(dict.fromkeys(
+        suggestion for options in suggestions.values() if options for suggestion in options
+    ))
+    resolved_suggestions, _, failed_suggestions, suggestion_page_ids = await query_titles_in_batches(
+        client, semaphore, all_suggestions, language
+    )
+    page_ids.update(suggestion_page_ids)
+
+    one_by_one = [*disambiguations, *failed]
+    for term in missing:
+        options = suggestions[term]
+        if options is None or any(suggestion in failed_suggestions for suggestion in options):
+            one_by_one.append(term)
+        else:
+            resolved[term] = next(
+                (resolved_suggestions[suggestion] for suggestion in options if suggestion in resolved_suggestions),
+                None
+            )
+
+    # Results of the batched path are definite, including missing terms
+    title_cache.set_titles(dict(resolved), language)
+    title_cache.set_page_ids(page_ids, language)
+
+    # Disambiguation pages take the first option, as in get_wikipedia_article
+    wikipedia.set_lang(language)
+    titles = await asyncio.gather(*(lookup_one_by_one(semaphore, term) for term in one_by_one))
+    resolved.update(zip(one_by_one, titles))
+    # get_wikipedia_article also returns None on errors, so only its hits are cached
+    title_cache.set_titles({term: title for term, title in zip(one_by_one, titles) if title}, language)
+
+    logger.info(
+        f"Resolved {sum(title is not None for title in resolved.values())} of {len(terms)} uncached Wikipedia titles "
+        f"({len(all_terms) - len(terms)} cached, {len(missing)} searched, {len(one_by_one)} looked up one by one)"
+    )
+    return {term: cached[term] if term in cached else resolved[term] for term in all_terms}
+
+
+def resolve_titles(terms: list, language: str = 'de') -> dict:
+    """
+    Synchronous wrapper of resolve_titles_async.
+    """
+    return asyncio.run(resolve_titles_async(terms, language))
+
 
 def validate_wikipedia_titles(cluster_topics: dict, language: str = 'de') -> dict:
     """
@@ -18,28 +269,38 @@ def validate_wikipedia_titles(cluster_topics: dict, language: str = 'de') -> dic
     wikipedia.set_lang(language)
     results = {}
 
+    # Resolve the keywords of all clusters together
+    resolved_titles = resolve_titles(
+        [term for keywords in cluster_topics.values() for term in keywords], language
+    )
+
     for cluster_id, keywords in cluster_topics.items():
-        if validated_articles := process_keywords(keywords):
+        if validated_articles := process_keywords(keywords, resolved_titles):
             results[cluster_id] = validated_articles
 
     return results
 
 
-def process_keywords(keywords: list) -> list:
+def process_keywords(keywords: list, resolved_titles: dict = None) -> list:
     """
     Returns validated Wikipedia article titles from a list of keywords.
 
     Args:
         keywords (list): List of potential Wikipedia article titles or search terms
+        resolved_titles (dict): Article title per keyword from resolve_titles; the keywords
+                                are resolved if not given
 
     Returns:
         list: List of validated Wikipedia article titles without duplicates
     """
+    if resolved_titles is None:
+        resolved_titles = resolve_titles(keywords)
+
     validated_articles = set()  # Use set instead of list to avoid duplicates
 
     for term in keywords:
-        if article := get_wikipedia_article(term):
-            validated_articles.add(article.title)  # Use add() for sets
+        if title := resolved_titles.get(term):
+            validated_articles.add(title)  # Use add() for sets
 
     return list(validated_articles)  # Convert back to list for compatibility
 
@@ -0,0 +1,161 @@
+"""
+SQLite-based cache of LLM responses.
+
+Entries are keyed by a hash of the model, the system message, the prompt (template and
+chunk text) and the generation parameters, so reruns of a date and wire stories that
+appear in several clusters or days are not summarised again. Entries expire after a TTL,
+and the least recently used ones are evicted once the cache exceeds its size limit.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from entity_cache import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.sqlite"))
+LLM_CACHE_TTL_DAYS = float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "200000"))
+
+# Expired and surplus entries are evicted every PRUNE_INTERVAL writes
+PRUNE_INTERVAL = 500
+
+
+def llm_cache_key(model, system_content, prompt, **parameters):
+    """
+    Hash a request's model, messages and generation parameters.
+
+    Args:
+        model (str): The model name.
+        system_content (str): The system message.
+        prompt (str): The user prompt, i.e. the filled-in template.
+        **parameters: Generation parameters such as temperature, max_tokens and json_format.
+
+    Returns:
+        str: Hex SHA256 digest identifying the request.
+    """
+    raw_key = json.dumps([model, system_content, prompt, sorted(parameters.items())], ensure_ascii=False)
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent mapping of request keys to response texts, shared by the threads of a run.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl_days=LLM_CACHE_TTL_DAYS, max_entries=LLM_CACHE_MAX_ENTRIES):
+        """
+        Open (and create if necessary) the cache database.
+
+        Args:
+            path (str): Path of the SQLite file. Defaults to LLM_CACHE_PATH.
+            ttl_days (float): Days after which an entry expires. Defaults to LLM_CACHE_TTL_DAYS.
+            max_entries (int): Number of entries kept when pruning. Defaults to LLM_CACHE_MAX_ENTRIES.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self.conn.commit()
+        self.prune()
+
+    def get(self, key):
+        """
+        Look up a response, counting the hit or miss.
+
+        Args:
+            key (str): Request key from llm_cache_key.
+
+        Returns:
+            str or None: The cached response, or None if it is missing or expired.
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            return row[0]
+
+    def put(self, key, response):
+        """
+        Store a response.
+
+        Args:
+            key (str): Request key from llm_cache_key.
+            response (str): The response text.
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self.conn.commit()
+            self.writes += 1
+            prune = self.writes % PRUNE_INTERVAL == 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """
+        Delete expired entries and the least recently used ones beyond max_entries.
+        """
+        with self.lock:
+            self.conn.execute("DELETE FROM responses WHERE created <= ?", (time.time() - self.ttl,))
+            self.conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def hit_ratio(self):
+        """
+        Return the share of lookups answered from the cache (0 if there were none).
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def log_stats(self):
+        """
+        Log the lookups and hit ratio since the cache was opened.
+        """
+        logger.info(
+            f"LLM cache: {self.hits} hits, {self.misses} misses ({self.hit_ratio():.1%} hit ratio)"
+        )
+
+    def close(self):
+        """
+        Close the underlying database connection.
+        """
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
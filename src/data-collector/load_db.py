@@ -1,11 +1,21 @@
 import psycopg2
 import json
+import re
 from psycopg2 import sql
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+# "copy" streams the records through COPY into staging tables, "rows" inserts them one by one
+DB_LOAD_METHOD = os.getenv("DB_LOAD_METHOD", "copy")
+
+CLUSTER_COLUMNS = ["cluster_id", "wikipedia_article_names", "date", "summary_text"]
+ARTIKEL_COLUMNS = ["article_id", "cluster_id", "pubtime", "medium_name", "head", "article_link"]
+
+# Characters that make PostgreSQL quote an element in the text output of an array
+ARRAY_QUOTE_PATTERN = re.compile(r'[{},"\\ \t\n\r\v\f]')
+
 
 def create_schema(db_params=None):
     """
@@ -77,81 +87,294 @@ def create_schema(db_params=None):
             conn.close()
 
 
-def load_data(json_input, db_params):
+def parse_json_input(json_input):
     """
-    Loads data from a JSON source into the database.
+    Returns the data of a JSON source as a dictionary.
 
     Parameters:
-    json_input (str, bytes, os.PathLike or dict): Source of data - can be a JSON string,
-                                                 a file path to a JSON file, or a dictionary
-    db_params (dict): Database connection parameters containing:
-                     dbname, user, password, host, port
+    json_input (str, bytes, os.PathLike or dict): A JSON string, a file path to a JSON file, or a dictionary
 
     Returns:
-    None: The function inserts data into the database but doesn't return anything
+    dict: The parsed data
     """
     # Check if json_input is a file path, a JSON string, or a dictionary
     if isinstance(json_input, (str, bytes, os.PathLike)):
         try:
             # Try to parse it as a JSON string
-            data = json.loads(json_input)
+            return json.loads(json_input)
         except json.JSONDecodeError:
             # If it fails, assume it's a file path and read JSON data from the file
             with open(json_input, "r") as f:
-                data = json.load(f)
-    else:
-        # Assume json_input is already a dictionary
-        data = json_input
+                return json.load(f)
+    # Assume json_input is already a dictionary
+    return json_input
+
+
+def insert_records(cur, data):
+    """
+    Inserts the cluster and article records of one dataset using an open cursor.
+
+    Parameters:
+    cur (psycopg2.extensions.cursor): Cursor of the transaction to insert into
+    data (dict): Dictionary with "cluster" and "artikel" record lists
+
+    Returns:
+    None
+    """
+    # Insert records into the Cluster table first (since articles reference clusters)
+    cluster_records = data.get("cluster", [])
+    for cluster in cluster_records:
+        cur.execute(
+            """
+            INSERT INTO Cluster (cluster_id, wikipedia_article_names, date, summary_text)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (cluster_id) DO NOTHING;
+            """,
+            (
+                cluster["cluster_id"],
+                cluster["wikipedia_article_names"],
+                cluster["date"],
+                cluster.get("summary_text", None)  # Use .get in case the key is missing
+            )
+        )
+        print(f"Inserted Cluster with cluster_id: {cluster['cluster_id']}")
+
+    # Insert records into the Artikel table
+    artikel_records = data.get("artikel", [])
+    for artikel in artikel_records:
+        cur.execute(
+            """
+            INSERT INTO Artikel (article_id, cluster_id, pubtime, medium_name, head, article_link)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (article_id) DO NOTHING;
+            """,
+            (
+                artikel["article_id"],
+                artikel["cluster_id"],
+                artikel["pubtime"],
+                artikel["medium_name"],
+                artikel["head"],
+                artikel["article_link"]
+            )
+        )
+        print(f"Inserted Artikel with article_id: {artikel['article_id']}")
+
+
+def format_text_array(values):
+    """
+    Formats a list of strings the way PostgreSQL prints a text[] cast to text, e.g. {Bern,"Karin Keller-Sutter"}.
+
+    This is what the row-by-row path stores when psycopg2 adapts a list for a TEXT column.
+
+    Parameters:
+    values (list): The strings of the array
+
+    Returns:
+    str: The array literal
+    """
+    elements = []
+    for value in values:
+        value = str(value)
+        if value == "" or value.upper() == "NULL" or ARRAY_QUOTE_PATTERN.search(value):
+            value = '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+        elements.append(value)
+    return "{" + ",".join(elements) + "}"
+
+
+def format_copy_field(value):
+    """
+    Formats one value for the text format of COPY.
+
+    Parameters:
+    value: The value; None becomes NULL, lists become array literals
+
+    Returns:
+    str: The escaped field
+    """
+    if value is None:
+        return "\\N"
+    if isinstance(value, (list, tuple)):
+        value = format_text_array(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(records, columns, defaults=None):
+    """
+    Yields the COPY text lines of records, each prefixed with its position in the input.
+
+    Parameters:
+    records (iterable): Record dictionaries
+    columns (list): Keys to write, in the column order of the staging table
+    defaults (dict): Values of keys that may be missing from a record
+
+    Returns:
+    generator: One tab-separated, newline-terminated line per record
+    """
+    defaults = defaults or {}
+    for position, record in enumerate(records):
+        fields = [str(position)]
+        for column in columns:
+            value = record.get(column, defaults[column]) if column in defaults else record[column]
+            fields.append(format_copy_field(value))
+        yield "\t".join(fields) + "\n"
+
+
+class CopyStream:
+    """
+    File-like reader over an iterator of lines, so COPY FROM STDIN streams the rows
+    instead of building the whole input in memory first.
+    """
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.buffer = ""
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = next(self.lines, None)
+            if line is None:
+                break
+            self.buffer += line
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+def copy_records(cur, datasets):
+    """
+    Loads the cluster and article records of several datasets with COPY and merges them.
+
+    The records are streamed into temporary staging tables and inserted with
+    INSERT ... ON CONFLICT DO NOTHING, clusters first, so the result is the same as
+    inserting them one by one in input order. Runs inside the caller's transaction.
+
+    Parameters:
+    cur (psycopg2.extensions.cursor): Cursor of the transaction to load into
+    datasets (list): Dictionaries with "cluster" and "artikel" record lists
+
+    Returns:
+    tuple: (int, int) - Number of new clusters and new articles
+    """
+    cur.execute(
+        """
+        CREATE TEMP TABLE cluster_staging (
+            position BIGINT,
+            cluster_id VARCHAR(255),
+            wikipedia_article_names TEXT,
+            date DATE,
+            summary_text TEXT
+        ) ON COMMIT DROP;
+        CREATE TEMP TABLE artikel_staging (
+            position BIGINT,
+            article_id VARCHAR(255),
+            cluster_id VARCHAR(255),
+            pubtime TIMESTAMP,
+            medium_name VARCHAR(255),
+            head TEXT,
+            article_link TEXT
+        ) ON COMMIT DROP;
+        """
+    )
+
+    clusters = (cluster for data in datasets for cluster in data.get("cluster", []))
+    cur.copy_expert(
+        f"COPY cluster_staging (position, {', '.join(CLUSTER_COLUMNS)}) FROM STDIN",
+        CopyStream(copy_rows(clusters, CLUSTER_COLUMNS, defaults={"summary_text": None}))
+    )
+    artikel = (artikel for data in datasets for artikel in data.get("artikel", []))
+    cur.copy_expert(
+        f"COPY artikel_staging (position, {', '.join(ARTIKEL_COLUMNS)}) FROM STDIN",
+        CopyStream(copy_rows(artikel, ARTIKEL_COLUMNS))
+    )
+
+    # DISTINCT ON keeps the first record of a key, like the row-by-row inserts
+    cur.execute(
+        f"""
+        INSERT INTO Cluster ({', '.join(CLUSTER_COLUMNS)})
+        SELECT DISTINCT ON (cluster_id) {', '.join(CLUSTER_COLUMNS)}
+        FROM cluster_staging
+        ORDER BY cluster_id, position
+        ON CONFLICT (cluster_id) DO NOTHING;
+        """
+    )
+    clusters_inserted = cur.rowcount
+    cur.execute(
+        f"""
+        INSERT INTO Artikel ({', '.join(ARTIKEL_COLUMNS)})
+        SELECT DISTINCT ON (article_id) {', '.join(ARTIKEL_COLUMNS)}
+        FROM artikel_staging
+        ORDER BY article_id, position
+        ON CONFLICT (article_id) DO NOTHING;
+        """
+    )
+    artikel_inserted = cur.rowcount
+    print(f"Inserted {clusters_inserted} clusters and {artikel_inserted} articles")
+    return clusters_inserted, artikel_inserted
+
+
+def load_data(json_input, db_params, method=None):
+    """
+    Loads data from a JSON source into the database.
+
+    Parameters:
+    json_input (str, bytes, os.PathLike or dict): Source of data - can be a JSON string,
+                                                 a file path to a JSON file, or a dictionary of
+                                                 records (see cluster_data_to_db_json.generate_cluster_records)
+    db_params (dict): Database connection parameters containing:
+                     dbname, user, password, host, port
+    method (str): "copy" or "rows", defaults to DB_LOAD_METHOD
+
+    Returns:
+    bool: True if the data was committed, False if the transaction was rolled back
+    """
+    return load_data_batch([json_input], db_params, method)
+
+
+def load_data_batch(json_inputs, db_params, method=None):
+    """
+    Loads several JSON sources (e.g. one per day of a backfill) into the database in a single transaction.
+
+    Parameters:
+    json_inputs (list): Sources of data, each as accepted by load_data
+    db_params (dict): Database connection parameters containing:
+                     dbname, user, password, host, port
+    method (str): "copy" to bulk load through staging tables (see copy_records) or
+                  "rows" to insert record by record, defaults to DB_LOAD_METHOD
+
+    Returns:
+    bool: True if all data was committed, False if the transaction was rolled back
+    """
+    method = method or DB_LOAD_METHOD
+    if method not in ("copy", "rows"):
+        raise ValueError(f"Unknown load method '{method}', expected 'copy' or 'rows'")
+    datasets = [parse_json_input(json_input) for json_input in json_inputs]
 
     # Establish a connection to PostgreSQL
     conn = psycopg2.connect(**db_params)
     cur = conn.cursor()
 
     try:
-        # Insert records into the Cluster table first (since articles reference clusters)
-        cluster_records = data.get("cluster", [])
-        for cluster in cluster_records:
-            cur.execute(
-                """
-                INSERT INTO Cluster (cluster_id, wikipedia_article_names, date, summary_text)
-                VALUES (%s, %s, %s, %s)
-                ON CONFLICT (cluster_id) DO NOTHING;
-                """,
-                (
-                    cluster["cluster_id"],
-                    cluster["wikipedia_article_names"],
-                    cluster["date"],
-                    cluster.get("summary_text", None)  # Use .get in case the key is missing
-                )
-            )
-            print(f"Inserted Cluster with cluster_id: {cluster['cluster_id']}")
-
-        # Insert records into the Artikel table
-        artikel_records = data.get("artikel", [])
-        for artikel in artikel_records:
-            cur.execute(
-                """
-                INSERT INTO Artikel (article_id, cluster_id, pubtime, medium_name, head, article_link)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (article_id) DO NOTHING;
-                """,
-                (
-                    artikel["article_id"],
-                    artikel["cluster_id"],
-                    artikel["pubtime"],
-                    artikel["medium_name"],
-                    artikel["head"],
-                    artikel["article_link"]
-                )
-            )
-            print(f"Inserted Artikel with article_id: {artikel['article_id']}")
+        if method == "copy":
+            copy_records(cur, datasets)
+        else:
+            for data in datasets:
+                insert_records(cur, data)
 
         # Commit the transactions
         conn.commit()
+        return True
 
     except Exception as e:
         conn.rollback()
         print("Error inserting data:", e)
+        return False
     finally:
         cur.close()
         conn.close()
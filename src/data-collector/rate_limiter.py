@@ -0,0 +1,185 @@
+"""
+Proactive rate limiting for the Groq API keys.
+
+Every key has two token buckets, one for requests per minute and one for tokens per
+minute, that refill continuously. A caller reserves a request and its estimated tokens
+with acquire(), which picks the key with the most remaining budget and waits only when no
+key can take the request, so requests are never sent into a known throttle.
+"""
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Limits per API key (Groq free tier for llama3-8b-8192)
+GROQ_RPM_LIMIT = int(os.getenv("GROQ_RPM_LIMIT", "30"))
+GROQ_TPM_LIMIT = int(os.getenv("GROQ_TPM_LIMIT", "6000"))
+
+# Rough size of a token for estimating prompt tokens from characters
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(*texts, max_tokens=0):
+    """
+    Estimate the tokens a request will use: its prompt texts plus the completion budget.
+
+    Args:
+        *texts (str): The prompt texts (system and user message).
+        max_tokens (int): The completion's max_tokens.
+
+    Returns:
+        int: Estimated total tokens.
+    """
+    return sum(len(text) for text in texts) // CHARS_PER_TOKEN + 1 + max_tokens
+
+
+class TokenBucket:
+    """
+    A bucket of `capacity` units that refills at `capacity` units per `period` seconds.
+    """
+
+    def __init__(self, capacity, period=60.0, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.clock = clock
+        self.level = self.capacity
+        self.updated = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """
+        Seconds until `amount` units are available (0 if they are available now).
+        """
+        self.refill()
+        deficit = amount - self.level
+        # Ignore floating point residue of the refill arithmetic
+        return deficit / self.rate if deficit > 1e-9 else 0.0
+
+    def take(self, amount):
+        """
+        Remove `amount` units; a negative amount returns units, up to the capacity.
+        """
+        self.refill()
+        self.level = min(self.capacity, self.level - amount)
+
+    def drain(self, seconds):
+        """
+        Empty the bucket so that it is back to one unit only after `seconds`.
+        """
+        self.refill()
+        self.level = min(self.level, 1 - seconds * self.rate)
+
+
+class KeyRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets for each API key.
+
+    All methods are thread-safe; the key selection and the reservation happen under one lock.
+    """
+
+    def __init__(self, num_keys, rpm_limit=GROQ_RPM_LIMIT, tpm_limit=GROQ_TPM_LIMIT, clock=time.monotonic):
+        """
+        Args:
+            num_keys (int): Number of API keys.
+            rpm_limit (int): Requests per minute and key.
+            tpm_limit (int): Tokens per minute and key.
+            clock (callable): Monotonic clock in seconds, replaceable in tests.
+        """
+        self.num_keys = num_keys
+        self.tpm_limit = tpm_limit
+        self.clock = clock
+        self.requests = [TokenBucket(rpm_limit, clock=clock) for _ in range(num_keys)]
+        self.tokens = [TokenBucket(tpm_limit, clock=clock) for _ in range(num_keys)]
+        self.condition = threading.Condition()
+
+    def _wait_time(self, key_index, tokens):
+        return max(self.requests[key_index].wait_time(1), self.tokens[key_index].wait_time(tokens))
+
+    def acquire(self, tokens, excluded=(), timeout=None):
+        """
+        Reserve one request and `tokens` tokens on the key with the most remaining budget.
+
+        Blocks until a key has enough budget. Requests larger than the tokens-per-minute
+        limit are capped at the limit, as they could otherwise never be sent.
+
+        Args:
+            tokens (int): Estimated tokens of the request (see estimate_tokens).
+            excluded (set): Key indices that must not be used (e.g. blacklisted keys).
+            timeout (float): Maximum seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            tuple: (key_index, reserved_tokens), or (None, 0) if no key is usable or the timeout expired.
+        """
+        if tokens > self.tpm_limit:
+            logger.warning(f"Request of ~{tokens} tokens exceeds the limit of {self.tpm_limit} tokens per minute")
+            tokens = self.tpm_limit
+        deadline = None if timeout is None else self.clock() + timeout
+
+        with self.condition:
+            while True:
+                candidates = [i for i in range(self.num_keys) if i not in excluded]
+                if not candidates:
+                    return None, 0
+
+                ready = [i for i in candidates if self._wait_time(i, tokens) == 0]
+                if ready:
+                    # Most remaining tokens first, then most remaining requests
+                    key_index = max(ready, key=lambda i: (self.tokens[i].level, self.requests[i].level))
+                    self.requests[key_index].take(1)
+                    self.tokens[key_index].take(tokens)
+                    return key_index, tokens
+
+                delay = min(self._wait_time(i, tokens) for i in candidates)
+                if deadline is not None:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        return None, 0
+                    delay = min(delay, remaining)
+                logger.debug(f"All API keys are at their rate limit, waiting {delay:.2f}s")
+                self.condition.wait(delay)
+
+    def settle(self, key_index, reserved_tokens, used_tokens):
+        """
+        Correct a reservation by the tokens the API actually reported.
+
+        Args:
+            key_index (int): The key of the request.
+            reserved_tokens (int): Tokens reserved by acquire.
+            used_tokens (int): Total tokens from the response's usage, or None if unknown.
+        """
+        if used_tokens is None:
+            return
+        with self.condition:
+            self.tokens[key_index].take(used_tokens - reserved_tokens)
+            self.condition.notify_all()
+
+    def refund(self, key_index, reserved_tokens):
+        """
+        Return the tokens of a reservation whose request failed without using any.
+
+        The request itself still counts against the key's requests per minute.
+        """
+        self.settle(key_index, reserved_tokens, 0)
+
+    def penalize(self, key_index, seconds):
+        """
+        Stop using a key for `seconds`, e.g. after the API answered with a rate-limit error.
+        """
+        with self.condition:
+            self.requests[key_index].drain(seconds)
+            self.condition.notify_all()
+
+    def remaining(self, key_index):
+        """
+        Return the currently available (requests, tokens) of a key.
+        """
+        with self.condition:
+            self.requests[key_index].refill()
+            self.tokens[key_index].refill()
+            return self.requests[key_index].level, self.tokens[key_index].level
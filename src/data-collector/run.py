@@ -1,14 +1,35 @@
 import datetime
 import argparse
 import os
-from get_news_data import fetch_swissdox_data
-from clean_data import clean_and_process_data
-from load_db import load_data, delete_data_for_date
-from clustering import identify_and_save_daily_events_to_df
-from content_to_relevant_titles import collect_wikipedia_candidates_per_cluster, filter_wikipedia_articles_with_groq, show_api_keys
-from cluster_data_to_db_json import generate_cluster_json
-from get_wiki_article import validate_wikipedia_titles
+from startup_profile import timed_step, print_startup_report
+
+with timed_step("import get_news_data"):
+    from get_news_data import fetch_swissdox_data, fetch_swissdox_windows, split_date_range, DAYS_PER_QUERY
+with timed_step("import clean_data"):
+    from clean_data import clean_and_process_data
+with timed_step("import load_db"):
+    from load_db import load_data, load_data_batch, delete_data_for_date
+with timed_step("import clustering"):
+    from clustering import identify_and_save_daily_events_to_df, get_nlp
+with timed_step("import entity_cache"):
+    from entity_cache import EntityCache
+with timed_step("import fingerprint_index"):
+    from fingerprint_index import FingerprintIndex
+with timed_step("import content_to_relevant_titles"):
+    from content_to_relevant_titles import collect_wikipedia_candidates_per_cluster, filter_wikipedia_articles_with_groq, show_api_keys, log_connection_stats, log_llm_cache_stats
+with timed_step("import cluster_data_to_db_json"):
+    from cluster_data_to_db_json import generate_cluster_records, write_cluster_json
+with timed_step("import get_wiki_article"):
+    from get_wiki_article import validate_wikipedia_titles
+with timed_step("import backfill"):
+    from backfill import cluster_days
+with timed_step("import checkpoints"):
+    from checkpoints import (
+        STAGES, save_dump, load_dump, save_dataframe, load_dataframe, save_cluster_titles,
+        load_cluster_titles, save_records, load_records, save_load_summary, prune_checkpoints
+    )
 from time import sleep
+import tempfile
 
 
 db_params = {
@@ -19,13 +40,181 @@ db_params = {
         "port": os.getenv("DB_PORT", "5432")
     }
 
+# Parameters of the cluster stage, shared by daily runs and backfills
+CLUSTER_PARAMS = {"max_events": 6, "min_entity_importance": 3, "min_articles": 5}
+
+# Directory for an optional JSON export of each date's records (<date>.json), unset to skip it
+JSON_EXPORT_DIR = os.getenv("JSON_EXPORT_DIR")
+
+
+def run_fetch(date):
+    """
+    Download the Swissdox dump of the date and keep it as the fetch checkpoint.
+    """
+    file_path = fetch_swissdox_data(date, date)
+    if file_path is None:
+        print("Error: Swissdox download failed.")
+        exit(1)
+    return save_dump(file_path, date)
+
+
+def run_clean(dump_path, date):
+    """
+    Clean and deduplicate the articles of the dump.
+    """
+    with FingerprintIndex() as fingerprint_index:
+        cleaned_data = clean_and_process_data(fingerprint_index=fingerprint_index, date=date, file_path=dump_path)
+    save_dataframe(cleaned_data, "clean", date)
+    return cleaned_data
+
+
+def run_cluster(cleaned_data, date):
+    """
+    Cluster the cleaned articles into the relevant events of the day.
+    """
+    with EntityCache() as entity_cache:
+        df_relevant_articles = identify_and_save_daily_events_to_df(cleaned_data, entity_cache=entity_cache, **CLUSTER_PARAMS)
+    save_dataframe(df_relevant_articles, "cluster", date)
+    return df_relevant_articles
+
+
+def run_titles(df_relevant_articles, date):
+    """
+    Summarise each cluster and collect Wikipedia title candidates.
+    """
+    df_cluster_topics, summary = collect_wikipedia_candidates_per_cluster(df_relevant_articles)
+    log_llm_cache_stats()
+    save_cluster_titles("titles", date, df_cluster_topics, summary)
+    return df_cluster_topics, summary
+
+
+def run_validate(df_cluster_topics, summary, date):
+    """
+    Keep the title candidates that are Wikipedia articles and match the cluster summary.
+    """
+    # validate titles with wikpedia articles
+    wikipedia_articles_cluster = validate_wikipedia_titles(df_cluster_topics)
+
+    # Validate titles with summary
+    wikipedia_articles_cluster = filter_wikipedia_articles_with_groq(summary, wikipedia_articles_cluster)
+    log_connection_stats()
+    save_cluster_titles("validate", date, wikipedia_articles_cluster, summary)
+    return wikipedia_articles_cluster
+
+
+def run_json(df_relevant_articles, wikipedia_articles_cluster, summary, date):
+    """
+    Convert the clusters, their articles and Wikipedia titles to database records.
+    """
+    records = generate_cluster_records(df_relevant_articles, wikipedia_articles_cluster, summary)
+    save_records("json", date, records)
+    if JSON_EXPORT_DIR:
+        write_cluster_json(records, os.path.join(JSON_EXPORT_DIR, f"{date}.json"))
+    return records
+
+
+def run_load(records, date):
+    """
+    Load the records into the database and request the history of their Wikipedia articles.
+
+    Exits with status 1 if the load was rolled back, so the load checkpoint is not written.
+    """
+    if not load_data(records, db_params):
+        exit(1)
+    save_load_summary(date, len(records["cluster"]), len(records["artikel"]))
+    prune_checkpoints()
+    request_history_collection(records)
+
+
+def request_history_collection(records):
+    """
+    Ask the orchestrator to collect the history of every Wikipedia article of the records.
+    """
+    for cluster in records["cluster"]:
+        for article in cluster["wikipedia_article_names"]:
+            os.system(f'curl -X POST "http://orchestrator:5025/command" -H "Content-Type: application/json" -d \'{{"command": "collect-history {article.strip()}"}}\'')
+            sleep(0.5)
+
+
+def run_backfill(start_date, end_date):
+    """
+    Process every day from start_date to end_date with concurrent Swissdox queries.
+
+    The range is queried in windows of DAYS_PER_QUERY days, up to MAX_CONCURRENT_QUERIES at
+    a time. The dumps are split by publication date, clean and cluster run per day in a
+    process pool (see backfill.py), titles, validation and records are produced per day,
+    and all days are loaded into the database in one transaction.
+    """
+    windows = split_date_range(start_date, end_date, DAYS_PER_QUERY)
+    print(f"Backfill: {len(windows)} Swissdox queries of up to {DAYS_PER_QUERY} days")
+    file_paths = fetch_swissdox_windows(windows)
+    if any(file_path is None for file_path in file_paths.values()):
+        print("Error: Swissdox download failed.")
+        exit(1)
+    dump_paths = [save_dump(file_paths[window], f"{window[0]}_{window[1]}") for window in windows]
+
+    with FingerprintIndex() as fingerprint_index, tempfile.TemporaryDirectory() as work_dir:
+        clustered_days = cluster_days(dump_paths, start_date, end_date, work_dir, fingerprint_index, CLUSTER_PARAMS)
+
+    record_batches = []
+    for date in sorted(clustered_days):
+        df_relevant_articles = clustered_days[date]
+        if df_relevant_articles.empty:
+            print(f"No relevant clusters on {date}")
+            continue
+        print(f"\nProcessing clusters of {date}")
+        df_cluster_topics, summary = run_titles(df_relevant_articles, date)
+        wikipedia_articles_cluster = run_validate(df_cluster_topics, summary, date)
+        record_batches.append((date, run_json(df_relevant_articles, wikipedia_articles_cluster, summary, date)))
+
+    if not load_data_batch([records for _, records in record_batches], db_params):
+        exit(1)
+    for date, records in record_batches:
+        save_load_summary(date, len(records["cluster"]), len(records["artikel"]))
+    prune_checkpoints()
+    for _, records in record_batches:
+        request_history_collection(records)
+
+
+def parse_date(value):
+    """
+    Parse a YYYY-MM-DD command-line date.
+    """
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}'. Please use YYYY-MM-DD.")
+
+
 # Calculate the date range for the last week
 # Parse command-line arguments
 parser = argparse.ArgumentParser(description='Process news data for a specific date.')
 parser.add_argument('--date', type=str, default='latest', help='Date in YYYY-MM-DD format or "latest" for the latest data (which is two days ago)')
 parser.add_argument('--delete', action='store_true', default=False, help='Delete all information about the specified date before reloading it')
+parser.add_argument('--from', dest='from_date', type=parse_date, default=None, help='Backfill: first date (YYYY-MM-DD) of a range processed with one Swissdox query')
+parser.add_argument('--to', dest='to_date', type=parse_date, default=None, help='Backfill: last date (YYYY-MM-DD) of the range, defaults to the latest date (two days ago)')
+parser.add_argument('--resume-from', type=str, choices=STAGES, default=STAGES[0], help='Start at this stage, reading the checkpoints of the previous stages for the date')
+parser.add_argument('--profile-startup', action='store_true', default=False, help='Report import and spaCy model load times per module, then exit')
 args = parser.parse_args()
 
+if args.profile_startup:
+    with timed_step("load spaCy model"):
+        get_nlp()
+    exit(0 if print_startup_report() else 1)
+
+# Backfill a date range instead of a single date
+if args.to_date is not None and args.from_date is None:
+    parser.error("--to requires --from")
+if args.from_date is not None:
+    end_date = args.to_date or datetime.date.today() - datetime.timedelta(days=2)
+    if end_date < args.from_date or end_date > datetime.date.today():
+        print(f"Error: Invalid backfill range {args.from_date} to {end_date}.")
+        exit(1)
+    print(f"Backfilling data from {args.from_date} to {end_date}")
+    show_api_keys()
+    run_backfill(args.from_date, end_date)
+    exit(0)
+
 # Handle the date parameter
 if args.date.lower() == "latest":
     date_of_interest = datetime.date.today() - datetime.timedelta(days=2)
@@ -50,44 +239,54 @@ if args.delete:
     if not args.date.lower() == "latest":  # If just deleting data, exit after deletion
         exit(0)
 
+def runs(stage):
+    """
+    Whether a stage is computed in this run (as opposed to read from its checkpoint).
+    """
+    return STAGES.index(stage) >= STAGES.index(args.resume_from)
+
+
+if args.resume_from != STAGES[0]:
+    print(f"Resuming from stage '{args.resume_from}' with the checkpoints of {date_of_interest}")
+
 # Show API keys
 show_api_keys()
 
 # download data
-fetch_swissdox_data(date_of_interest, date_of_interest)
+if runs("fetch"):
+    dump_path = run_fetch(date_of_interest)
 
 # clean data
-cleaned_data = clean_and_process_data()
-
+if runs("clean"):
+    if not runs("fetch"):
+        dump_path = load_dump(date_of_interest)
+    cleaned_data = run_clean(dump_path, date_of_interest)
 
 # clustering for relevant articles
-df_relevant_articles = identify_and_save_daily_events_to_df(cleaned_data, max_events=6, min_entity_importance=3, min_articles=5)
-
-
+if runs("cluster"):
+    if not runs("clean"):
+        cleaned_data = load_dataframe("clean", date_of_interest)
+    df_relevant_articles = run_cluster(cleaned_data, date_of_interest)
+elif runs("json"):
+    df_relevant_articles = load_dataframe("cluster", date_of_interest)
 
 # content to wikipedia titles
-df_cluster_topics, summary = collect_wikipedia_candidates_per_cluster(df_relevant_articles)
-
-
-# validate titles with wikpedia articles
-wikipedia_articles_cluster = validate_wikipedia_titles(df_cluster_topics)
-
-# Validate titles with summary
-wikipedia_articles_cluster = filter_wikipedia_articles_with_groq(summary, wikipedia_articles_cluster)
-
-
-
-# convert relevant context to json format
-json_data = generate_cluster_json(df_relevant_articles, wikipedia_articles_cluster, summary)
+if runs("titles"):
+    df_cluster_topics, summary = run_titles(df_relevant_articles, date_of_interest)
 
+# validate titles with wikipedia articles and the summary
+if runs("validate"):
+    if not runs("titles"):
+        df_cluster_topics, summary = load_cluster_titles("titles", date_of_interest)
+    wikipedia_articles_cluster = run_validate(df_cluster_topics, summary, date_of_interest)
+elif runs("json"):
+    wikipedia_articles_cluster, summary = load_cluster_titles("validate", date_of_interest)
 
+# convert relevant context to database records
+if runs("json"):
+    records = run_json(df_relevant_articles, wikipedia_articles_cluster, summary, date_of_interest)
+else:
+    records = load_records("json", date_of_interest)
 
 # load data to database
-load_data(json_data, db_params)
-
-
-for cluster_id, articles in wikipedia_articles_cluster.items():
-    for article in articles:
-        os.system(f'curl -X POST "http://orchestrator:5025/command" -H "Content-Type: application/json" -d \'{{"command": "collect-history {article.strip()}"}}\'')
-        sleep(0.5)
-
+run_load(records, date_of_interest)
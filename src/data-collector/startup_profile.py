@@ -0,0 +1,53 @@
+"""
+Startup-time measurement for the data-collector.
+
+run.py wraps its module imports and the spaCy model load in timed_step(); with
+--profile-startup the collected timings are printed and compared against the budget.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+# Seconds a container may spend on imports and model loading before real work starts
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "15"))
+
+STARTUP_TIMINGS = []
+
+
+@contextmanager
+def timed_step(label):
+    """
+    Record the wall time of the wrapped block under the given label.
+
+    Args:
+        label (str): Name of the step, e.g. "import clustering".
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS.append((label, time.perf_counter() - start))
+
+
+def print_startup_report(budget_seconds=STARTUP_BUDGET_SECONDS):
+    """
+    Print the recorded startup steps, slowest first, and check them against the budget.
+
+    Args:
+        budget_seconds (float): Allowed total startup time. Defaults to STARTUP_BUDGET_SECONDS.
+
+    Returns:
+        bool: True if the total startup time is within the budget.
+    """
+    total = sum(seconds for _, seconds in STARTUP_TIMINGS)
+    width = max((len(label) for label, _ in STARTUP_TIMINGS), default=0)
+
+    print("Startup profile:")
+    for label, seconds in sorted(STARTUP_TIMINGS, key=lambda x: x[1], reverse=True):
+        print(f"  {label.ljust(width)}  {seconds:8.3f}s")
+    print(f"  {'total'.ljust(width)}  {total:8.3f}s (budget {budget_seconds:.1f}s)")
+
+    within_budget = total <= budget_seconds
+    if not within_budget:
+        print(f"Warning: startup exceeded the budget by {total - budget_seconds:.3f}s")
+    return within_budget
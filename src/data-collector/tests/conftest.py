@@ -0,0 +1,24 @@
+import spacy
+
+# Replace the German model with a blank pipeline and an entity ruler before clustering
+# loads it on first use, so the tests run without downloading de_core_news_md.
+ENTITY_PATTERNS = [
+    {"label": "PER", "pattern": name}
+    for name in ["Karin Keller-Sutter", "Alain Berset", "Donald Trump", "Viola Amherd", "Ignazio Cassis"]
+] + [
+    {"label": "LOC", "pattern": name}
+    for name in ["Bern", "Zürich", "Genf", "Basel", "Washington", "Lugano"]
+] + [
+    {"label": "ORG", "pattern": name}
+    for name in ["Bundesrat", "Nationalbank", "UBS", "SBB"]
+]
+
+
+def _blank_german_pipeline(*args, **kwargs):
+    nlp = spacy.blank("de")
+    nlp.add_pipe("entity_ruler").add_patterns(ENTITY_PATTERNS)
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+spacy.load = _blank_german_pipeline
@@ -0,0 +1,110 @@
+"""
+Minimal in-process fake of the Groq chat completions API for tests.
+
+Answers POST /openai/v1/chat/completions with an OpenAI-style completion whose content is
+produced by a configurable responder, and records requests and client connections.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server.fake
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+        api_key = self.headers.get("Authorization", "").replace("Bearer ", "")
+        with server.lock:
+            server.requests.append(body)
+            server.connections.add(self.client_address)
+            server.api_keys.append(api_key)
+
+        if self.path != "/openai/v1/chat/completions":
+            self.send_error(404)
+            return
+        status = server.errors.get(api_key)
+        if status:
+            self.send_error(status)
+            return
+
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            content = server.responder(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+        completion = {
+            "id": f"chatcmpl-{len(server.requests)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", ""),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+        payload = json.dumps(completion).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def default_responder(body):
+    # Batched prompts number their chunks as "[1] ...", "[2] ..."
+    numbers = re.findall(r"^\[(\d+)\] ", body["messages"][-1]["content"], re.MULTILINE)
+    if numbers:
+        results = [{"id": int(number), "summary": f"Zusammenfassung {number}.", "titles": ["Bundesrat"]} for number in numbers]
+        return json.dumps({"results": results}, ensure_ascii=False)
+    return json.dumps({"summary": "Zusammenfassung.", "titles": ["Bundesrat"]}, ensure_ascii=False)
+
+
+class FakeLLM:
+    """
+    Fake Groq server running in a background thread.
+
+    Attributes:
+        responder (callable): Builds the completion content from the request body.
+        latency (float): Seconds to wait before answering each request.
+        requests (list): JSON bodies of all requests.
+        api_keys (list): API key of every request.
+        connections (set): Distinct client (host, port) pairs, i.e. TCP connections.
+        max_in_flight (int): Highest number of requests answered at the same time.
+        errors (dict): HTTP status to answer with, by API key (e.g. 429 for a rate-limited key).
+    """
+
+    def __init__(self):
+        self.responder = default_responder
+        self.latency = 0
+        self.requests = []
+        self.api_keys = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errors = {}
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeLLMHandler)
+        self.httpd.fake = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
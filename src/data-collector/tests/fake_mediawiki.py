@@ -0,0 +1,117 @@
+"""
+Minimal in-process fake of the MediaWiki Action API for tests and benchmarks.
+
+Answers GET /w/api.php?action=query with titles (normalisation, redirects and the
+disambiguation page property) or list=search, in the formatversion=2 layout, and records
+requests and client connections.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeMediaWikiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.fake
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.requests.append(params)
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            if url.path != "/w/api.php" or params.get("action") != "query" or params.get("formatversion") != "2":
+                self.send_error(400)
+                return
+            if params.get("list") == "search":
+                self.send_json({"query": server.search(params["srsearch"], int(params.get("srlimit", 10)))})
+            else:
+                self.send_json({"query": server.query(params["titles"].split("|"))})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_json(self, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeMediaWiki:
+    """
+    Fake MediaWiki API server running in a background thread.
+
+    Attributes:
+        articles (set): Titles of the existing articles.
+        disambiguations (set): Titles of the existing disambiguation pages.
+        redirects (dict): Redirect targets by title.
+        search_results (dict): Search result titles by search term.
+        latency (float): Seconds to wait before answering each request.
+        requests (list): Query parameters of all requests.
+        connections (set): Distinct client (host, port) pairs, i.e. TCP connections.
+        max_in_flight (int): Highest number of requests answered at the same time.
+    """
+
+    def __init__(self):
+        self.articles = set()
+        self.disambiguations = set()
+        self.redirects = {}
+        self.search_results = {}
+        self.latency = 0
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeMediaWikiHandler)
+        self.httpd.fake = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/w/api.php"
+
+    def query(self, titles):
+        result = {"normalized": [], "redirects": [], "pages": []}
+        for title in titles:
+            # MediaWiki upper-cases the first letter and uses spaces instead of underscores
+            normalized = (title[:1].upper() + title[1:]).replace("_", " ")
+            if normalized != title:
+                result["normalized"].append({"from": title, "to": normalized})
+            if normalized in self.redirects:
+                result["redirects"].append({"from": normalized, "to": self.redirects[normalized]})
+                normalized = self.redirects[normalized]
+            if normalized in self.articles:
+                result["pages"].append({"pageid": abs(hash(normalized)) % 10 ** 6, "ns": 0, "title": normalized})
+            elif normalized in self.disambiguations:
+                result["pages"].append({
+                    "pageid": abs(hash(normalized)) % 10 ** 6, "ns": 0, "title": normalized,
+                    "pageprops": {"disambiguation": ""}
+                })
+            else:
+                result["pages"].append({"ns": 0, "title": normalized, "missing": True})
+        return result
+
+    def search(self, term, limit):
+        return {"search": [{"ns": 0, "title": title} for title in self.search_results.get(term, [])[:limit]]}
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,39 @@
+"""
+In-memory stand-in for the subset of redis.Redis (decode_responses=True) used by title_cache.
+"""
+import redis
+
+
+class FakeRedis:
+    """
+    The subset of redis.Redis (decode_responses=True) used by TitleCache, with expiry on a fake clock.
+    """
+
+    def __init__(self):
+        self.now = 0
+        self.data = {}
+        self.fail = False
+
+    def mget(self, keys):
+        if self.fail:
+            raise redis.ConnectionError("Connection refused")
+        return [value if expires > self.now else None for value, expires in (self.data.get(key, (None, 0)) for key in keys)]
+
+    def set(self, key, value, ex):
+        self.data[key] = (value, self.now + ex)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, key, value, ex):
+        self.commands.append((key, value, ex))
+
+    def execute(self):
+        for command in self.commands:
+            self.client.set(*command)
@@ -0,0 +1,158 @@
+"""
+Minimal in-process fake of the Swissdox API for tests.
+
+Accepts queries (POST /api/query), reports their status (GET /api/status/<id>) and serves result
+files under /downloads/<name> with HTTP Range support. It can drop the connection
+part-way through a response to simulate a broken download.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeSwissdoxHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.fake
+        server.log_request(self.path, self.headers)
+        if self.path.startswith("/downloads/"):
+            self.send_download(server, self.path[len("/downloads/"):])
+        elif self.path.startswith("/api/status/"):
+            self.send_status(server, int(self.path[len("/api/status/"):]))
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        server = self.server.fake
+        server.log_request(self.path, self.headers)
+        if self.path != "/api/query":
+            self.send_error(404)
+            return
+        form = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+        with server.lock:
+            query_id = len(server.queries) + 1
+            server.queries[query_id] = {"query": form["query"][0], "polls": 0}
+            server.files[f"query-{query_id}.tsv.xz"] = server.result_for_query(form["query"][0])
+        if query_id in server.invalid_json_queries:
+            body = b"<html>Wartungsarbeiten</html>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_json({"queryId": query_id})
+
+    def send_status(self, server, query_id):
+        with server.lock:
+            query = server.queries.get(query_id)
+            if query is None:
+                self.send_error(404)
+                return
+            query["polls"] += 1
+            polls_needed = server.polls_until_finished.get(query_id, 1)
+        if query["polls"] >= polls_needed:
+            status = {"status": "finished", "downloadUrl": server.download_url(f"query-{query_id}.tsv.xz")}
+        else:
+            status = {"status": "running"}
+        self.send_json([status])
+
+    def send_json(self, data):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_download(self, server, name):
+        content = server.files.get(name)
+        if content is None:
+            self.send_error(404)
+            return
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and not server.ignore_range:
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(content)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}")
+        else:
+            self.send_response(200)
+        body = content[start:]
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        if server.break_after:
+            # Send only part of the body, then drop the connection
+            cut = server.break_after.pop(0)
+            self.wfile.write(body[:cut])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class FakeSwissdox:
+    """
+    Fake Swissdox server running in a background thread.
+
+    Attributes:
+        files (dict): Result files by name, served under /downloads/<name>.
+        queries (dict): Submitted queries by ID, with their YAML and the number of status polls.
+        polls_until_finished (dict): Status polls per query ID before it is finished (default 1).
+        invalid_json_queries (set): Query IDs whose submission is answered with 200 and a non-JSON body.
+        result_for_query (callable): Builds the result file of a query from its YAML.
+        break_after (list): Byte counts after which successive download responses are cut off.
+        ignore_range (bool): Answer Range requests with the full file (status 200).
+        requests (list): (time, path, headers) of every request received.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.queries = {}
+        self.polls_until_finished = {}
+        self.invalid_json_queries = set()
+        self.result_for_query = lambda query: query.encode("utf-8")
+        self.lock = threading.Lock()
+        self.break_after = []
+        self.ignore_range = False
+        self.requests = []
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), FakeSwissdoxHandler)
+        self.httpd.fake = self
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    @property
+    def api_url(self):
+        return f"{self.base_url}/api"
+
+    def log_request(self, path, headers):
+        with self.lock:
+            self.requests.append((time.monotonic(), path, dict(headers)))
+
+    def download_url(self, name):
+        return f"{self.base_url}/downloads/{name}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
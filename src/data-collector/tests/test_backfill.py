@@ -0,0 +1,93 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+import checkpoints
+from backfill import cluster_days, read_day, split_dump_by_date
+from fingerprint_index import FingerprintIndex
+
+
+TARIFFS = [
+    ("Donald Trump kündigt neue Zölle an", "Donald Trump will Zölle auf Importe aus der Schweiz erheben. Der Bundesrat in Bern reagiert."),
+    ("Zölle: Bundesrat reagiert auf Donald Trump", "Der Bundesrat in Bern prüft Gegenmassnahmen zu den Zöllen von Donald Trump."),
+    ("Bundesrat in Bern zu Zöllen von Donald Trump", "Donald Trump und die Zölle: Der Bundesrat in Bern berät über Massnahmen."),
+]
+INTEREST_RATES = [
+    ("Nationalbank senkt den Leitzins", "Die Nationalbank in Zürich senkt den Leitzins wegen der tiefen Teuerung."),
+    ("Leitzins gesenkt: Nationalbank reagiert auf Teuerung", "In Zürich hat die Nationalbank den Leitzins erneut gesenkt."),
+    ("Nationalbank in Zürich: Leitzins sinkt", "Die Nationalbank in Zürich senkt den Leitzins, die UBS begrüsst den Schritt."),
+]
+CLUSTER_PARAMS = {"max_events": 4, "min_entity_importance": 3, "min_articles": 2}
+
+
+def dump_rows(day, corpus, id_prefix):
+    return [{
+        'id': f"{id_prefix}{i}",
+        'pubtime': f"{day} {8 + i:02d}:00:00",
+        'medium_code': "TST",
+        'medium_name': "Testzeitung",
+        'char_count': len(content),
+        'head': head,
+        'article_link': f"https://example.ch/{id_prefix}/{i}",
+        'content_id': f"{id_prefix}{i}",
+        'content': f"<p>{content}</p>",
+    } for i, (head, content) in enumerate(corpus)]
+
+
+def write_dump(path, days=("2025-04-08", "2025-04-09", "2025-04-11")):
+    rows = {
+        "2025-04-08": dump_rows("2025-04-08", TARIFFS, "a"),
+        "2025-04-09": (
+            dump_rows("2025-04-09", INTEREST_RATES, "b")
+            + dump_rows("2025-04-09", TARIFFS, "a")        # reposts of the first day
+        ),
+        "2025-04-11": dump_rows("2025-04-11", INTEREST_RATES, "c"),  # outside the backfill range
+    }
+    pd.DataFrame([row for day in days for row in rows[day]]).to_csv(path, sep='\t', index=False, compression='xz')
+
+
+def test_split_dump_by_date_streams_chunks_per_day(tmp_path):
+    dump = tmp_path / "dump.tsv.xz"
+    write_dump(dump)
+
+    parts = split_dump_by_date(str(dump), str(tmp_path), datetime.date(2025, 4, 8), datetime.date(2025, 4, 10), chunksize=4)
+
+    assert sorted(parts) == [datetime.date(2025, 4, 8), datetime.date(2025, 4, 9)]
+    # Rows 3 to 8 of the dump span three chunks of four rows
+    assert len(parts[datetime.date(2025, 4, 9)]) == 3
+    day = read_day(parts[datetime.date(2025, 4, 9)])
+    assert day['id'].tolist() == ['b0', 'b1', 'b2', 'a0', 'a1', 'a2']
+    assert not day['content'].str.contains('<p>').any()
+
+
+@pytest.mark.parametrize("windows", [
+    [("2025-04-08", "2025-04-09", "2025-04-11")],
+    # One dump per date window, as downloaded by fetch_swissdox_windows
+    [("2025-04-08",), ("2025-04-09",), ("2025-04-11",)],
+])
+def test_cluster_days_runs_each_day_once_with_cross_day_dedup(tmp_path, monkeypatch, windows):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    dumps = []
+    for number, days in enumerate(windows):
+        dumps.append(str(tmp_path / f"dump-{number}.tsv.xz"))
+        write_dump(dumps[-1], days)
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+
+    with FingerprintIndex(str(tmp_path / "index.sqlite")) as index:
+        results = cluster_days(
+            dumps, datetime.date(2025, 4, 8), datetime.date(2025, 4, 10), str(work_dir), index,
+            CLUSTER_PARAMS, workers=2
+        )
+
+    assert sorted(results) == [datetime.date(2025, 4, 8), datetime.date(2025, 4, 9)]
+    assert sorted(results[datetime.date(2025, 4, 8)]['id']) == ['a0', 'a1', 'a2']
+    # The reposted tariff articles were already clustered on the 8th
+    assert sorted(results[datetime.date(2025, 4, 9)]['id']) == ['b0', 'b1', 'b2']
+
+    for date, df in results.items():
+        cluster_checkpoint = checkpoints.load_dataframe("cluster", date)
+        assert cluster_checkpoint['id'].tolist() == df['id'].tolist()
+        assert len(checkpoints.load_dataframe("clean", date)) == 3
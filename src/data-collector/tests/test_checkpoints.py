@@ -0,0 +1,87 @@
+import datetime
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from checkpoints import (
+    STAGES,
+    load_cluster_titles,
+    load_dataframe,
+    load_dump,
+    load_records,
+    previous_stage,
+    prune_checkpoints,
+    save_cluster_titles,
+    save_dataframe,
+    save_dump,
+    save_records,
+)
+
+
+DATE = datetime.date(2025, 4, 9)
+
+
+def test_previous_stage_follows_pipeline_order():
+    assert previous_stage("fetch") is None
+    assert [previous_stage(stage) for stage in STAGES[1:]] == STAGES[:-1]
+
+
+def test_dataframe_checkpoint_keeps_types(tmp_path):
+    df = pd.DataFrame({
+        'id': [1, 2],
+        'cluster_id': [0, 0],
+        'pubtime': pd.to_datetime(['2025-04-09 08:00', '2025-04-09 09:30']),
+        'head': ['Zölle', None],
+        'content': ['Der Bundesrat tagt.', ''],
+    })
+
+    save_dataframe(df, "cluster", DATE, checkpoint_dir=str(tmp_path))
+    result = load_dataframe("cluster", DATE, checkpoint_dir=str(tmp_path))
+
+    assert result['pubtime'].tolist() == df['pubtime'].tolist()
+    assert result['id'].tolist() == [1, 2]
+    assert result['head'].tolist()[0] == 'Zölle' and pd.isna(result['head'].tolist()[1])
+
+
+def test_cluster_titles_checkpoint_round_trip(tmp_path):
+    titles = {0: ['Bundesrat', 'Zoll'], 2: []}
+    summaries = {0: 'Der Bundesrat berät.', 1: 'Die Nationalbank senkt den Leitzins.', 2: 'SBB'}
+
+    save_cluster_titles("titles", DATE, titles, summaries, checkpoint_dir=str(tmp_path))
+
+    assert load_cluster_titles("titles", DATE, checkpoint_dir=str(tmp_path)) == (titles, summaries)
+
+
+def test_records_and_dump_checkpoints(tmp_path):
+    data = {
+        'artikel': [{'article_id': '1', 'cluster_id': 'abc', 'pubtime': '2025-04-09T08:00:00'}],
+        'cluster': [{'cluster_id': 'abc', 'wikipedia_article_names': ['Bundesrat'], 'summary_text': None}],
+    }
+    save_records("json", DATE, data, checkpoint_dir=str(tmp_path))
+    assert load_records("json", DATE, checkpoint_dir=str(tmp_path)) == data
+
+    download = tmp_path / "download.tsv.xz"
+    download.write_bytes(b"dump")
+    path = save_dump(str(download), DATE, checkpoint_dir=str(tmp_path / "checkpoints"))
+    assert load_dump(DATE, checkpoint_dir=str(tmp_path / "checkpoints")) == path
+    assert not download.exists()
+
+    with pytest.raises(FileNotFoundError):
+        load_dataframe("clean", DATE, checkpoint_dir=str(tmp_path))
+
+
+def test_prune_deletes_checkpoints_not_written_within_retention(tmp_path):
+    now = time.time()
+    for date, age_days in [("2025-03-01", 20), ("2025-03-02", 3), ("2025-03-03_2025-03-09", 15)]:
+        save_records("json", date, {"cluster": [{"cluster_id": "abc"}]}, checkpoint_dir=str(tmp_path))
+        directory = tmp_path / date
+        for path in [directory / "json-cluster.parquet", directory]:
+            os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+    # An old date that was just processed again is kept
+    save_dataframe(pd.DataFrame({'id': [1]}), "clean", "2025-03-03_2025-03-09", checkpoint_dir=str(tmp_path))
+
+    assert prune_checkpoints(14, checkpoint_dir=str(tmp_path), now=now) == ["2025-03-01"]
+    assert sorted(os.listdir(tmp_path)) == ["2025-03-02", "2025-03-03_2025-03-09"]
+    assert prune_checkpoints(14, checkpoint_dir=str(tmp_path / "missing")) == []
@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from clean_data import clean_text, clean_text_series, read_swissdox_dump
+
+
+TEXTS = [
+    "<p>Der Bundesrat   tagt in <b>Bern</b>.</p>",
+    "Mehr unter https://example.ch/dossier?id=1 und www.example.ch/news &amp; &#8220;Zitat&#8221;",
+    "  Zeile 1\n\nZeile 2\t\tEnde  ",
+    "<a href='https://x.ch/<b>a</b>'>Link</a>",
+    "",
+    None,
+    float('nan'),
+]
+
+
+def test_clean_text_series_matches_clean_text():
+    series = pd.Series(TEXTS, dtype=object)
+
+    assert clean_text_series(series).tolist() == [clean_text(text) for text in TEXTS]
+
+
+@pytest.mark.parametrize("chunksize", [None, 1, 3, 100])
+def test_read_swissdox_dump_is_independent_of_chunksize(tmp_path, chunksize):
+    path = tmp_path / "dump.tsv.xz"
+    df = pd.DataFrame({
+        ' id': range(len(TEXTS) * 3),
+        'head ': ['Titel'] * (len(TEXTS) * 3),
+        'content': TEXTS * 3,
+    })
+    df.to_csv(path, sep='\t', index=False, compression='xz')
+
+    result = read_swissdox_dump(str(path), chunksize)
+
+    assert list(result.columns) == ['id', 'head', 'content']
+    assert result['id'].tolist() == list(range(len(TEXTS) * 3))
+    assert result['content'].tolist() == [clean_text(text) for text in TEXTS] * 3
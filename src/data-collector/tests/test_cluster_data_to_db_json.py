@@ -0,0 +1,81 @@
+import datetime
+import json
+
+import numpy as np
+import pandas as pd
+
+from checkpoints import load_records, save_records
+from cluster_data_to_db_json import (
+    generate_cluster_id,
+    generate_cluster_json,
+    generate_cluster_records,
+    write_cluster_json,
+)
+from load_db import ARTIKEL_COLUMNS, copy_rows
+
+TOPICS = {0: ['Bundesrat', 'Bern'], 1: []}
+SUMMARIES = {0: 'Der Bundesrat tagt.'}
+
+
+def clustered_articles():
+    return pd.DataFrame({
+        'id': [5, 3, 9],
+        'cluster_id': [1, 0, 1],
+        'pubtime': pd.to_datetime(['2025-04-09 08:00:01.5', '2025-04-09 09:30:00', '2025-04-09 10:00:00'], format='ISO8601'),
+        'medium_name': ['NZZ', 'Blick', np.nan],
+        'head': ['Zölle', 'Bundesrat', 'Budget'],
+        'article_link': ['https://nzz.ch/1', 'https://blick.ch/2', 'https://srf.ch/3'],
+        'content': ['Text 1.', 'Text 2.', 'Text 3.'],
+    })
+
+
+def test_records_are_typed_and_ordered_by_cluster():
+    records = generate_cluster_records(clustered_articles(), TOPICS, SUMMARIES)
+
+    cluster_0 = generate_cluster_id('0', '2025-04-09')
+    cluster_1 = generate_cluster_id('1', '2025-04-09')
+    assert records['cluster'] == [
+        {'cluster_id': cluster_0, 'wikipedia_article_names': ['Bundesrat', 'Bern'],
+         'date': datetime.date(2025, 4, 9), 'summary_text': 'Der Bundesrat tagt.'},
+        {'cluster_id': cluster_1, 'wikipedia_article_names': [],
+         'date': datetime.date(2025, 4, 9), 'summary_text': None},
+    ]
+    assert [(a['article_id'], a['cluster_id']) for a in records['artikel']] == [
+        ('3', cluster_0), ('5', cluster_1), ('9', cluster_1)
+    ]
+    assert records['artikel'][1]['pubtime'] == datetime.datetime(2025, 4, 9, 8, 0, 1)
+    assert records['artikel'][2]['medium_name'] is None
+
+
+def test_json_export_keeps_its_format(tmp_path):
+    records = generate_cluster_records(clustered_articles(), TOPICS, SUMMARIES)
+    path = tmp_path / 'export' / '2025-04-09.json'
+
+    write_cluster_json(records, str(path))
+
+    exported = json.loads(path.read_text(encoding='utf-8'))
+    assert path.read_text(encoding='utf-8') == generate_cluster_json(clustered_articles(), TOPICS, SUMMARIES)
+    assert exported['cluster'][0]['date'] == '2025-04-09'
+    assert exported['artikel'][1]['pubtime'] == '2025-04-09T08:00:01'
+    assert exported['artikel'][0]['head'] == 'Bundesrat'
+
+
+def test_records_checkpoint_and_load_without_json(tmp_path):
+    records = generate_cluster_records(clustered_articles(), TOPICS, SUMMARIES)
+
+    save_records('json', '2025-04-09', records, checkpoint_dir=str(tmp_path))
+    assert load_records('json', '2025-04-09', checkpoint_dir=str(tmp_path)) == records
+
+    line = next(copy_rows(records['artikel'], ARTIKEL_COLUMNS))
+    assert line.split('\t')[3] == '2025-04-09 09:30:00'
+
+
+def test_missing_values_are_exported_as_null():
+    df = clustered_articles()
+    df.loc[1, 'article_link'] = np.nan
+
+    exported = generate_cluster_json(df, TOPICS, SUMMARIES)
+
+    # Formerly written as the invalid JSON literal NaN and stored as the text 'NaN'
+    assert 'NaN' not in exported
+    assert [a['article_link'] for a in json.loads(exported)['artikel']] == [None, 'https://nzz.ch/1', 'https://srf.ch/3']
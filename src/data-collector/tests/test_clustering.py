@@ -0,0 +1,203 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from collections import Counter
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+import clustering
+from entity_cache import EntityCache
+from clustering import (
+    build_similarity_graph,
+    extract_entities,
+    extract_entities_batched,
+    extract_entities_sequential,
+    group_similar_articles,
+    identify_and_save_daily_events_to_df,
+)
+
+
+FIXED_CORPUS = [
+    ("Donald Trump kündigt neue Zölle an", "Donald Trump will Zölle auf Importe aus der Schweiz erheben. Der Bundesrat in Bern reagiert."),
+    ("Zölle: Bundesrat reagiert auf Donald Trump", "Der Bundesrat in Bern prüft Gegenmassnahmen zu den Zöllen von Donald Trump."),
+    ("Karin Keller-Sutter telefoniert mit Washington", "Karin Keller-Sutter sprach mit Washington über die Zölle von Donald Trump."),
+    ("Nationalbank senkt den Leitzins", "Die Nationalbank in Zürich senkt den Leitzins wegen der tiefen Teuerung."),
+    ("Leitzins gesenkt: Nationalbank reagiert auf Teuerung", "In Zürich hat die Nationalbank den Leitzins erneut gesenkt."),
+    ("UBS und Nationalbank: Leitzins sinkt", "Die UBS begrüsst, dass die Nationalbank den Leitzins senkt."),
+    ("SBB bauen in Basel aus", "Die SBB investieren in Basel in neue Gleise und Bahnhöfe."),
+    ("Bahnausbau: SBB in Basel", "Die SBB wollen den Bahnhof Basel bis 2035 ausbauen."),
+    ("Viola Amherd in Lugano", "Viola Amherd besuchte in Lugano eine Übung der Armee."),
+    ("Wetter: Sonne am Wochenende", "Am Wochenende wird es sonnig und warm."),
+    ("Sonniges Wochenende erwartet", "Das Wetter am Wochenende bleibt sonnig und warm."),
+    ("Alain Berset in Genf", "Alain Berset sprach in Genf vor dem Europarat."),
+]
+
+
+def legacy_group_similar_articles(article_entities, similarity_matrix, similarity_threshold, min_entity_importance, min_articles):
+    """Reference copy of the original set-based greedy grouping over a dense matrix."""
+    event_groups = []
+    used_indices = set()
+    article_importance = [(i, len(article['entities'])) for i, article in enumerate(article_entities)]
+    article_importance.sort(key=lambda x: x[1], reverse=True)
+
+    for idx, _ in article_importance:
+        if idx in used_indices:
+            continue
+        similar_indices = [idx]
+        used_indices.add(idx)
+        for other_idx in range(len(article_entities)):
+            if other_idx != idx and other_idx not in used_indices:
+                if similarity_matrix[idx, other_idx] > similarity_threshold:
+                    similar_indices.append(other_idx)
+                    used_indices.add(other_idx)
+        if len(similar_indices) >= min_articles:
+            group_entities = Counter()
+            group_articles = []
+            for i in similar_indices:
+                article = article_entities[i]
+                group_articles.append(f"{article['headline']} {article['content']}")
+                for entity, count in article['entities'].items():
+                    group_entities[entity] += count
+            if not group_entities:
+                for idx in similar_indices[1:]:
+                    used_indices.remove(idx)
+                continue
+            most_important_entity_count = group_entities.most_common(1)[0][1] if group_entities else 0
+            if most_important_entity_count < min_entity_importance:
+                for idx in similar_indices[1:]:
+                    used_indices.remove(idx)
+                continue
+            main_entities = [entity for entity, _ in group_entities.most_common(5)]
+            event_groups.append({
+                'main_entities': main_entities,
+                'articles': group_articles,
+                'article_indices': similar_indices,
+                'article_count': len(similar_indices),
+                'entity_counts': dict(group_entities.most_common(10)),
+                'importance_score': most_important_entity_count * len(similar_indices)
+            })
+    return event_groups
+
+
+def corpus_df(corpus):
+    return pd.DataFrame({
+        'id': [f"a{i}" for i in range(len(corpus))],
+        'pubtime': pd.date_range("2025-04-09 06:00", periods=len(corpus), freq="h"),
+        'medium_name': "Testzeitung",
+        'article_link': [f"https://example.ch/{i}" for i in range(len(corpus))],
+        'head': [head for head, _ in corpus],
+        'content': [content for _, content in corpus],
+    })
+
+
+def corpus_inputs(corpus):
+    headlines = [head for head, _ in corpus]
+    contents = [content for _, content in corpus]
+    entities = extract_entities_sequential(headlines, contents)
+    article_entities = [
+        {'headline': h, 'content': c, 'entities': e} for h, c, e in zip(headlines, contents, entities)
+    ]
+    texts = [f"{h} {c}" for h, c in zip(headlines, contents)]
+    tfidf_matrix = TfidfVectorizer(stop_words=clustering.get_german_stop_words()).fit_transform(texts)
+    return article_entities, tfidf_matrix
+
+
+@pytest.mark.parametrize("threshold,min_importance,min_articles", [
+    (0.1, 3, 2),
+    (0.2, 3, 2),
+    (0.35, 1, 2),
+    (0.2, 8, 2),
+    (0.05, 3, 3),
+])
+def test_grouping_matches_legacy_on_fixed_corpus(threshold, min_importance, min_articles):
+    article_entities, tfidf_matrix = corpus_inputs(FIXED_CORPUS)
+    dense = cosine_similarity(tfidf_matrix)
+
+    expected = legacy_group_similar_articles(article_entities, dense, threshold, min_importance, min_articles)
+
+    assert group_similar_articles(article_entities, dense, threshold, min_importance, min_articles) == expected
+    graph = build_similarity_graph(tfidf_matrix, threshold, block_size=5)
+    assert group_similar_articles(article_entities, graph, threshold, min_importance, min_articles) == expected
+
+
+def test_grouping_matches_legacy_with_released_groups():
+    # Random similarities and sparse entities exercise groups that are rejected and released.
+    rng = np.random.default_rng(7)
+    n = 60
+    similarity = rng.random((n, n))
+    similarity = (similarity + similarity.T) / 2
+    np.fill_diagonal(similarity, 1.0)
+    names = ["Bern", "Genf", "UBS", "SBB"]
+    article_entities = [
+        {'headline': f"h{i}", 'content': f"c{i}",
+         'entities': {name: int(rng.integers(1, 3)) for name in rng.choice(names, int(rng.integers(0, 3)), replace=False)}}
+        for i in range(n)
+    ]
+
+    for threshold in (0.5, 0.7, 0.9):
+        expected = legacy_group_similar_articles(article_entities, similarity, threshold, 4, 2)
+        assert group_similar_articles(article_entities, similarity, threshold, 4, 2) == expected
+
+
+def test_sparse_graph_keeps_only_edges_above_threshold():
+    _, tfidf_matrix = corpus_inputs(FIXED_CORPUS)
+    dense = cosine_similarity(tfidf_matrix)
+
+    graph = build_similarity_graph(tfidf_matrix, 0.2, block_size=4)
+
+    expected = np.where(dense > 0.2, dense, 0)
+    np.testing.assert_allclose(graph.toarray(), expected)
+    assert graph.nnz == np.count_nonzero(dense > 0.2)
+
+
+def test_batched_ner_matches_sequential():
+    headlines = [head for head, _ in FIXED_CORPUS]
+    contents = [content for _, content in FIXED_CORPUS]
+
+    assert extract_entities_batched(headlines, contents, batch_size=4) == extract_entities_sequential(headlines, contents)
+
+
+def test_identify_events_is_identical_across_backends():
+    rng = random.Random(3)
+    corpus = FIXED_CORPUS * 3
+    rng.shuffle(corpus)
+    df = corpus_df(corpus)
+
+    reference = identify_and_save_daily_events_to_df(
+        df, max_events=4, similarity_threshold=0.3, min_entity_importance=3, min_articles=2,
+        ner_mode="loop", similarity_backend="dense"
+    )
+    result = identify_and_save_daily_events_to_df(
+        df, max_events=4, similarity_threshold=0.3, min_entity_importance=3, min_articles=2,
+        ner_mode="pipe", similarity_backend="sparse"
+    )
+
+    assert not reference.empty
+    pd.testing.assert_frame_equal(result, reference)
+
+
+def test_entity_cache_skips_ner_for_seen_articles(tmp_path, monkeypatch):
+    headlines = [head for head, _ in FIXED_CORPUS]
+    contents = [content for _, content in FIXED_CORPUS]
+    expected = extract_entities_sequential(headlines, contents)
+
+    calls = []
+    original = clustering.extract_entities_batched
+
+    def counting_extractor(h, c, **kwargs):
+        calls.append(len(h))
+        return original(h, c, **kwargs)
+
+    monkeypatch.setattr(clustering, "extract_entities_batched", counting_extractor)
+
+    with EntityCache(str(tmp_path / "entities.sqlite")) as cache:
+        assert extract_entities(headlines[:6] * 2, contents[:6] * 2, entity_cache=cache) == expected[:6] * 2
+        assert extract_entities(headlines, contents, entity_cache=cache) == expected
+
+    with EntityCache(str(tmp_path / "entities.sqlite")) as cache:
+        assert extract_entities(headlines, contents, entity_cache=cache) == expected
+
+    # Duplicates are extracted once, cached articles never again
+    assert calls == [6, len(FIXED_CORPUS) - 6]
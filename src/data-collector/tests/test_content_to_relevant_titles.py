@@ -0,0 +1,265 @@
+import importlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from nltk.tokenize.punkt import PunktSentenceTokenizer
+
+import content_to_relevant_titles as titles
+import fake_llm
+from llm_cache import LLMCache
+from fake_llm import FakeLLM
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    server = FakeLLM().start()
+    monkeypatch.setattr(titles, "GROQ_BASE_URL", server.base_url)
+    monkeypatch.setattr(titles, "TOR_ENABLED", False)
+    monkeypatch.setattr(titles, "API_KEYS", ["key-1", "key-2"])
+    monkeypatch.setattr(titles, "BLACKLISTED_KEYS", set())
+    monkeypatch.setattr(titles, "RATE_LIMITER", None)
+    monkeypatch.setattr(titles, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(titles, "GROQ_CLIENTS", {})
+    monkeypatch.setattr(titles, "CONNECTION_STATS", {})
+    yield server
+    titles.close_groq_clients()
+    server.stop()
+
+
+def test_tor_proxy_per_key(monkeypatch):
+    monkeypatch.setattr(titles, "TOR_ENABLED", True)
+    assert titles.get_tor_proxy_url(0) == "socks5h://127.0.0.1:9050"
+    assert titles.get_tor_proxy_url(2) == "socks5h://127.0.0.1:9054"
+
+    monkeypatch.setattr(titles, "TOR_ENABLED", False)
+    assert titles.get_tor_proxy_url(1) is None
+
+
+def test_groq_is_called_without_proxy_by_default(monkeypatch):
+    monkeypatch.delenv("TOR_ENABLED", raising=False)
+    try:
+        importlib.reload(titles)
+        assert titles.TOR_ENABLED is False
+        assert titles.get_tor_proxy_url(0) is None
+
+        monkeypatch.setattr(titles, "API_KEYS", ["key-1"])
+        monkeypatch.setattr(titles, "GROQ_CLIENTS", {})
+        # httpx mounts a proxy transport for every proxied URL pattern
+        assert titles.get_groq_client(0)._client._mounts == {}
+    finally:
+        titles.close_groq_clients()
+        importlib.reload(titles)
+
+
+def test_pooled_client_reuses_connection_across_calls(llm, monkeypatch):
+    monkeypatch.setattr(titles, "API_KEYS", ["key-1"])
+    for _ in range(5):
+        assert titles.process_text_chunk("Der Bundesrat tagt in Bern.") == ("Zusammenfassung.", ["Bundesrat"])
+
+    assert titles.get_groq_client(0) is titles.get_groq_client(0)
+    assert titles.get_connection_stats() == {0: {"requests": 5, "new_connections": 1, "reused_connections": 4}}
+    assert len(llm.connections) == 1
+    assert llm.api_keys == ["key-1"] * 5
+
+
+def test_each_key_has_its_own_client(llm):
+    # The second call goes to the key with more remaining budget
+    titles.call_groq_api("Prompt", "System")
+    titles.call_groq_api("Prompt", "System")
+
+    assert titles.get_groq_client(0) is not titles.get_groq_client(1)
+    assert llm.api_keys == ["key-1", "key-2"]
+    assert set(titles.get_connection_stats()) == {0, 1}
+
+
+def clustered_articles(clusters=3, articles=4):
+    return pd.DataFrame({
+        "cluster_id": [cluster for cluster in range(clusters) for _ in range(articles)],
+        "combined_text": [f"Artikel {cluster}-{i}." for cluster in range(clusters) for i in range(articles)],
+    })
+
+
+@pytest.fixture
+def sentence_tokenizer(monkeypatch):
+    # An untrained Punkt tokenizer splits at sentence-final punctuation without the German model
+    monkeypatch.setattr(titles, "_SENTENCE_TOKENIZER", PunktSentenceTokenizer())
+
+
+@pytest.fixture
+def one_chunk_per_text(sentence_tokenizer):
+    # The test articles are one sentence each
+    pass
+
+
+def test_async_pipeline_matches_sequential(llm, one_chunk_per_text):
+    df = clustered_articles()
+
+    sequential = titles.collect_wikipedia_candidates_per_cluster(df, pipeline="sequential")
+    requests_sequential = len(llm.requests)
+    concurrent = titles.collect_wikipedia_candidates_per_cluster(df, pipeline="async")
+
+    assert concurrent == sequential
+    assert concurrent[0] == {0: ["Bundesrat"], 1: ["Bundesrat"], 2: ["Bundesrat"]}
+    # 1 batched request for the 4 chunks, 1 final summary and 1 title extraction per cluster
+    assert requests_sequential == len(llm.requests) - requests_sequential == 9
+
+
+def test_async_pipeline_bounds_calls_per_key(llm, one_chunk_per_text, monkeypatch):
+    monkeypatch.setattr(titles, "LLM_CONCURRENCY_PER_KEY", 2)
+    monkeypatch.setattr(titles, "LLM_BATCHING", False)
+    llm.latency = 0.05
+
+    titles.collect_wikipedia_candidates_per_cluster(clustered_articles(clusters=4, articles=6), pipeline="async")
+
+    # Two keys with two calls each; all clusters share the limit
+    assert llm.max_in_flight == 4
+
+
+def test_final_summary_starts_when_its_cluster_is_done(llm, one_chunk_per_text, monkeypatch):
+    def responder(body):
+        prompt = body["messages"][-1]["content"]
+        if "Artikel 1-" in prompt:
+            time.sleep(0.3)  # the chunks of cluster 1 are slow
+        return fake_llm.default_responder(body)
+
+    llm.responder = responder
+    started = {}
+
+    def final_summary(summaries):
+        started.setdefault(len(started), time.monotonic())
+        return "Zusammenfassung."
+
+    monkeypatch.setattr(titles, "generate_final_summary", final_summary)
+    start = time.monotonic()
+    titles.collect_wikipedia_candidates_per_cluster(clustered_articles(clusters=2, articles=2), pipeline="async")
+
+    # The summary of cluster 0 does not wait for the slow chunks of cluster 1
+    assert started[0] - start < 0.2
+    assert started[1] - start >= 0.3
+
+
+def test_rate_limited_key_is_rested_and_blacklisted_key_skipped(llm, monkeypatch):
+    monkeypatch.setattr(titles, "API_KEYS", ["key-1", "key-2", "key-3"])
+    monkeypatch.setattr(titles, "BLACKLISTED_KEYS", {2})
+
+    llm.errors["key-1"] = 429
+    results = [titles.call_groq_api("Prompt", "System") for _ in range(3)]
+
+    assert all(results)
+    # key-1 is tried once, then paused; key-3 is never used
+    assert llm.api_keys == ["key-1", "key-2", "key-2", "key-2"]
+
+
+def test_server_error_rests_key_and_refunds_tokens(llm, monkeypatch):
+    limiter = titles.KeyRateLimiter(2, rpm_limit=100, tpm_limit=10000)
+    monkeypatch.setattr(titles, "RATE_LIMITER", limiter)
+
+    llm.errors["key-1"] = 500
+    results = [titles.call_groq_api("Prompt", "System") for _ in range(3)]
+
+    assert all(results)
+    # key-1 fails once and is paused instead of being retried at once
+    assert llm.api_keys == ["key-1", "key-2", "key-2", "key-2"]
+    assert limiter.remaining(0)[1] == pytest.approx(10000)
+
+
+def test_chunk_and_final_summaries_are_cached(llm, tmp_path, monkeypatch):
+    monkeypatch.setattr(titles, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(titles, "LLM_CACHE", LLMCache(str(tmp_path / "llm_cache.sqlite")))
+
+    for _ in range(2):
+        assert titles.process_text_chunk("Der Bundesrat tagt in Bern.") == ("Zusammenfassung.", ["Bundesrat"])
+        titles.generate_final_summary(["Erste Zusammenfassung.", "Zweite Zusammenfassung."])
+    titles.generate_final_summary(["Zweite Zusammenfassung.", "Erste Zusammenfassung."])
+    # Another chunk and another temperature are separate entries
+    titles.process_text_chunk("Die Nationalbank senkt den Leitzins.")
+    titles.process_text_chunk("Der Bundesrat tagt in Bern.", title_focus=True)
+
+    assert len(llm.requests) == 4
+    assert (titles.LLM_CACHE.hits, titles.LLM_CACHE.misses) == (3, 4)
+    titles.LLM_CACHE.close()
+
+
+def test_pack_chunks_respects_token_budget_and_chunk_limit():
+    chunks = ["a" * 396, "b" * 396, "c" * 396, "d" * 3996, "e" * 4, "f" * 4, "g" * 4]
+
+    # 100, 100, 100, 1000, 2, 2 and 2 estimated tokens
+    assert titles.pack_chunks(chunks, token_budget=250, max_chunks=2) == [
+        chunks[0:2], chunks[2:3], chunks[3:4], chunks[4:6], chunks[6:7]
+    ]
+
+
+def test_batched_request_returns_results_per_chunk(llm):
+    chunks = ["Erster Abschnitt.", "Zweiter Abschnitt.", "Dritter Abschnitt."]
+
+    assert titles.process_text_chunk_group(chunks) == [
+        ("Zusammenfassung 1.", ["Bundesrat"]),
+        ("Zusammenfassung 2.", ["Bundesrat"]),
+        ("Zusammenfassung 3.", ["Bundesrat"]),
+    ]
+    assert len(llm.requests) == 1
+
+
+def test_batched_request_falls_back_to_single_chunks(llm):
+    def responder(body):
+        prompt = body["messages"][-1]["content"]
+        if prompt.startswith("Führe für jeden"):
+            # Result 2 is missing and result 3 has no summary
+            return json.dumps({"results": [{"id": 1, "summary": "Eins.", "titles": []}, {"id": 3, "titles": []}]})
+        return fake_llm.default_responder(body)
+
+    llm.responder = responder
+    results = titles.process_text_chunk_group(["Erster Abschnitt.", "Zweiter Abschnitt.", "Dritter Abschnitt."])
+
+    assert results == [("Eins.", []), ("Zusammenfassung.", ["Bundesrat"]), ("Zusammenfassung.", ["Bundesrat"])]
+    assert len(llm.requests) == 3
+
+    llm.responder = lambda body: "kein JSON"
+    assert titles.process_text_chunk_group(["Erster Abschnitt.", "Zweiter Abschnitt."]) == [("", []), ("", [])]
+    assert len(llm.requests) == 6
+
+
+def split_text_reference(text, max_length):
+    # The former implementation: tokenize, then count the words of every sentence again
+    chunks, current_chunk, current_length = [], [], 0
+    for sentence in titles.get_sentence_tokenizer().tokenize(text):
+        sentence_length = len(sentence.split())
+        if current_length + sentence_length > max_length:
+            if current_chunk:
+                chunks.append(' '.join(current_chunk))
+            current_chunk = [sentence]
+            current_length = sentence_length
+        else:
+            current_chunk.append(sentence)
+            current_length += sentence_length
+    if current_chunk:
+        chunks.append(' '.join(current_chunk))
+    return chunks
+
+
+def random_text(rng):
+    words = ["Der", "Bundesrat", "tagt", "in", "Bern", "und", "berät", "über", "Zölle", "heute"]
+    sentences = []
+    for _ in range(rng.integers(0, 12)):
+        sentence = " ".join(rng.choice(words, size=rng.integers(1, 25)))
+        sentences.append(sentence + rng.choice([".", "!", "?"]))
+    return rng.choice([" ", "  ", "\n"]).join(sentences)
+
+
+def test_split_matches_reference_implementation(sentence_tokenizer):
+    rng = np.random.default_rng(0)
+    texts = [random_text(rng) for _ in range(200)] + ["", "Ohne Satzende", "Ein Satz. " * 300]
+
+    for max_length in [1, 10, 40, 1000]:
+        for text in texts:
+            assert titles.split_text_sentencewise(text, max_length) == split_text_reference(text, max_length)
+        assert titles.split_each_text_sentencewise(texts, max_length) == [
+            chunk for text in texts for chunk in split_text_reference(text, max_length)
+        ]
+        assert titles.split_each_text_sentencewise(texts, max_length, max_chunks=5) == [
+            chunk for text in texts for chunk in split_text_reference(text, max_length)[:5]
+        ]
+
@@ -0,0 +1,68 @@
+import datetime
+
+import pandas as pd
+
+from fingerprint_index import FingerprintIndex, url_canonical_key
+
+
+STORY = (
+    "Der Bundesrat hat am Mittwoch in Bern über die neuen Zölle der Vereinigten Staaten beraten. "
+    "Die Landesregierung will mögliche Gegenmassnahmen prüfen und mit der Wirtschaft das Gespräch suchen. "
+    "Finanzministerin Karin Keller-Sutter sagte vor den Medien, die Schweiz setze weiterhin auf Verhandlungen."
+)
+OTHER_STORY = (
+    "Die Nationalbank senkt den Leitzins um einen Viertelprozentpunkt auf null Prozent. "
+    "Die Teuerung sei deutlich tiefer als erwartet, teilte die Notenbank in Zürich mit. "
+    "Ökonomen hatten den Schritt mehrheitlich vorausgesagt und rechnen mit weiteren Senkungen."
+)
+THIRD_STORY = (
+    "Die SBB investieren in den kommenden Jahren mehrere Milliarden Franken in den Bahnknoten Basel. "
+    "Neue Gleise und ein unterirdischer Bahnhof sollen die Kapazität bis 2035 deutlich erhöhen."
+)
+
+DAY_1 = datetime.date(2025, 4, 9)
+DAY_2 = datetime.date(2025, 4, 10)
+
+
+def articles(rows):
+    return pd.DataFrame(rows, columns=['content_id', 'article_link', 'content'])
+
+
+def test_url_canonical_key_ignores_version_suffix():
+    assert url_canonical_key('https://a.ch/news/zoelle-123-0') == url_canonical_key('https://a.ch/news/zoelle-123-4/')
+    assert url_canonical_key('https://a.ch/news/zoelle-123') != url_canonical_key('https://a.ch/sport/zoelle-123')
+    assert url_canonical_key('') is None
+
+
+def test_find_seen_matches_content_id_url_and_near_duplicates(tmp_path):
+    with FingerprintIndex(str(tmp_path / "index.sqlite")) as index:
+        index.add(articles([
+            ('c1', 'https://a.ch/news/zoelle-123-0', STORY),
+            ('c2', 'https://b.ch/wirtschaft/leitzins-9', OTHER_STORY),
+        ]), DAY_1)
+
+        day_2 = articles([
+            ('c2', 'https://c.ch/other-link', 'Ganz anderer Text.'),          # same content_id
+            ('c3', 'https://a.ch/news/zoelle-123-1', 'Kurzes Update.'),       # new version of a URL
+            ('c4', 'https://d.ch/ausland/repost', STORY + " (sda)"),          # wire repost
+            ('c5', 'https://a.ch/news/sbb-basel-7', THIRD_STORY),             # new article
+        ])
+
+        assert index.find_seen(day_2, DAY_2).tolist() == [True, True, True, False]
+        # Entries of the processed day itself are ignored, so a day can be reprocessed
+        assert not index.find_seen(day_2, DAY_1).any()
+
+
+def test_add_replaces_entries_of_the_same_day(tmp_path):
+    path = str(tmp_path / "index.sqlite")
+    with FingerprintIndex(path) as index:
+        index.add(articles([('c1', 'https://a.ch/news/zoelle-1', STORY)]), DAY_1)
+        index.add(articles([('c2', 'https://a.ch/news/sbb-basel-7', THIRD_STORY)]), DAY_1)
+
+    with FingerprintIndex(path) as index:
+        seen = index.find_seen(articles([
+            ('c1', 'https://x.ch/a', OTHER_STORY),
+            ('c9', 'https://x.ch/b', THIRD_STORY),
+        ]), DAY_2)
+
+    assert seen.tolist() == [False, True]
@@ -0,0 +1,127 @@
+import datetime
+import os
+
+import pytest
+
+import get_news_data
+from fake_swissdox import FakeSwissdox
+from get_news_data import fetch_swissdox_data, fetch_swissdox_windows, save_downloaded_file, split_date_range
+
+
+DUMP = bytes(range(256)) * 4000
+
+
+@pytest.fixture
+def swissdox(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_news_data, "SAVE_FOLDER", str(tmp_path))
+    monkeypatch.setattr(get_news_data, "DOWNLOAD_CHUNK_SIZE", 4096)
+    monkeypatch.setattr(get_news_data, "DOWNLOAD_RETRY_DELAY", 0)
+    monkeypatch.setattr(get_news_data, "POLL_INITIAL_DELAY", 0.02)
+    monkeypatch.setattr(get_news_data, "POLL_MAX_DELAY", 0.1)
+    server = FakeSwissdox().start()
+    monkeypatch.setattr(get_news_data, "API_URL_QUERY", f"{server.api_url}/query")
+    monkeypatch.setattr(get_news_data, "API_URL_STATUS", f"{server.api_url}/status")
+    server.files["dump.tsv.xz"] = DUMP
+    yield server
+    server.stop()
+
+
+def read(path):
+    with open(path, "rb") as file:
+        return file.read()
+
+
+def test_download_streams_file_to_disk(swissdox, tmp_path):
+    path = save_downloaded_file(swissdox.download_url("dump.tsv.xz"))
+
+    assert path == os.path.join(str(tmp_path), "dump.tsv.xz")
+    assert read(path) == DUMP
+    assert not os.path.exists(f"{path}.part")
+
+
+def test_download_resumes_with_range_after_broken_connection(swissdox):
+    swissdox.break_after = [100000, 300000]
+
+    path = save_downloaded_file(swissdox.download_url("dump.tsv.xz"))
+
+    assert read(path) == DUMP
+    ranges = [headers.get("Range") for _, _, headers in swissdox.requests]
+    # Whole chunks received before each break are kept
+    assert ranges == [None, "bytes=98304-", "bytes=397312-"]
+
+
+def test_download_restarts_if_server_ignores_range(swissdox):
+    swissdox.break_after = [100000]
+    swissdox.ignore_range = True
+
+    assert read(save_downloaded_file(swissdox.download_url("dump.tsv.xz"))) == DUMP
+
+
+def test_download_gives_up_after_max_retries(swissdox, monkeypatch):
+    monkeypatch.setattr(get_news_data, "DOWNLOAD_MAX_RETRIES", 2)
+    swissdox.break_after = [1000, 1000, 1000]
+
+    assert save_downloaded_file(swissdox.download_url("dump.tsv.xz")) is None
+    assert len(swissdox.requests) == 3
+
+
+def test_download_reports_missing_file(swissdox):
+    assert save_downloaded_file(swissdox.download_url("missing.tsv.xz")) is None
+
+
+def test_split_date_range_covers_every_day_once():
+    windows = split_date_range(datetime.date(2025, 3, 28), datetime.date(2025, 4, 9), 5)
+
+    assert windows == [('2025-03-28', '2025-04-01'), ('2025-04-02', '2025-04-06'), ('2025-04-07', '2025-04-09')]
+
+
+def test_fetch_polls_with_backoff_until_finished(swissdox, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(get_news_data.time, "sleep", sleeps.append)
+    swissdox.polls_until_finished[1] = 5
+
+    path = fetch_swissdox_data("2025-04-09", "2025-04-09")
+
+    assert b"from: 2025-04-09" in read(path)
+    # Jittered waits between half and the full, exponentially growing delay
+    assert len(sleeps) == 4
+    for sleep, delay in zip(sleeps, [0.02, 0.04, 0.08, 0.1]):
+        assert delay / 2 <= sleep <= delay
+
+
+def test_concurrent_windows_download_as_soon_as_their_query_finishes(swissdox):
+    windows = split_date_range(datetime.date(2025, 4, 1), datetime.date(2025, 4, 9), 3)
+    # The first submitted query takes much longer than the others
+    swissdox.polls_until_finished = {1: 8, 2: 1, 3: 2}
+
+    paths = fetch_swissdox_windows(windows, max_workers=3)
+
+    for (start, end), path in paths.items():
+        assert f"from: {start}".encode() in read(path) and f"to: {end}".encode() in read(path)
+        # The result limit scales with the days of the window
+        assert f"maxResults: {get_news_data.MAX_RESULTS * 3}".encode() in read(path)
+
+    times = {path: t for t, path, _ in swissdox.requests}
+    # Downloads of the fast queries happened while the slow one was still being polled
+    for query_id in (2, 3):
+        assert times[f"/downloads/query-{query_id}.tsv.xz"] < times["/api/status/1"]
+
+
+def test_failed_window_does_not_discard_the_others(swissdox, monkeypatch):
+    windows = split_date_range(datetime.date(2025, 4, 1), datetime.date(2025, 4, 9), 3)
+    # The first query is answered with a non-JSON page, the second raises unexpectedly
+    swissdox.invalid_json_queries = {1}
+    fetch = get_news_data.fetch_swissdox_data
+
+    def fetch_or_fail(start_date, end_date, max_results):
+        if start_date == "2025-04-04":
+            raise RuntimeError("unexpected")
+        return fetch(start_date, end_date, max_results)
+
+    monkeypatch.setattr(get_news_data, "fetch_swissdox_data", fetch_or_fail)
+
+    paths = fetch_swissdox_windows(windows, max_workers=1)
+
+    assert paths[("2025-04-01", "2025-04-03")] is None
+    assert paths[("2025-04-04", "2025-04-06")] is None
+    assert b"from: 2025-04-07" in read(paths[("2025-04-07", "2025-04-09")])
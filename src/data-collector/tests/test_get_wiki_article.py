@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+
+import get_wiki_article
+import title_cache
+from fake_mediawiki import FakeMediaWiki
+from fake_redis import FakeRedis
+from get_wiki_article import resolve_query_result, resolve_titles, validate_wikipedia_titles
+from title_cache import TitleCache
+
+
+QUERY = {
+    "normalized": [{"from": "bundesrat (Schweiz)", "to": "Bundesrat (Schweiz)"}],
+    "redirects": [
+        {"from": "SNB", "to": "Schweizerische Nationalbank"},
+        {"from": "Bundesrat (Schweiz)", "to": "Schweizerischer Bundesrat"},
+    ],
+    "pages": [
+        {"pageid": 1, "ns": 0, "title": "Schweizerische Nationalbank"},
+        {"pageid": 2, "ns": 0, "title": "Schweizerischer Bundesrat"},
+        {"pageid": 3, "ns": 0, "title": "Bern (Begriffsklärung)", "pageprops": {"disambiguation": ""}},
+        {"ns": 0, "title": "Gibt Es Nicht", "missing": True},
+    ],
+}
+
+
+def test_resolve_query_result_follows_normalisation_and_redirects():
+    titles = ["SNB", "bundesrat (Schweiz)", "Bern (Begriffsklärung)", "Gibt Es Nicht"]
+
+    resolved, disambiguations = resolve_query_result(titles, QUERY)
+
+    assert resolved == {"SNB": "Schweizerische Nationalbank", "bundesrat (Schweiz)": "Schweizerischer Bundesrat"}
+    assert disambiguations == {"Bern (Begriffsklärung)"}
+
+
+@pytest.fixture
+def mediawiki(monkeypatch):
+    server = FakeMediaWiki().start()
+    monkeypatch.setattr(get_wiki_article, "WIKIPEDIA_API_URL", server.api_url)
+    monkeypatch.setattr(title_cache, "_TITLE_CACHE", TitleCache(None))
+    page_lookups = []
+    server.page_lookups = page_lookups
+    monkeypatch.setattr(get_wiki_article.wikipedia, "set_lang", lambda language: None)
+    monkeypatch.setattr(
+        get_wiki_article, "get_wikipedia_article",
+        lambda term: page_lookups.append(term) or SimpleNamespace(title=f"{term} (Stadt)")
+    )
+    yield server
+    server.stop()
+
+
+def test_resolve_titles_batches_and_searches_only_missing_terms(mediawiki):
+    mediawiki.articles = {f"Artikel {i}" for i in range(60)} | {"Erdbeben in Myanmar 2025", "Schweizerische Nationalbank"}
+    mediawiki.redirects = {"SNB": "Schweizerische Nationalbank"}
+    mediawiki.disambiguations = {"Bern", "Erdbeben"}
+    mediawiki.search_results = {"Erdbeben Myanmar": ["Erdbeben", "Erdbeben in Myanmar 2025"]}
+
+    terms = [f"Artikel {i}" for i in range(60)] + ["Bern", "Erdbeben Myanmar", "sNB", "Artikel 0", "A|B", "Unbekannt"]
+    resolved = resolve_titles(terms)
+
+    title_requests = [request["titles"].split("|") for request in mediawiki.requests if "titles" in request]
+    assert sorted(len(titles) for titles in title_requests) == [2, 14, 50]
+    assert sorted(request["srsearch"] for request in mediawiki.requests if "srsearch" in request) == ["Erdbeben Myanmar", "Unbekannt"]
+    assert resolved["Artikel 59"] == "Artikel 59"
+    assert resolved["sNB"] == "Schweizerische Nationalbank"
+    # The first search suggestion that is an article wins
+    assert resolved["Erdbeben Myanmar"] == "Erdbeben in Myanmar 2025"
+    assert resolved["Unbekannt"] is None
+    # Disambiguation pages and titles that cannot be batched are looked up one by one
+    assert sorted(mediawiki.page_lookups) == ["A|B", "Bern"]
+    assert resolved["Bern"] == "Bern (Stadt)"
+    assert len(resolved) == 65
+
+
+def test_validation_runs_requests_concurrently_over_reused_connections(mediawiki, monkeypatch):
+    monkeypatch.setattr(get_wiki_article, "MAX_CONCURRENT_REQUESTS", 3)
+    monkeypatch.setattr(get_wiki_article, "MAX_TITLES_PER_QUERY", 2)
+    mediawiki.latency = 0.05
+    mediawiki.articles = {f"Thema {i}" for i in range(20)}
+    cluster_topics = {cluster: [f"Thema {cluster * 2}", f"Thema {cluster * 2 + 1}", "Thema 0"] for cluster in range(10)}
+    cluster_topics[10] = ["Nichts"]
+
+    results = validate_wikipedia_titles(cluster_topics)
+
+    assert {cluster: sorted(titles) for cluster, titles in results.items()} == {
+        cluster: sorted({f"Thema {cluster * 2}", f"Thema {cluster * 2 + 1}", "Thema 0"}) for cluster in range(10)
+    }
+    assert mediawiki.max_in_flight == 3
+    assert len(mediawiki.connections) <= 3
+
+
+def test_cached_titles_need_no_requests(mediawiki, monkeypatch):
+    cache = TitleCache(FakeRedis())
+    monkeypatch.setattr(title_cache, "_TITLE_CACHE", cache)
+    mediawiki.articles = {"Donald Trump", "Schweizerischer Bundesrat"}
+    mediawiki.redirects = {"Bundesrat (Schweiz)": "Schweizerischer Bundesrat"}
+    terms = ["Donald Trump", "Bundesrat (Schweiz)", "Gibt es nicht"]
+
+    first = resolve_titles(terms)
+    requests_first = len(mediawiki.requests)
+    second = resolve_titles(terms)
+
+    assert first == second == {
+        "Donald Trump": "Donald Trump", "Bundesrat (Schweiz)": "Schweizerischer Bundesrat", "Gibt es nicht": None
+    }
+    assert len(mediawiki.requests) == requests_first
+    # The page IDs of the articles are cached for the history-collector
+    assert set(cache.get_page_ids(["Donald Trump", "Schweizerischer Bundesrat", "Bundesrat (Schweiz)"], "de")) == {
+        "Donald Trump", "Schweizerischer Bundesrat"
+    }
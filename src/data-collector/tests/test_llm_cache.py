@@ -0,0 +1,53 @@
+import llm_cache
+from llm_cache import LLMCache, llm_cache_key
+
+
+def test_key_covers_model_messages_and_parameters():
+    key = llm_cache_key("model", "System", "Prompt", temperature=0.4, max_tokens=300)
+
+    assert key == llm_cache_key("model", "System", "Prompt", max_tokens=300, temperature=0.4)
+    assert key != llm_cache_key("other-model", "System", "Prompt", temperature=0.4, max_tokens=300)
+    assert key != llm_cache_key("model", "System", "Prompt.", temperature=0.4, max_tokens=300)
+    assert key != llm_cache_key("model", "System", "Prompt", temperature=0.3, max_tokens=300)
+
+
+def test_get_put_and_hit_ratio(tmp_path):
+    path = str(tmp_path / "llm_cache.sqlite")
+    with LLMCache(path) as cache:
+        assert cache.get("a") is None
+        cache.put("a", "Antwort")
+        assert cache.get("a") == "Antwort"
+        assert cache.hit_ratio() == 0.5
+
+    # Entries survive reopening
+    with LLMCache(path) as cache:
+        assert cache.get("a") == "Antwort"
+
+
+def test_expired_entries_are_misses_and_pruned(tmp_path, monkeypatch):
+    now = [1000000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+
+    with LLMCache(str(tmp_path / "llm_cache.sqlite"), ttl_days=1) as cache:
+        cache.put("a", "Antwort")
+        now[0] += 86400 + 1
+        assert cache.get("a") is None
+        cache.prune()
+        assert cache.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] == 0
+
+
+def test_prune_evicts_least_recently_used(tmp_path, monkeypatch):
+    now = [1000000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(llm_cache, "PRUNE_INTERVAL", 4)
+
+    with LLMCache(str(tmp_path / "llm_cache.sqlite"), max_entries=2) as cache:
+        for key in ["a", "b", "c"]:
+            cache.put(key, key.upper())
+            now[0] += 1
+        cache.get("a")
+        now[0] += 1
+        # The fourth write prunes to the two most recently used entries
+        cache.put("d", "D")
+
+        assert [cache.get(key) for key in ["a", "b", "c", "d"]] == ["A", None, None, "D"]
@@ -0,0 +1,192 @@
+import datetime
+import os
+import uuid
+
+import psycopg2
+import pytest
+from psycopg2.extensions import parse_dsn
+
+import load_db
+from load_db import CopyStream, copy_records, copy_rows, create_schema, format_copy_field, format_text_array
+
+# PostgreSQL for the round-trip tests, e.g. "host=localhost port=5432 dbname=wave_test user=wave";
+# they are skipped if it is unset or not reachable
+TEST_DATABASE_DSN = os.getenv("TEST_DATABASE_DSN")
+
+
+def test_text_array_matches_postgres_output():
+    # Expected values as printed by SELECT ARRAY[...]::text
+    assert format_text_array([]) == "{}"
+    assert format_text_array(["Bern", "Karin Keller-Sutter"]) == '{Bern,"Karin Keller-Sutter"}'
+    assert format_text_array(["Zürich_(Stadt)", "NULL", ""]) == '{Zürich_(Stadt),"NULL",""}'
+    assert format_text_array(['Sag "Ja"', "a\\b", "a,b", "{x}"]) == '{"Sag \\"Ja\\"","a\\\\b","a,b","{x}"}'
+
+
+def test_copy_fields_are_escaped():
+    assert format_copy_field(None) == "\\N"
+    assert format_copy_field("Zeile 1\nZeile 2\tEnde\\") == "Zeile 1\\nZeile 2\\tEnde\\\\"
+    assert format_copy_field(["Bern", "Genf"]) == "{Bern,Genf}"
+
+
+def test_stream_returns_rows_in_pieces():
+    records = [{"id": "1", "name": "Bern"}, {"id": "2", "name": None}]
+    stream = CopyStream(copy_rows(records, ["id", "name"]))
+
+    pieces = []
+    while True:
+        piece = stream.read(5)
+        if not piece:
+            break
+        assert len(piece) <= 5
+        pieces.append(piece)
+
+    assert "".join(pieces) == "0\t1\tBern\n1\t2\t\\N\n"
+
+
+def test_missing_key_without_default_fails():
+    with pytest.raises(KeyError):
+        list(copy_rows([{"id": "1"}], ["id", "name"]))
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+        self.copied = {}
+        self.rowcount = 0
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+    def copy_expert(self, statement, stream):
+        self.copied[statement.split()[1]] = stream.read()
+
+
+def test_copy_records_streams_all_datasets(monkeypatch):
+    day_1 = {
+        "cluster": [{"cluster_id": "c1", "wikipedia_article_names": ["Bern"], "date": "2025-04-09"}],
+        "artikel": [{
+            "article_id": "a1", "cluster_id": "c1", "pubtime": "2025-04-09T08:30:00",
+            "medium_name": "NZZ", "head": "Titel", "article_link": ""
+        }],
+    }
+    day_2 = {
+        "cluster": [{
+            "cluster_id": "c2", "wikipedia_article_names": [], "date": "2025-04-10", "summary_text": "Text."
+        }],
+    }
+    cur = RecordingCursor()
+
+    copy_records(cur, [day_1, day_2])
+
+    assert cur.copied["cluster_staging"] == "0\tc1\t{Bern}\t2025-04-09\t\\N\n1\tc2\t{}\t2025-04-10\tText.\n"
+    assert cur.copied["artikel_staging"] == "0\ta1\tc1\t2025-04-09T08:30:00\tNZZ\tTitel\t\n"
+    # Clusters are merged before the articles that reference them
+    assert "INTO Cluster" in cur.statements[1] and "INTO Artikel" in cur.statements[2]
+
+
+def test_unknown_load_method_is_rejected():
+    with pytest.raises(ValueError):
+        load_db.load_data_batch([], {}, method="bulk")
+
+
+@pytest.fixture
+def database():
+    """
+    Connection parameters of a scratch schema in the test database, dropped afterwards.
+    """
+    if not TEST_DATABASE_DSN:
+        pytest.skip("TEST_DATABASE_DSN is not set")
+    db_params = parse_dsn(TEST_DATABASE_DSN)
+    try:
+        conn = psycopg2.connect(**db_params)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"Test database not reachable: {e}")
+    conn.autocommit = True
+    schemas = []
+
+    def create(name):
+        schema = f"load_test_{name}_{uuid.uuid4().hex[:8]}"
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA {schema}")
+        schemas.append(schema)
+        schema_params = {**db_params, "options": f"-c search_path={schema}"}
+        create_schema(schema_params)
+        return schema, schema_params
+
+    yield conn, create
+    with conn.cursor() as cur:
+        for schema in schemas:
+            cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    conn.close()
+
+
+AWKWARD_TEXTS = [
+    'Back\\slash \\N and \\\\ double', 'Tab\there', 'New\nline', 'Carriage\r\nreturn', 'Sag "Ja"',
+    "Apostroph's", "", "NULL", "\\.", "Zürich – «Grüezi» 🇨🇭", "{Klammern}, Komma",
+]
+
+AWKWARD_TITLES = [
+    [], ["Bern"], ["Karin Keller-Sutter", "NULL", "null"], ['Sag "Ja"', "a\\b", "a,b", "{x}", ""],
+    ["Tab\tTitel", "Neue\nZeile", "Zürich (Stadt)"],
+]
+
+
+def awkward_records():
+    clusters = [
+        {"cluster_id": f"c{i}", "wikipedia_article_names": titles, "date": "2025-04-09",
+         "summary_text": AWKWARD_TEXTS[i] if i % 2 else None}
+        for i, titles in enumerate(AWKWARD_TITLES)
+    ]
+    # Typed values as produced by generate_cluster_records and legacy comma-separated titles
+    clusters.append({"cluster_id": "typed", "wikipedia_article_names": "Example_Event,Community_Event",
+                     "date": datetime.date(2025, 4, 10)})
+    artikel = [
+        {"article_id": f"a{i}", "cluster_id": f"c{i % len(AWKWARD_TITLES)}",
+         "pubtime": datetime.datetime(2025, 4, 9, 8, i) if i % 2 else f"2025-04-09T09:{i:02d}:00",
+         "medium_name": text[:255] or None, "head": text, "article_link": text, "content": "ignored"}
+        for i, text in enumerate(AWKWARD_TEXTS)
+    ]
+    # Duplicate keys: the first record wins
+    clusters.append({**clusters[1], "summary_text": "Duplicate"})
+    artikel.append({**artikel[0], "head": "Duplicate"})
+    # Two days, each with the clusters its articles belong to
+    return [{"cluster": clusters[:4], "artikel": artikel[:4]}, {"cluster": clusters[4:], "artikel": artikel[4:]}]
+
+
+def table_rows(conn, schema):
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT * FROM {schema}.Cluster ORDER BY cluster_id")
+        clusters = cur.fetchall()
+        cur.execute(f"SELECT * FROM {schema}.Artikel ORDER BY article_id")
+        return clusters, cur.fetchall()
+
+
+def test_copy_and_row_loads_store_identical_rows(database):
+    conn, create = database
+    rows_schema, rows_params = create("rows")
+    copy_schema, copy_params = create("copy")
+    # An existing record is kept, not overwritten
+    existing = {"cluster": [{"cluster_id": "c0", "wikipedia_article_names": ["Alt"], "date": "2025-04-01"}]}
+    for params in [rows_params, copy_params]:
+        assert load_db.load_data(existing, params, method="rows")
+
+    assert load_db.load_data_batch(awkward_records(), rows_params, method="rows")
+    assert load_db.load_data_batch(awkward_records(), copy_params, method="copy")
+
+    clusters, artikel = table_rows(conn, copy_schema)
+    assert (clusters, artikel) == table_rows(conn, rows_schema)
+    assert len(clusters) == len(AWKWARD_TITLES) + 1 and len(artikel) == len(AWKWARD_TEXTS)
+    assert clusters[0][1] == "{Alt}"
+    assert {article_id: head for article_id, _, _, _, head, _ in artikel} == {
+        f"a{i}": text for i, text in enumerate(AWKWARD_TEXTS)
+    }
+
+
+def test_failed_copy_load_rolls_back(database):
+    conn, create = database
+    schema, params = create("rollback")
+    records = awkward_records()
+    records[1]["artikel"][0]["pubtime"] = "kein Datum"
+
+    assert not load_db.load_data_batch(records, params, method="copy")
+    assert table_rows(conn, schema) == ([], [])
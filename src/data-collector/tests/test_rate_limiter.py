@@ -0,0 +1,98 @@
+import threading
+
+from rate_limiter import KeyRateLimiter, TokenBucket, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_continuously():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+
+    bucket.take(60)
+    assert bucket.wait_time(1) == 1.0
+    clock.now = 30
+    assert bucket.wait_time(30) == 0
+    assert bucket.wait_time(31) == 1.0
+    clock.now = 600
+    bucket.refill()
+    assert bucket.level == 60
+
+
+def test_estimate_tokens_includes_completion_budget():
+    assert estimate_tokens("a" * 400, "b" * 40, max_tokens=300) == 411
+
+
+def test_acquire_picks_key_with_most_budget():
+    clock = FakeClock()
+    limiter = KeyRateLimiter(3, rpm_limit=10, tpm_limit=1000, clock=clock)
+
+    assert [limiter.acquire(400)[0] for _ in range(3)] == [0, 1, 2]
+    assert limiter.acquire(100) == (0, 100)
+    # Key 0 reported fewer tokens than reserved, so it has the most budget again
+    limiter.settle(1, 400, 100)
+    assert limiter.acquire(100)[0] == 1
+    assert limiter.acquire(100, excluded={0, 1})[0] == 2
+    assert limiter.acquire(100, excluded={0, 1, 2}) == (None, 0)
+
+
+def test_acquire_never_exceeds_requests_per_minute():
+    clock = FakeClock()
+    limiter = KeyRateLimiter(2, rpm_limit=2, tpm_limit=10000, clock=clock)
+
+    assert [limiter.acquire(10)[0] for _ in range(4)] == [0, 1, 0, 1]
+    # All four requests of this minute are used up
+    assert limiter.acquire(10, timeout=0) == (None, 0)
+    clock.now = 30
+    assert limiter.acquire(10, timeout=0)[0] in (0, 1)
+
+
+def test_acquire_waits_until_budget_is_back():
+    limiter = KeyRateLimiter(1, rpm_limit=600, tpm_limit=100000)
+    for _ in range(600):
+        limiter.acquire(1)
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(limiter.acquire(1)))
+    thread.start()
+    thread.join(1.0)
+
+    # 600 requests per minute refill one request every 0.1s
+    assert results == [(0, 1)]
+
+
+def test_penalized_key_is_skipped():
+    clock = FakeClock()
+    limiter = KeyRateLimiter(2, rpm_limit=10, tpm_limit=1000, clock=clock)
+
+    limiter.penalize(0, 12)
+    assert [limiter.acquire(10)[0] for _ in range(3)] == [1, 1, 1]
+    clock.now = 11
+    assert limiter.acquire(10, excluded={1}, timeout=0) == (None, 0)
+    clock.now = 12
+    assert limiter.acquire(10, excluded={1}, timeout=0) == (0, 10)
+
+
+def test_oversized_request_is_capped_at_the_limit():
+    limiter = KeyRateLimiter(1, rpm_limit=10, tpm_limit=1000, clock=FakeClock())
+
+    assert limiter.acquire(5000) == (0, 1000)
+
+
+def test_failed_request_refunds_its_tokens():
+    clock = FakeClock()
+    limiter = KeyRateLimiter(1, rpm_limit=10, tpm_limit=1000, clock=clock)
+
+    for _ in range(5):
+        key_index, reserved = limiter.acquire(600, timeout=0)
+        assert key_index == 0
+        limiter.refund(key_index, reserved)
+
+    # The tokens are back, capped at the limit; the requests still count
+    assert limiter.remaining(0) == (5, 1000)
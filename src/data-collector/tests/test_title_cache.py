@@ -0,0 +1,58 @@
+import os
+
+import title_cache
+from fake_redis import FakeRedis
+from title_cache import TitleCache
+
+
+def test_titles_and_page_ids_with_negative_entries():
+    client = FakeRedis()
+    cache = TitleCache(client)
+
+    cache.set_titles({"Bundesrat (Schweiz)": "Schweizerischer Bundesrat", "Gibt es nicht": None}, "de")
+    cache.set_page_ids({"Schweizerischer Bundesrat": 1234, "Gibt es nicht": None}, "de")
+
+    assert cache.get_titles(["Bundesrat (Schweiz)", "Gibt es nicht", "Unbekannt"], "de") == {
+        "Bundesrat (Schweiz)": "Schweizerischer Bundesrat", "Gibt es nicht": None
+    }
+    assert cache.get_titles(["Bundesrat (Schweiz)"], "en") == {}
+    assert cache.get_page_ids(["Schweizerischer Bundesrat", "Gibt es nicht"], "de") == {
+        "Schweizerischer Bundesrat": 1234, "Gibt es nicht": None
+    }
+    assert client.data["wiki:title:de:Bundesrat (Schweiz)"] == ("Schweizerischer Bundesrat", title_cache.TITLE_CACHE_TTL)
+
+
+def test_negative_entries_expire_first():
+    client = FakeRedis()
+    cache = TitleCache(client)
+    cache.set_titles({"Neu": None, "Alt": "Alt"}, "de")
+
+    client.now = title_cache.TITLE_CACHE_NEGATIVE_TTL
+    assert cache.get_titles(["Neu", "Alt"], "de") == {"Alt": "Alt"}
+
+
+def test_unreachable_redis_disables_the_cache():
+    client = FakeRedis()
+    client.fail = True
+    cache = TitleCache(client)
+
+    assert cache.get_titles(["Bundesrat"], "de") == {}
+    assert cache.client is None
+    cache.set_titles({"Bundesrat": "Bundesrat"}, "de")
+    assert client.data == {}
+
+
+def test_collectors_share_one_version_of_the_module():
+    # Both images need their own copy; they must not drift apart
+    services_dir = os.path.join(os.path.dirname(os.path.abspath(title_cache.__file__)), "..")
+    with open(os.path.join(services_dir, "data-collector", "title_cache.py"), "rb") as f:
+        data_collector_copy = f.read()
+    with open(os.path.join(services_dir, "history-collector", "title_cache.py"), "rb") as f:
+        assert f.read() == data_collector_copy
+
+
+def test_redis_host_prefix_is_removed(monkeypatch):
+    monkeypatch.setenv("REDIS_HOST", "DB_HOST=redis")
+    assert title_cache.redis_host_from_env() == "redis"
+    monkeypatch.setenv("REDIS_HOST", "cache.internal")
+    assert title_cache.redis_host_from_env() == "cache.internal"
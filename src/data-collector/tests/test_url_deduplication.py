@@ -0,0 +1,210 @@
+import random
+
+import pandas as pd
+import pytest
+
+import url_deduplication
+from url_deduplication import (
+    deduplicate_by_content_similarity,
+    deduplicate_by_minhash,
+    deduplicate_by_versioning,
+    is_versioned_pair,
+    lsh_band_params,
+    preprocess_text,
+    preprocess_text_series,
+    process_url,
+    remove_similar_rows,
+    version_key,
+)
+
+
+STORY = (
+    "Der Bundesrat hat am Mittwoch in Bern über die neuen Zölle der Vereinigten Staaten beraten. "
+    "Die Landesregierung will mögliche Gegenmassnahmen prüfen und mit der Wirtschaft das Gespräch suchen. "
+    "Finanzministerin Karin Keller-Sutter sagte vor den Medien, die Schweiz setze weiterhin auf Verhandlungen."
+)
+OTHER_STORY = (
+    "Die Nationalbank senkt den Leitzins um einen Viertelprozentpunkt auf null Prozent. "
+    "Die Teuerung sei deutlich tiefer als erwartet, teilte die Notenbank in Zürich mit. "
+    "Ökonomen hatten den Schritt mehrheitlich vorausgesagt und rechnen mit weiteren Senkungen."
+)
+
+
+def articles(rows):
+    return pd.DataFrame(rows, columns=['head', 'article_link', 'content', 'pubtime'])
+
+
+def test_lsh_band_params_stay_below_threshold():
+    for threshold in (0.5, 0.8, 0.98):
+        bands, rows = lsh_band_params(threshold, 128)
+        assert bands * rows <= 128
+        assert (1 / bands) ** (1 / rows) <= threshold
+
+
+def test_minhash_keeps_newest_of_near_duplicates():
+    df = articles([
+        ('Zölle', 'https://a.ch/1', STORY, pd.Timestamp('2025-04-09 08:00')),
+        ('Zölle', 'https://a.ch/2', STORY + " Ein Entscheid fällt nächste Woche.", pd.Timestamp('2025-04-09 10:00')),
+        ('Zölle', 'https://a.ch/3', STORY, pd.Timestamp('2025-04-09 09:00')),
+        ('Leitzins', 'https://a.ch/4', OTHER_STORY, pd.Timestamp('2025-04-09 07:00')),
+        ('Leitzins', 'https://a.ch/5', '', pd.Timestamp('2025-04-09 07:30')),
+    ])
+
+    assert deduplicate_by_minhash(df, threshold=0.7) == {1, 3, 4}
+
+
+def test_minhash_only_merges_within_groups():
+    df = articles([
+        ('Zölle', 'https://a.ch/1', STORY, pd.Timestamp('2025-04-09 08:00')),
+        ('Zölle', 'https://a.ch/2', STORY, pd.Timestamp('2025-04-09 09:00')),
+        ('Zölle: Bundesrat berät', 'https://a.ch/3', STORY, pd.Timestamp('2025-04-09 10:00')),
+    ])
+
+    assert deduplicate_by_minhash(df, threshold=0.8, group_columns=['head']) == {1, 2}
+
+
+def test_remove_similar_rows_minhash_backend():
+    df = articles([
+        ('Zölle', 'https://a.ch/news/zoelle-123-0', STORY, '2025-04-09 08:00'),
+        ('Zölle', 'https://a.ch/news/zoelle-123-1', STORY + " Update folgt.", '2025-04-09 09:00'),
+        ('Zölle', 'https://a.ch/news/zoelle-123-2', STORY, '2025-04-09 07:00'),
+        ('Leitzins', 'https://a.ch/news/leitzins-456', OTHER_STORY, '2025-04-09 07:00'),
+    ])
+
+    result = remove_similar_rows(df, backend="minhash", jaccard_threshold=0.7)
+
+    # Versioning keeps the newest version; of the two identical older versions one survives
+    # the content stage, exactly as with the TF-IDF backend.
+    expected = remove_similar_rows(df, threshold=0.85, backend="tfidf")
+    assert sorted(result['article_link']) == sorted(expected['article_link']) == [
+        'https://a.ch/news/leitzins-456',
+        'https://a.ch/news/zoelle-123-0',
+        'https://a.ch/news/zoelle-123-1',
+    ]
+
+
+def test_remove_similar_rows_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        remove_similar_rows(articles([]), backend="simhash")
+    with pytest.raises(ValueError):
+        remove_similar_rows(articles([]), normaliser="vectorized")
+
+
+def random_urls(n, seed):
+    rng = random.Random(seed)
+    words = ['zoelle', 'bundesrat', 'news', '810941', '2', '0', '15', 'x1', '']
+    urls = []
+    for _ in range(n):
+        slug = '-'.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        urls.append(f"https://example.ch/{rng.choice(['news', 'sport'])}/{slug}")
+    return urls
+
+
+def legacy_version_groups(urls):
+    """Reference copy of the original pairwise grouping in deduplicate_by_versioning."""
+    processed_urls = {idx: process_url(url) for idx, url in enumerate(urls)}
+    version_groups = {}
+    for idx1, parts1 in processed_urls.items():
+        found_group = False
+        for version_key, indices in version_groups.items():
+            if is_versioned_pair(parts1, processed_urls[indices[0]]):
+                version_groups[version_key].append(idx1)
+                found_group = True
+                break
+        if not found_group:
+            version_groups[len(version_groups)] = [idx1]
+    return version_groups
+
+
+def test_version_key_matches_is_versioned_pair():
+    urls = random_urls(300, seed=1)
+    for url1 in urls[:100]:
+        for url2 in urls:
+            parts1, parts2 = process_url(url1), process_url(url2)
+            expected = is_versioned_pair(parts1, parts2)
+            assert expected == (parts1[-1] != parts2[-1] and version_key(parts1) == version_key(parts2))
+
+
+def test_deduplicate_by_versioning_matches_pairwise_grouping():
+    urls = random_urls(400, seed=2)
+    # Exact repeats of a group's first URL must stay separate, as before
+    urls += urls[:20]
+    group = pd.DataFrame({
+        'url': urls,
+        'pubtime': pd.date_range('2025-04-09', periods=len(urls), freq='min')[::-1],
+    })
+
+    expected = {
+        max(indices, key=lambda idx: group.loc[idx, 'pubtime'])
+        for indices in legacy_version_groups(urls).values()
+    }
+
+    assert deduplicate_by_versioning(group) == expected
+
+
+@pytest.fixture
+def stop_words(monkeypatch):
+    monkeypatch.setattr(url_deduplication, '_STOP_WORDS', frozenset({'der', 'die', 'und', 'für', 'the', 'don'}))
+
+
+def test_vectorised_normaliser_matches_per_row(stop_words):
+    rng = random.Random(5)
+    tokens = ['Der', 'die', 'UND', 'Für', 'für_alle', 'Bundesrat', '2025', 'Zölle!', "don't", 'the',
+              'x1y', '<b>', '&amp;', '  ', '\n', 'Diese', 'ÜBER', 'l\'état', '-']
+    texts = [' '.join(rng.choice(tokens) for _ in range(rng.randint(0, 15))) for _ in range(300)]
+    series = pd.Series(texts + [None, float('nan'), 42, '   '])
+
+    result = preprocess_text_series(series)
+
+    assert result.tolist() == series.apply(preprocess_text).tolist()
+    assert preprocess_text('Der Bundesrat und die 7 Zölle!') == 'bundesrat zölle'
+
+
+def test_content_similarity_normalisers_agree(stop_words):
+    group = articles([
+        ('Zölle', 'https://a.ch/1', STORY, pd.Timestamp('2025-04-09 08:00')),
+        ('Zölle', 'https://a.ch/2', STORY + " Update.", pd.Timestamp('2025-04-09 09:00')),
+        ('Zölle', 'https://a.ch/3', OTHER_STORY, pd.Timestamp('2025-04-09 10:00')),
+        ('Zölle', 'https://a.ch/4', STORY, pd.Timestamp('2025-04-09 07:00')),
+    ])
+
+    assert deduplicate_by_content_similarity(group, 0.85, normaliser="vectorised") == \
+        deduplicate_by_content_similarity(group, 0.85, normaliser="per_row")
+
+
+def test_normaliser_is_passed_through_and_validated(stop_words, monkeypatch):
+    df = articles([
+        ('Zölle', 'https://a.ch/news/zoelle-123-0', STORY, '2025-04-09 08:00'),
+        ('Zölle', 'https://a.ch/news/zoelle-123-1', STORY + " Update folgt.", '2025-04-09 09:00'),
+        ('Zölle', 'https://a.ch/news/zoelle-123-2', STORY, '2025-04-09 07:00'),
+    ])
+    per_row_calls = []
+    preprocess = url_deduplication.preprocess_text
+    monkeypatch.setattr(url_deduplication, 'preprocess_text', lambda text: per_row_calls.append(text) or preprocess(text))
+
+    vectorised = remove_similar_rows(df, normaliser="vectorised")
+    assert per_row_calls == []
+    per_row = remove_similar_rows(df, normaliser="per_row")
+
+    assert len(per_row_calls) == 2
+    assert sorted(per_row['article_link']) == sorted(vectorised['article_link'])
+    with pytest.raises(ValueError):
+        deduplicate_by_content_similarity(df, 0.85, normaliser="regex")
+
+
+def test_content_of_all_groups_is_normalised_in_one_call(stop_words, monkeypatch):
+    df = articles([
+        (head, f'https://a.ch/news/{head.lower()}-123-{version}', story + " Update" * version, f'2025-04-09 0{version}:00')
+        for head, story in [('Zölle', STORY), ('Leitzins', OTHER_STORY), ('Budget', STORY + OTHER_STORY)]
+        for version in range(3)
+    ])
+    calls = []
+    preprocess_series = url_deduplication.preprocess_text_series
+    monkeypatch.setattr(url_deduplication, 'preprocess_text_series', lambda texts: calls.append(len(texts)) or preprocess_series(texts))
+
+    vectorised = remove_similar_rows(df, normaliser="vectorised")
+
+    # Two versions left in each of the three groups after versioning
+    assert calls == [6]
+    assert sorted(vectorised['article_link']) == sorted(remove_similar_rows(df, normaliser="per_row")['article_link'])
+    assert url_deduplication.get_arrow_stop_words() is url_deduplication.get_arrow_stop_words()
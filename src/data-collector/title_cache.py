@@ -0,0 +1,151 @@
+"""
+Redis cache of Wikipedia title resolution, shared by the data-collector and the history-collector.
+
+Both services use the same key layout, so titles resolved by the data-collector are found
+by the history-collector and vice versa:
+
+    wiki:title:<language>:<term>     canonical article title of a term, "" if it has none
+    wiki:pageid:<language>:<title>   page ID of an article title, "" if there is no such page
+
+Negative entries expire sooner than positive ones, as new articles appear. Without a
+reachable Redis server every lookup is a miss and nothing is stored.
+
+The data-collector and history-collector images are built from separate contexts, so each
+service has a copy of this file; data-collector/tests/test_title_cache.py checks that they
+are identical. Edit both.
+"""
+import logging
+import os
+
+import redis
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+
+def redis_host_from_env():
+    """
+    Return REDIS_HOST without the "DB_HOST=" prefix of the .env.example value, as frontend/cache_utils.py does.
+    """
+    redis_host = os.getenv("REDIS_HOST", "localhost")
+    return redis_host.split("=", 1)[1] if "=" in redis_host else redis_host
+
+
+REDIS_CONFIG = {
+    "host": redis_host_from_env(),
+    "port": int(os.getenv("REDIS_PORT", 6379)),
+    "db": 0,
+    "password": os.getenv("REDIS_PASSWORD", None),
+    "decode_responses": True,
+    "socket_timeout": 3,
+    "socket_connect_timeout": 3,
+}
+
+# Time-to-live of found and of missing titles and page IDs, in seconds
+TITLE_CACHE_TTL = int(os.getenv("TITLE_CACHE_TTL_DAYS", "30")) * 24 * 60 * 60
+TITLE_CACHE_NEGATIVE_TTL = int(os.getenv("TITLE_CACHE_NEGATIVE_TTL_HOURS", "24")) * 60 * 60
+
+# Stored for terms without an article and titles without a page
+MISSING = ""
+
+_TITLE_CACHE = None
+
+
+def connect_redis():
+    """
+    Connect to Redis with REDIS_CONFIG.
+
+    Returns:
+        redis.Redis or None: The connection, or None if Redis is not reachable.
+    """
+    try:
+        conn = redis.Redis(**REDIS_CONFIG)
+        conn.ping()
+        return conn
+    except redis.RedisError as e:
+        logger.warning(f"Redis not reachable, Wikipedia titles will not be cached: {e}")
+        return None
+
+
+class TitleCache:
+    """
+    Term -> title and title -> page ID mappings with TTLs in Redis.
+    """
+
+    def __init__(self, client):
+        """
+        Args:
+            client (redis.Redis): Connection with decode_responses=True, or None to disable the cache.
+        """
+        self.client = client
+
+    def _get(self, prefix, names, language):
+        if self.client is None or not names:
+            return {}
+        try:
+            values = self.client.mget([f"wiki:{prefix}:{language}:{name}" for name in names])
+        except redis.RedisError as e:
+            logger.warning(f"Title cache lookup failed, disabling the cache: {e}")
+            self.client = None
+            return {}
+        return {name: (value or None) for name, value in zip(names, values) if value is not None}
+
+    def _set(self, prefix, mapping, language):
+        if self.client is None or not mapping:
+            return
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for name, value in mapping.items():
+                ttl = TITLE_CACHE_TTL if value is not None else TITLE_CACHE_NEGATIVE_TTL
+                pipeline.set(f"wiki:{prefix}:{language}:{name}", MISSING if value is None else value, ex=ttl)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Title cache update failed, disabling the cache: {e}")
+            self.client = None
+
+    def get_titles(self, terms, language):
+        """
+        Look up the article titles of several terms with one round trip.
+
+        Args:
+            terms (list): Search terms or potential article titles.
+            language (str): Wikipedia language edition.
+
+        Returns:
+            dict: The cached terms, mapped to their title or to None if they have no article.
+        """
+        return self._get("title", terms, language)
+
+    def set_titles(self, titles, language):
+        """
+        Store article titles of terms; None marks a term without an article.
+        """
+        self._set("title", titles, language)
+
+    def get_page_ids(self, titles, language):
+        """
+        Look up the page IDs of several article titles with one round trip.
+
+        Returns:
+            dict: The cached titles, mapped to their page ID or to None if there is no such page.
+        """
+        cached = self._get("pageid", titles, language)
+        return {title: int(page_id) if page_id else None for title, page_id in cached.items()}
+
+    def set_page_ids(self, page_ids, language):
+        """
+        Store page IDs of article titles; None marks a title without a page.
+        """
+        self._set("pageid", {title: None if page_id is None else str(page_id) for title, page_id in page_ids.items()}, language)
+
+
+def get_title_cache():
+    """
+    Return the title cache of this process, connecting to Redis on first use.
+    """
+    global _TITLE_CACHE
+    if _TITLE_CACHE is None:
+        _TITLE_CACHE = TitleCache(connect_redis())
+    return _TITLE_CACHE
@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import re
+import zlib
 from typing import List, Dict, Any, Optional, Set, Tuple
 from urllib.parse import urlparse
 import logging
@@ -14,6 +17,26 @@ from datetime import datetime
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# MinHash/LSH settings for the near-duplicate backend
+MINHASH_NUM_PERM = 128       # Number of hash permutations per signature
+MINHASH_SHINGLE_SIZE = 5     # Words per shingle
+MINHASH_THRESHOLD = 0.8      # Estimated Jaccard similarity above which articles are duplicates
+MINHASH_SEED = 1
+_MINHASH_PRIME = (1 << 31) - 1
+
+# Everything before the trailing "-<number>" suffixes of a URL segment
+_TRAILING_NUMBERS_PATTERN = re.compile(r'^(.*?)(?:-\d+)*$', re.DOTALL)
+
+# Text normalisation for content similarity
+_SPECIAL_CHARS_PATTERN = re.compile(r'[^\w\s]|\d')
+# Same character class in RE2 syntax for Arrow: anything but letters, numbers, "_" and whitespace, or a digit
+_ARROW_SPECIAL_CHARS_PATTERN = r'[^\p{L}\p{N}_\s]|\p{Nd}'
+_STOP_WORDS: Optional[frozenset] = None
+# The stopwords as an Arrow value set for pc.is_in, with the frozenset it was built from
+_ARROW_STOP_WORDS: Optional[Tuple[frozenset, pa.Array]] = None
+# Implementations of the content normalisation, see deduplicate_by_content_similarity
+NORMALISERS = ("vectorised", "per_row")
+
 
 # Helper functions for URL processing
 def process_url(url: str) -> List[str]:
@@ -221,31 +244,49 @@ def deduplicate_by_url_path(df: pd.DataFrame) -> Set[int]:
     return kept_indices
 
 
+def version_key(url_parts: List[str]) -> Optional[Tuple[Tuple[str, ...], str]]:
+    """
+    Canonical version key of a processed URL: the path prefix plus the last segment
+    with all trailing "-<number>" version/article-id suffixes stripped.
+    Two URLs with different last segments are a versioned pair (is_versioned_pair)
+    exactly when their version keys are equal. Returns None for empty URLs.
+    """
+    if not url_parts:
+        return None
+    return tuple(url_parts[:-1]), _TRAILING_NUMBERS_PATTERN.match(url_parts[-1]).group(1)
+
+
 def deduplicate_by_versioning(group: pd.DataFrame) -> Set[int]:
     """
     Identify versioned URLs within a group and keep the newest from each version.
+    Version groups are built in a single pass by hashing each URL's version key.
     Returns indices of articles to keep.
     """
     kept_indices = set()
-    
-    processed_urls = {idx: process_url(row['url']) for idx, row in group.iterrows()}
-    version_groups = {}
-
-    # Group indices by versioning pattern
-    for idx1, parts1 in processed_urls.items():
-        found_group = False
-        for version_key, indices in version_groups.items():
-            idx_sample = indices[0]
-            if is_versioned_pair(parts1, processed_urls[idx_sample]):
-                version_groups[version_key].append(idx1)
-                found_group = True
-                break
 
-        if not found_group:
-            version_groups[len(version_groups)] = [idx1]
+    version_groups = []
+    # version key -> (last segment of the group's first URL, position in version_groups)
+    first_in_group = {}
+
+    for idx, url in zip(group.index, group['url']):
+        parts = process_url(url)
+        key = version_key(parts)
+        if key is None:
+            version_groups.append([idx])
+            continue
+        if key not in first_in_group:
+            first_in_group[key] = (parts[-1], len(version_groups))
+            version_groups.append([idx])
+            continue
+        first_last, position = first_in_group[key]
+        if parts[-1] == first_last:
+            # Identical to the group's first URL: not a versioned pair, stays on its own
+            version_groups.append([idx])
+        else:
+            version_groups[position].append(idx)
 
     # For each version group, keep the newest by pubtime
-    for version_key, indices in version_groups.items():
+    for indices in version_groups:
         if len(indices) == 1:
             kept_indices.add(indices[0])
         else:
@@ -257,6 +298,32 @@ def deduplicate_by_versioning(group: pd.DataFrame) -> Set[int]:
     return kept_indices
 
 
+def get_stop_words() -> frozenset:
+    """
+    Return the German and English NLTK stopwords, loaded once per process.
+    Falls back to an empty set (no stopword removal) if the corpus is unavailable.
+    """
+    global _STOP_WORDS
+    if _STOP_WORDS is None:
+        try:
+            _STOP_WORDS = frozenset(stopwords.words('german')) | frozenset(stopwords.words('english'))
+        except Exception:
+            logger.warning("Stopword corpus unavailable, stopwords will not be removed")
+            _STOP_WORDS = frozenset()
+    return _STOP_WORDS
+
+
+def get_arrow_stop_words() -> pa.Array:
+    """
+    Return the stopwords of get_stop_words as an Arrow array, built once per stopword set.
+    """
+    global _ARROW_STOP_WORDS
+    stop_words = get_stop_words()
+    if _ARROW_STOP_WORDS is None or _ARROW_STOP_WORDS[0] is not stop_words:
+        _ARROW_STOP_WORDS = (stop_words, pa.array(sorted(stop_words), type=pa.large_string()))
+    return _ARROW_STOP_WORDS[1]
+
+
 def preprocess_text(text: str) -> str:
     """
     Preprocess text by removing special characters, normalizing whitespace,
@@ -266,35 +333,69 @@ def preprocess_text(text: str) -> str:
         return ""
     
     try:
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters and numbers
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\d+', ' ', text)
-        
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Remove stopwords (optional - comment if causing performance issues)
-        try:
-            stop_words = set(stopwords.words('german')) | set(stopwords.words('english'))
-            words = text.split()
-            text = ' '.join(word for word in words if word not in stop_words)
-        except:
-            logger.warning("Stopword removal failed, using original text")
-        
-        return text
+        # Lowercase, then replace special characters and numbers with spaces
+        text = _SPECIAL_CHARS_PATTERN.sub(' ', text.lower())
+
+        # Splitting normalizes whitespace; drop stopwords on the way
+        stop_words = get_stop_words()
+        return ' '.join(word for word in text.split() if word not in stop_words)
     except Exception as e:
         logger.error(f"Text preprocessing failed: {str(e)}")
         return text if isinstance(text, str) else ""
 
 
-def deduplicate_by_content_similarity(group: pd.DataFrame, threshold: float = 0.85) -> Set[int]:
+def preprocess_text_series(texts: pd.Series) -> pd.Series:
+    """
+    Vectorised preprocess_text for a whole Series of texts.
+    Special characters and digits are replaced with one Arrow regex kernel, the texts are
+    split into tokens, stopwords are dropped with a single set lookup over all tokens and
+    the remaining tokens are joined back per text. The output equals
+    texts.apply(preprocess_text).
+
+    Arrow has a fixed cost per call, so call it once for many texts rather than per group.
+    """
+    lowered = [text.lower() if isinstance(text, str) else '' for text in texts]
+    normalized = pc.replace_substring_regex(pa.array(lowered, type=pa.large_string()), _ARROW_SPECIAL_CHARS_PATTERN, ' ')
+
+    token_lists = pc.utf8_split_whitespace(normalized)
+    tokens = pc.list_flatten(token_lists)
+    text_positions = pc.list_parent_indices(token_lists)
+
+    keep = pc.not_equal(pc.utf8_length(tokens), 0)
+    if get_stop_words():
+        keep = pc.and_(keep, pc.invert(pc.is_in(tokens, value_set=get_arrow_stop_words())))
+    tokens = tokens.filter(keep)
+    text_positions = text_positions.filter(keep).to_numpy()
+
+    offsets = np.searchsorted(text_positions, np.arange(len(lowered) + 1)).astype(np.int64)
+    joined = pc.binary_join(pa.LargeListArray.from_arrays(pa.array(offsets), tokens), pa.scalar(' ', pa.large_string()))
+    return pd.Series(joined.to_pylist(), index=texts.index, dtype=object)
+
+
+def normalise_content(texts: pd.Series, normaliser: str = "vectorised") -> pd.Series:
+    """
+    Normalise texts with preprocess_text_series ("vectorised") or row by row with
+    preprocess_text ("per_row"); both give the same text.
+    Raises ValueError for an unknown normaliser.
+    """
+    if normaliser not in NORMALISERS:
+        raise ValueError(f"Unknown normaliser '{normaliser}'. Use 'vectorised' or 'per_row'.")
+    if normaliser == "vectorised":
+        return preprocess_text_series(texts)
+    return texts.apply(preprocess_text)
+
+
+def deduplicate_by_content_similarity(group: pd.DataFrame, threshold: float = 0.85,
+                                      normaliser: str = "vectorised",
+                                      normalised_content: Optional[pd.Series] = None) -> Set[int]:
     """
     Deduplicate articles based on content similarity using TF-IDF.
+    The content is normalised with normalise_content, unless normalised_content already
+    holds the normalised text of (at least) the group's rows, indexed like the group.
     Returns indices of articles to keep.
     """
+    if normaliser not in NORMALISERS:
+        raise ValueError(f"Unknown normaliser '{normaliser}'. Use 'vectorised' or 'per_row'.")
     kept_indices = set()
     
     # Filter out rows with invalid content
@@ -308,7 +409,10 @@ def deduplicate_by_content_similarity(group: pd.DataFrame, threshold: float = 0.
 
     try:
         # Preprocess content for better similarity detection
-        preprocessed_content = valid_content_group['content'].apply(preprocess_text)
+        if normalised_content is not None:
+            preprocessed_content = normalised_content.loc[valid_content_group.index]
+        else:
+            preprocessed_content = normalise_content(valid_content_group['content'], normaliser)
         
         # Get document count to set appropriate TF-IDF parameters
         doc_count = len(preprocessed_content)
@@ -407,6 +511,136 @@ def deduplicate_by_content_similarity(group: pd.DataFrame, threshold: float = 0.
     return kept_indices
 
 
+def get_minhash_permutations(num_perm: int = MINHASH_NUM_PERM, seed: int = MINHASH_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the (a, b) coefficients of the universal hash functions a * x + b mod p.
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, _MINHASH_PRIME, size=num_perm).astype(np.uint64)
+    b = rng.randint(0, _MINHASH_PRIME, size=num_perm).astype(np.uint64)
+    return a, b
+
+
+def shingle_hashes(text: str, shingle_size: int = MINHASH_SHINGLE_SIZE) -> np.ndarray:
+    """
+    Hash the word shingles of a text with CRC32 (stable across processes).
+    Texts shorter than one shingle are hashed as a whole.
+    """
+    words = text.split()
+    if not words:
+        return np.array([], dtype=np.uint64)
+    if len(words) <= shingle_size:
+        shingles = {' '.join(words)}
+    else:
+        shingles = {' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+    return np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(text: str, permutations: Tuple[np.ndarray, np.ndarray], shingle_size: int = MINHASH_SHINGLE_SIZE) -> Optional[np.ndarray]:
+    """
+    Compute the MinHash signature of a preprocessed text, or None for empty texts.
+    """
+    hashes = shingle_hashes(text, shingle_size)
+    if hashes.size == 0:
+        return None
+    a, b = permutations
+    return ((np.outer(a, hashes) + b[:, None]) % _MINHASH_PRIME).min(axis=1).astype(np.uint32)
+
+
+def lsh_band_params(threshold: float, num_perm: int = MINHASH_NUM_PERM) -> Tuple[int, int]:
+    """
+    Choose the number of bands and rows per band for the LSH index.
+    Picks the S-curve midpoint (1/bands)^(1/rows) closest to the threshold from below,
+    so that candidates near the threshold are found and false positives are removed
+    by comparing the signatures afterwards.
+    """
+    best = (1, num_perm)
+    best_midpoint = -1.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        if best_midpoint < midpoint <= threshold:
+            best, best_midpoint = (bands, rows), midpoint
+    return best
+
+
+def deduplicate_by_minhash(df: pd.DataFrame, threshold: float = MINHASH_THRESHOLD,
+                           group_columns: Optional[List[str]] = None,
+                           num_perm: int = MINHASH_NUM_PERM) -> Set[int]:
+    """
+    Deduplicate near-identical articles with MinHash signatures and LSH banding.
+
+    Articles whose estimated Jaccard similarity of word shingles reaches the threshold
+    are merged into one duplicate set, of which the newest by pubtime is kept.
+    Runs in time linear in the number of articles (plus the size of the LSH buckets).
+    If group_columns is given, only articles with equal values in these columns
+    can be duplicates of each other.
+    Returns indices of articles to keep.
+    """
+    if df.empty:
+        return set()
+
+    permutations = get_minhash_permutations(num_perm)
+    bands, rows = lsh_band_params(threshold, num_perm)
+    preprocessed_content = preprocess_text_series(df['content'])
+
+    if group_columns:
+        group_keys = list(df[group_columns].itertuples(index=False, name=None))
+    else:
+        group_keys = [()] * len(df)
+
+    signatures = [minhash_signature(text, permutations) for text in preprocessed_content]
+
+    # Union-find over positions in df
+    parent = list(range(len(df)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    buckets: Dict[Tuple, List[int]] = {}
+    for position, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(bands):
+            band_key = (group_keys[position], band, signature[band * rows:(band + 1) * rows].tobytes())
+            buckets.setdefault(band_key, []).append(position)
+
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        # Compare each member with one representative per duplicate set in this bucket
+        representatives = []
+        for position in members:
+            for representative in representatives:
+                if find(position) == find(representative):
+                    break
+                if np.mean(signatures[position] == signatures[representative]) >= threshold:
+                    parent[find(position)] = find(representative)
+                    break
+            else:
+                representatives.append(position)
+
+    duplicate_sets: Dict[int, List[int]] = {}
+    for position in range(len(df)):
+        duplicate_sets.setdefault(find(position), []).append(position)
+
+    has_pubtime = 'pubtime' in df.columns
+    kept_indices = set()
+    for positions in duplicate_sets.values():
+        if has_pubtime and len(positions) > 1:
+            newest = max(positions, key=lambda position: df['pubtime'].iat[position])
+        else:
+            newest = positions[0]
+        kept_indices.add(df.index[newest])
+
+    logger.info(f"MinHash deduplication kept {len(kept_indices)} articles from {len(df)} "
+                f"({bands} bands x {rows} rows, threshold {threshold})")
+    return kept_indices
+
+
 def deduplicate_by_content_similarity_per_day(df: pd.DataFrame, threshold: float = 0.85) -> pd.DataFrame:
     """
     Final deduplication step: remove content-similar articles within each day.
@@ -493,10 +727,17 @@ def validate_dataframe(df: pd.DataFrame) -> None:
         raise ValueError(f"Required columns missing from DataFrame: {missing_columns}")
 
 
-def deduplicate_df(df_with_link: pd.DataFrame, threshold: float = 0.85) -> pd.DataFrame:
+def deduplicate_df(df_with_link: pd.DataFrame, threshold: float = 0.85, backend: str = "tfidf",
+                   jaccard_threshold: float = MINHASH_THRESHOLD, normaliser: str = "vectorised") -> pd.DataFrame:
     """
     Deduplicate articles based on URL versioning and content similarity.
     Also deduplicates articles that share the same URL path across different domains.
+
+    With backend="tfidf" content similarity is computed per (base_link, head) group with
+    TF-IDF cosine similarity; with backend="minhash" all groups are processed in a single
+    MinHash/LSH pass whose buckets are scoped to the same (base_link, head) groups.
+    normaliser selects the text normalisation of the "tfidf" backend (see
+    normalise_content); the content of all groups is normalised in one call.
     """
     # Create a working copy to avoid modifying the original
     df = prepare_dataframe(df_with_link.copy())
@@ -519,6 +760,8 @@ def deduplicate_df(df_with_link: pd.DataFrame, threshold: float = 0.85) -> pd.Da
     
     # Second pass: Process the remaining articles by group
     final_kept_indices = set()
+    minhash_candidates = []
+    content_groups = []
     
     try:
         groups = df_filtered.groupby(['base_link', 'head'])
@@ -539,9 +782,25 @@ def deduplicate_df(df_with_link: pd.DataFrame, threshold: float = 0.85) -> pd.Da
             # Process remaining articles in the group for content similarity
             version_removed_indices = group.index.difference(version_kept_indices).tolist()
             if version_removed_indices:
-                remaining_in_group = group.loc[version_removed_indices]
-                content_kept_indices = deduplicate_by_content_similarity(remaining_in_group, threshold)
-                final_kept_indices.update(content_kept_indices)
+                if backend == "minhash":
+                    # Collected and processed in a single pass after the loop
+                    minhash_candidates.extend(version_removed_indices)
+                else:
+                    # Collected so that their content is normalised in one call after the loop
+                    content_groups.append(version_removed_indices)
+
+        if content_groups:
+            candidates = df_filtered.loc[[idx for indices in content_groups for idx in indices]]
+            normalised_content = normalise_content(candidates['content'], normaliser)
+            for indices in content_groups:
+                final_kept_indices.update(deduplicate_by_content_similarity(
+                    candidates.loc[indices], threshold, normaliser, normalised_content
+                ))
+
+        if minhash_candidates:
+            final_kept_indices.update(deduplicate_by_minhash(
+                df_filtered.loc[minhash_candidates], jaccard_threshold, group_columns=['base_link', 'head']
+            ))
     
     except Exception as e:
         logger.error(f"Error during group processing: {str(e)}")
@@ -553,7 +812,9 @@ def deduplicate_df(df_with_link: pd.DataFrame, threshold: float = 0.85) -> pd.Da
     return df_with_link.loc[list(final_kept_indices)].reset_index(drop=True)
 
 
-def remove_similar_rows(df: pd.DataFrame, threshold: float = 0.85, debug: bool = False) -> pd.DataFrame:
+def remove_similar_rows(df: pd.DataFrame, threshold: float = 0.85, debug: bool = False,
+                        backend: str = "tfidf", jaccard_threshold: float = MINHASH_THRESHOLD,
+                        normaliser: str = "vectorised") -> pd.DataFrame:
     """
     Remove duplicate articles based on URL and headline similarity.
     
@@ -565,6 +826,14 @@ def remove_similar_rows(df: pd.DataFrame, threshold: float = 0.85, debug: bool =
         Similarity threshold for content-based deduplication
     debug : bool, default=False
         If True, prints additional debugging information
+    backend : str, default="tfidf"
+        Content similarity engine: "tfidf" (cosine similarity per group) or
+        "minhash" (MinHash + LSH banding in one pass over the whole day)
+    jaccard_threshold : float, default=MINHASH_THRESHOLD
+        Estimated Jaccard similarity above which the "minhash" backend treats articles as duplicates
+    normaliser : str, default="vectorised"
+        Text normalisation of the "tfidf" backend: "vectorised" (all candidate texts in one
+        Arrow call) or "per_row"; both give the same text
         
     Returns:
     --------
@@ -579,6 +848,13 @@ def remove_similar_rows(df: pd.DataFrame, threshold: float = 0.85, debug: bool =
     else:
         logging.getLogger().setLevel(logging.WARNING)
         
+    if backend not in ("tfidf", "minhash"):
+        logging.getLogger().setLevel(original_log_level)
+        raise ValueError(f"Unknown deduplication backend '{backend}'. Use 'tfidf' or 'minhash'.")
+    if normaliser not in NORMALISERS:
+        logging.getLogger().setLevel(original_log_level)
+        raise ValueError(f"Unknown normaliser '{normaliser}'. Use 'vectorised' or 'per_row'.")
+
     if df is None or df.empty:
         logger.warning("Empty DataFrame provided, returning empty DataFrame")
         # Restore original logging level
@@ -633,7 +909,7 @@ def remove_similar_rows(df: pd.DataFrame, threshold: float = 0.85, debug: bool =
 
         # Apply deduplication to rows with article links
         try:
-            deduplicated_with_links = deduplicate_df(df_with_link, threshold)
+            deduplicated_with_links = deduplicate_df(df_with_link, threshold, backend, jaccard_threshold, normaliser)
             logger.info(f"Deduplication reduced linked articles from {len(df_with_link)} to {len(deduplicated_with_links)}")
             result_parts.append(deduplicated_with_links)
         except Exception as e:
@@ -656,7 +932,7 @@ def remove_similar_rows(df: pd.DataFrame, threshold: float = 0.85, debug: bool =
                         logger.warning("Failed to convert 'pubtime' to datetime. Using original values.")
             
             # Apply same deduplication logic to rows without article links
-            deduplicated_no_links = deduplicate_df(df_without_link, threshold)
+            deduplicated_no_links = deduplicate_df(df_without_link, threshold, backend, jaccard_threshold, normaliser)
             logger.info(f"Deduplication reduced unlinked articles from {len(df_without_link)} to {len(deduplicated_no_links)}")
             result_parts.append(deduplicated_no_links)
         except Exception as e:
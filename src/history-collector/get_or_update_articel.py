@@ -4,6 +4,7 @@ nest_asyncio.apply()
 from datetime import datetime, timedelta
 # Import from the new db_utils module
 from db_utils import create_db_connection
+from title_cache import get_title_cache
 
 from wikipedia_histories import get_history, to_df
 import pandas as pd
@@ -17,6 +18,9 @@ from bs4 import BeautifulSoup  # Add this import for HTML parsing
 def get_page_id(article_title, language_code):
     """Get Wikipedia page ID for an article.
 
+    Page IDs (and titles without a page) are cached in Redis, shared with the data-collector,
+    so repeated history jobs for an article need no API request.
+
     Args:
         article_title (str): Title of the Wikipedia article.
         language_code (str): Language code for the Wikipedia domain (e.g., 'en', 'de').
@@ -27,6 +31,11 @@ def get_page_id(article_title, language_code):
     Raises:
         Exception: If there's an error during the API request.
     """
+    title_cache = get_title_cache()
+    cached = title_cache.get_page_ids([article_title], language_code)
+    if article_title in cached:
+        return cached[article_title]
+
     try:
         url = f"https://{language_code}.wikipedia.org/w/api.php"
         params = {
@@ -46,7 +55,9 @@ def get_page_id(article_title, language_code):
             for page_id in pages:
                 # Convert string ID to int, skip -1 which means not found
                 if int(page_id) > 0:
+                    title_cache.set_page_ids({article_title: int(page_id)}, language_code)
                     return int(page_id)
+            title_cache.set_page_ids({article_title: None}, language_code)
         
         print(f"Could not find page ID for {article_title} in {language_code} Wikipedia")
         return None
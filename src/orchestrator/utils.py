@@ -7,6 +7,10 @@ import shlex
 import urllib.parse
 import re
 
+# Named volume mounted into data-collector containers so its on-disk caches survive --rm
+DATA_COLLECTOR_CACHE_VOLUME = "wave_collector_cache"
+DATA_COLLECTOR_CACHE_PATH = "/app/cache"
+
 def sanitize_string(input_string):
     """
     Sanitize a string to create a valid container name.
@@ -168,6 +172,8 @@ def execute_docker_command(client, job_id, docker_command, chain_command=None, e
             "network": "wave_default"  # added network parameter
         }
         run_kwargs["name"] = sanitize_string(container_name)
+        if image == "data-collector":
+            run_kwargs["volumes"] = {DATA_COLLECTOR_CACHE_VOLUME: {"bind": DATA_COLLECTOR_CACHE_PATH, "mode": "rw"}}
         print(f"Using container name: {run_kwargs['name']}")
 
         container = client.containers.run(**run_kwargs)
@@ -298,6 +304,8 @@ def stream_docker_command(client, job_id, docker_command, chain_command=None, en
             "network": "wave_default"
         }
         run_kwargs["name"] = sanitize_string(container_name)
+        if image == "data-collector":
+            run_kwargs["volumes"] = {DATA_COLLECTOR_CACHE_VOLUME: {"bind": DATA_COLLECTOR_CACHE_PATH, "mode": "rw"}}
 
         container = client.containers.run(**run_kwargs)
 